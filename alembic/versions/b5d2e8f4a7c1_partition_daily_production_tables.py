@@ -0,0 +1,171 @@
+"""partition daily production tables by month
+
+Revision ID: b5d2e8f4a7c1
+Revises: e7a3f5d90c18
+Create Date: 2025-07-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f4a7c1'
+down_revision: Union[str, Sequence[str], None] = 'e7a3f5d90c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The partition key of every table converted by this migration.
+PARTITION_KEYS = {
+    'stg_pro_count__completiondailytb': 'productiondate',
+    'stg_aries__daily_capacities': 'date',
+}
+
+
+def _daily_capacities_columns():
+    return [
+        sa.Column('well_id', sa.String(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('oil', sa.Numeric(), nullable=True),
+        sa.Column('gas', sa.Numeric(), nullable=True),
+        sa.Column('water', sa.Numeric(), nullable=True),
+    ]
+
+
+def _completiondailytb_columns(partitioned: bool):
+    return [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('merrickid', sa.Integer(), nullable=True),
+        sa.Column('recorddate', sa.DateTime(), nullable=True),
+        # A partition key that is part of the primary key cannot be NULL.
+        sa.Column('productiondate', sa.DateTime(), nullable=not partitioned),
+        sa.Column('producingmethod', sa.Integer(), nullable=True),
+        sa.Column('dailydowntime', sa.Numeric(), nullable=True),
+        sa.Column('allocestoilvol', sa.Numeric(), nullable=True),
+        sa.Column('oilproduction', sa.Numeric(), nullable=True),
+        sa.Column('allocestgasvolmcf', sa.Numeric(), nullable=True),
+        sa.Column('allocestinjgasvolmcf', sa.Numeric(), nullable=True),
+        sa.Column('allocestwatervol', sa.Numeric(), nullable=True),
+        sa.Column('waterproduction', sa.Numeric(), nullable=True),
+        sa.Column('chokesize', sa.Numeric(), nullable=True),
+        sa.Column('casingpressure', sa.Numeric(), nullable=True),
+        sa.Column('tubingpressure', sa.Numeric(), nullable=True),
+    ]
+
+
+def _set_aside(table_name: str, suffix: str, constraint: str, index: Union[str, None] = None,
+               sequence: Union[str, None] = None):
+    """Renames a table, and the schema-wide names it owns, out of the way of its replacement."""
+    op.rename_table(table_name, f'{table_name}{suffix}')
+    op.execute(f'ALTER TABLE "{table_name}{suffix}" RENAME CONSTRAINT "{constraint}" TO "{constraint}{suffix}"')
+    if index:
+        op.execute(f'ALTER INDEX "{index}" RENAME TO "{index}{suffix}"')
+    if sequence:
+        op.execute(f'ALTER SEQUENCE "{sequence}" RENAME TO "{sequence}{suffix}"')
+
+
+def _create_partitions(table_name: str, source_table: str):
+    """Creates a DEFAULT partition and one partition per month present in `source_table`."""
+    column = PARTITION_KEYS[table_name]
+    op.execute(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT')
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT DISTINCT date_trunc('month', "{column}")::date FROM "{source_table}"
+                WHERE "{column}" IS NOT NULL
+            LOOP
+                EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                               '{table_name}_p' || to_char(month, 'YYYY_MM'), '{table_name}',
+                               month, (month + interval '1 month')::date);
+            END LOOP;
+        END $$;
+    """)
+
+
+def _copy_rows(source_table: str, table_name: str):
+    """Copies every row with a partition key over; staging rows are reloaded from the source anyway."""
+    column = PARTITION_KEYS[table_name]
+    op.execute(f"""
+        DO $$
+        DECLARE
+            skipped bigint;
+        BEGIN
+            INSERT INTO "{table_name}" SELECT * FROM "{source_table}" WHERE "{column}" IS NOT NULL;
+            SELECT count(*) INTO skipped FROM "{source_table}" WHERE "{column}" IS NULL;
+            IF skipped > 0 THEN
+                RAISE NOTICE '% rows of % without a % were not copied', skipped, '{source_table}', '{column}';
+            END IF;
+        END $$;
+    """)
+
+
+def _reset_sequence(table_name: str, column: str):
+    op.execute(f"""
+        SELECT setval(pg_get_serial_sequence('"{table_name}"', '{column}'), COALESCE(MAX("{column}"), 0) + 1, false)
+        FROM "{table_name}"
+    """)
+
+
+def upgrade() -> None:
+    """
+    Turns the daily production tables into tables range-partitioned by
+    month on their date column, so loads can replace one month at a time
+    and date-bounded queries prune partitions.
+
+    Existing rows are copied into one partition per month; a DEFAULT
+    partition catches dates no monthly partition covers yet. The primary
+    key of stg_pro_count__completiondailytb becomes (id, productiondate),
+    because a partitioned table's keys must include its partition key.
+    """
+    _set_aside('stg_aries__daily_capacities', '_unpartitioned', 'pk_aries_daily_capacities')
+    op.create_table('stg_aries__daily_capacities',
+        *_daily_capacities_columns(),
+        sa.PrimaryKeyConstraint('well_id', 'date', name='pk_aries_daily_capacities'),
+        postgresql_partition_by='RANGE (date)'
+    )
+    _create_partitions('stg_aries__daily_capacities', 'stg_aries__daily_capacities_unpartitioned')
+    _copy_rows('stg_aries__daily_capacities_unpartitioned', 'stg_aries__daily_capacities')
+    op.drop_table('stg_aries__daily_capacities_unpartitioned')
+
+    _set_aside('stg_pro_count__completiondailytb', '_unpartitioned', 'stg_pro_count__completiondailytb_pkey',
+               index='ix_stg_pro_count__completiondailytb_merrickid_date',
+               sequence='stg_pro_count__completiondailytb_id_seq')
+    op.create_table('stg_pro_count__completiondailytb',
+        *_completiondailytb_columns(partitioned=True),
+        sa.PrimaryKeyConstraint('id', 'productiondate'),
+        postgresql_partition_by='RANGE (productiondate)'
+    )
+    op.create_index(op.f('ix_stg_pro_count__completiondailytb_merrickid_date'), 'stg_pro_count__completiondailytb', ['merrickid', 'productiondate'], unique=False)
+    _create_partitions('stg_pro_count__completiondailytb', 'stg_pro_count__completiondailytb_unpartitioned')
+    _copy_rows('stg_pro_count__completiondailytb_unpartitioned', 'stg_pro_count__completiondailytb')
+    _reset_sequence('stg_pro_count__completiondailytb', 'id')
+    op.drop_table('stg_pro_count__completiondailytb_unpartitioned')
+
+
+def downgrade() -> None:
+    """Reverts all changes made in the upgrade function (dropping every partition)."""
+    _set_aside('stg_pro_count__completiondailytb', '_partitioned', 'stg_pro_count__completiondailytb_pkey',
+               index='ix_stg_pro_count__completiondailytb_merrickid_date',
+               sequence='stg_pro_count__completiondailytb_id_seq')
+    op.create_table('stg_pro_count__completiondailytb',
+        *_completiondailytb_columns(partitioned=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stg_pro_count__completiondailytb_merrickid_date'), 'stg_pro_count__completiondailytb', ['merrickid', 'productiondate'], unique=False)
+    op.execute('INSERT INTO "stg_pro_count__completiondailytb" '
+               'SELECT DISTINCT ON (id) * FROM "stg_pro_count__completiondailytb_partitioned" ORDER BY id')
+    _reset_sequence('stg_pro_count__completiondailytb', 'id')
+    op.drop_table('stg_pro_count__completiondailytb_partitioned')
+
+    _set_aside('stg_aries__daily_capacities', '_partitioned', 'pk_aries_daily_capacities')
+    op.create_table('stg_aries__daily_capacities',
+        *_daily_capacities_columns(),
+        sa.PrimaryKeyConstraint('well_id', 'date', name='pk_aries_daily_capacities')
+    )
+    op.execute('INSERT INTO "stg_aries__daily_capacities" SELECT * FROM "stg_aries__daily_capacities_partitioned"')
+    op.drop_table('stg_aries__daily_capacities_partitioned')
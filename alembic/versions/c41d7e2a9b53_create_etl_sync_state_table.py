@@ -0,0 +1,34 @@
+"""create etl sync state table
+
+Revision ID: c41d7e2a9b53
+Revises: 2b8d9e6c1a4f
+Create Date: 2025-07-01 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9b53'
+down_revision: Union[str, Sequence[str], None] = '2b8d9e6c1a4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Creates the control table that stores per-table high-water marks for incremental syncs."""
+    op.create_table('etl_sync_state',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('watermark', sa.String(), nullable=True),
+        sa.Column('last_full_refresh', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    """Reverts all changes made in the upgrade function."""
+    op.drop_table('etl_sync_state')
@@ -0,0 +1,33 @@
+"""create etl row hashes table
+
+Revision ID: e7a3f5d90c18
+Revises: c41d7e2a9b53
+Create Date: 2025-07-08 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3f5d90c18'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e2a9b53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Creates the control table that stores per-row hashes for differential loads."""
+    op.create_table('etl_row_hashes',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('key_hash', sa.BigInteger(), nullable=False),
+        sa.Column('row_hash', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name', 'key_hash')
+    )
+
+
+def downgrade() -> None:
+    """Reverts all changes made in the upgrade function."""
+    op.drop_table('etl_row_hashes')
@@ -1,10 +1,22 @@
 import os
+import argparse
 import logging
+from contextlib import nullcontext
 from datetime import datetime
+from functools import partial
+import pandas as pd
+from src.config import settings
 from src.etl.extractor import csv_extractor
-from src.etl.api_extractor import api_extractor, API_LOAD_ORDER
+from src.etl.api_extractor import api_extractor, API_LOAD_ORDER, INCREMENTAL_COLUMNS, CsvPages
 from src.etl.transformer import transformer
 from src.etl.loader import postgres_loader
+from src.etl.validator import key_validator
+from src.etl.sync_state import sync_state
+from src.etl.run_state import run_state
+from src.etl.catalog import get_dependencies
+from src.etl.scheduler import TableScheduler
+from src.etl.telemetry import telemetry
+from src.database import pool_metrics
 
 # Setup professional logging
 LOG_DIR = "logs"
@@ -26,66 +38,474 @@ CSV_LOAD_ORDER = [
     "stg_pro_count__completiontb"
 ]
 
+def transform_table(table_name, df, copy=True, keep="first"):
+    """
+    Cleans the column names of one DataFrame (or chunk), then coerces its
+    columns to the target table's types. The type coercion also covers
+    completiontb's integer `activeflag` (any non-zero value becomes true).
+
+    The result is then validated against the table's primary and foreign
+    keys (see `KeyValidator`); `keep` picks the duplicate that is loaded.
+    """
+    with telemetry.stage(table_name, "transform") as timer:
+        df = transformer.clean_column_names(df, copy=copy)
+        df = transformer.coerce_types(df, table_name)
+        timer.rows = len(df)
+    return key_validator.validate(df, table_name, keep=keep)
+
+def load_table(table_name, data, batch_size=None, truncate=True, on_conflict="nothing", on_commit=None):
+    """
+    Truncates (unless `truncate` is False) and loads one table. With SWAP_LOADS
+    (`--swap`), full reloads go through a shadow table and an atomic swap instead.
+    With BULK_LOADS (`--bulk`), other full reloads run with the table's
+    secondary indexes and FKs dropped, and rebuild them once loaded.
+    Tables range-partitioned by month are always fully reloaded one
+    partition at a time (see `PostgresLoader.load_partitioned`) instead,
+    and get their upcoming monthly partitions created before incremental loads.
+
+    `data` is either a full DataFrame (batch mode), an iterator of DataFrame
+    chunks (streaming mode), or a zero-argument callable returning one of
+    those (deferred extraction, used by the parallel scheduler). In streaming mode each chunk is transformed and
+    loaded as it arrives, so the whole table is never held in memory. Note
+    that the table is truncated before the stream is consumed: if the
+    extraction then fails part-way, the run fails with the table partially
+    loaded. Combine streaming with --swap to keep the live table intact.
+
+    With `--differential`, tables listed in DIFFERENTIAL_TABLES are not
+    truncated; only rows whose content hash changed are upserted.
+
+    `data` may also be `CsvPages` (see `csv_passthrough_tables`), which are
+    copied into the table as they arrive, without any transformation.
+
+    `on_commit(batch_num, rows)` is called after every durable batch of the
+    plain and CSV pass-through loads (used for run checkpoints).
+
+    Extracted DataFrames of tables in PARALLEL_LOAD_TABLES are loaded as
+    LOAD_WORKERS disjoint partitions over that many connections at once.
+
+    Rows failing key validation are routed out before loading. A full
+    reload whose rows all went through validation leaves the table's keys
+    in memory, for checking its children's foreign keys.
+
+    Returns the loader's LoadResult.
+    """
+    if callable(data):
+        data = data()
+    key_validator.start_table(table_name)
+    complete = False
+    try:
+        result = _load_table(table_name, data, batch_size, truncate, on_conflict, on_commit)
+        complete = truncate and result.succeeded and not isinstance(data, CsvPages)
+        return result
+    finally:
+        key_validator.table_loaded(table_name, complete=complete)
+
+def _load_table(table_name, data, batch_size, truncate, on_conflict, on_commit):
+    """The body of `load_table`, once deferred `data` has been resolved."""
+    if truncate and settings.DIFFERENTIAL_LOADS and table_name in settings.DIFFERENTIAL_TABLES:
+        if isinstance(data, pd.DataFrame):
+            data = transform_table(table_name, data, keep="last")
+        else:
+            data = (transform_table(table_name, chunk, copy=False, keep="last") for chunk in data)
+        return postgres_loader.load_differential(
+            data, table_name, batch_size=batch_size, delete_missing=settings.DIFFERENTIAL_DELETE
+        )
+    partitioned = postgres_loader.partition_column(table_name) is not None
+    if truncate and settings.SWAP_LOADS and not partitioned:
+        if isinstance(data, pd.DataFrame):
+            data = transform_table(table_name, data)
+        else:
+            data = (transform_table(table_name, chunk, copy=False) for chunk in data)
+        return postgres_loader.load_with_swap(data, table_name, batch_size=batch_size)
+    keep = "last" if on_conflict == "update" else "first"
+    if isinstance(data, pd.DataFrame):
+        data = transform_table(table_name, data, keep=keep)
+    elif not isinstance(data, CsvPages):
+        data = (transform_table(table_name, chunk, copy=False, keep=keep) for chunk in data)
+
+    def load_into(target, on_commit=on_commit):
+        if isinstance(data, CsvPages):
+            return postgres_loader.load_csv_pages(data.pages, target, data.columns, on_conflict=on_conflict,
+                                                  on_commit=on_commit)
+        if isinstance(data, pd.DataFrame):
+            return postgres_loader.load_dataframe(data, target, batch_size=batch_size, on_conflict=on_conflict,
+                                                  on_commit=on_commit, workers=load_workers(table_name))
+        return postgres_loader.load_stream(data, target, batch_size=batch_size, on_conflict=on_conflict,
+                                           on_commit=on_commit)
+
+    if partitioned:
+        if truncate:
+            return postgres_loader.load_partitioned(table_name, partial(load_into, on_commit=None))
+        postgres_loader.premake_partitions(table_name)
+    if truncate:
+        postgres_loader.truncate_table(table_name)
+    bulk = truncate and settings.BULK_LOADS
+    with postgres_loader.deferred_maintenance(table_name) if bulk else nullcontext():
+        return load_into(table_name)
+
+def load_workers(table_name):
+    """Connections a table's DataFrame is loaded over (1 unless it is listed in PARALLEL_LOAD_TABLES)."""
+    return settings.LOAD_WORKERS if table_name in settings.PARALLEL_LOAD_TABLES else 1
+
+def csv_passthrough_tables():
+    """
+    API tables from CSV_PASSTHROUGH_TABLES that can skip the DataFrame path:
+    PostgREST sends them as CSV, which is copied straight into the table.
+    Only tables whose type coercion PostgreSQL reproduces when it parses the
+    CSV qualify (see `Transformer.copies_verbatim`); the others keep the
+    DataFrame path, as do differential loads and runs with shadow-table
+    swaps or the API page cache.
+    """
+    if settings.SWAP_LOADS or api_extractor.cache.enabled:
+        return set()
+    tables = set()
+    for table_name in settings.CSV_PASSTHROUGH_TABLES:
+        if table_name not in API_LOAD_ORDER:
+            continue
+        if settings.DIFFERENTIAL_LOADS and table_name in settings.DIFFERENTIAL_TABLES:
+            continue
+        if not transformer.copies_verbatim(table_name):
+            print(f"--- {table_name} keeps the DataFrame path: its columns need type coercion before loading.")
+            continue
+        tables.add(table_name)
+    return tables
+
+def supports_mid_table_resume(table_name):
+    """
+    Whether an interrupted API table can continue from its committed rows.
+    That needs offset pages in primary key order, so the interrupted run
+    and this one agree on which rows an offset skips, and a plain (or CSV
+    pass-through) load over a single connection into a plain table;
+    swapped, differential, parallel and month-partitioned loads always
+    restart the table.
+    """
+    return (
+        api_extractor.offset_pages_ordered(table_name)
+        and load_workers(table_name) == 1
+        and postgres_loader.partition_column(table_name) is None
+        and not settings.SWAP_LOADS
+        and not (settings.DIFFERENTIAL_LOADS and table_name in settings.DIFFERENTIAL_TABLES)
+    )
+
+def plan_resume(csv_tables, sync_plan):
+    """
+    Works out where a resumed run picks up.
+
+    Tables the interrupted run completed are skipped. An API table that was
+    interrupted part-way continues, without a truncate, from the page holding
+    its first uncommitted row; rows loaded twice are absorbed by ON CONFLICT.
+    Every other table starts over. A truncate cascades to FK children, so
+    children of a table that starts over are reloaded as well.
+
+    Returns:
+        A tuple of (tables to skip, per-table start offsets).
+    """
+    completed = run_state.completed_tables()
+    page_size = api_extractor.page_size
+    start_offsets = {}
+    for table_name in API_LOAD_ORDER:
+        rows = run_state.committed_rows(table_name)
+        if table_name not in completed and rows and supports_mid_table_resume(table_name):
+            start_offsets[table_name] = rows // page_size * page_size
+
+    truncated = {
+        table_name for table_name in set(csv_tables) | set(API_LOAD_ORDER)
+        if table_name not in completed and table_name not in start_offsets
+        and sync_plan.get(table_name) != "incremental"
+    }
+    dependencies = get_dependencies(CSV_LOAD_ORDER + API_LOAD_ORDER)
+    # Propagate restarts from parents to children until nothing changes.
+    while True:
+        restarted = {
+            table_name for table_name in completed | set(start_offsets)
+            if dependencies.get(table_name, set()) & truncated
+        }
+        if not restarted:
+            break
+        for table_name in restarted:
+            completed.discard(table_name)
+            start_offsets.pop(table_name, None)
+            run_state.reset_table(table_name)
+        truncated |= restarted
+
+    for table_name in sorted(completed):
+        print(f"--- Resume: skipping {table_name} (completed)")
+    for table_name, offset in start_offsets.items():
+        print(f"--- Resume: {table_name} continues at row {offset} "
+              f"({run_state.committed_rows(table_name)} rows were committed)")
+    return completed, start_offsets
+
+def run_options(args):
+    """The options that shape a run; a checkpoint is only resumed under the same ones."""
+    return {
+        "stream": args.stream,
+        "force": args.force,
+        "incremental": args.incremental,
+        "full_refresh": args.full_refresh,
+        "swap": settings.SWAP_LOADS,
+        "differential": settings.DIFFERENTIAL_LOADS,
+        "pagination": api_extractor.pagination,
+    }
+
+def plan_api_sync(force_full_refresh=False):
+    """
+    Decides, for every incremental-capable API table, whether this run does a
+    full refresh or an incremental pull from its stored watermark.
+
+    Returns:
+        A tuple of (per-table PostgREST filters, per-table sync mode).
+    """
+    filters, sync_plan = {}, {}
+    for table_name, column in INCREMENTAL_COLUMNS.items():
+        if force_full_refresh or sync_state.needs_full_refresh(table_name, settings.SYNC_FULL_REFRESH_DAYS):
+            sync_plan[table_name] = "full"
+        else:
+            watermark = sync_state.get(table_name)["watermark"]
+            # `gte` re-reads the boundary value so late rows for the last
+            # period are picked up; the upsert makes the overlap harmless.
+            filters[table_name] = {column: f"gte.{watermark}"}
+            sync_plan[table_name] = "incremental"
+        print(f"--- Sync mode for {table_name}: {sync_plan[table_name]}")
+    return filters, sync_plan
+
+def run_tables(table_names, process):
+    """
+    Runs `process(table_name)` for every table. With TABLE_WORKERS > 1, the
+    FK-aware scheduler runs independent tables concurrently; otherwise tables
+    are processed one at a time in the given order.
+    """
+    if settings.TABLE_WORKERS > 1:
+        print(f"--- Scheduling {len(table_names)} tables on {settings.TABLE_WORKERS} workers")
+        TableScheduler(max_workers=settings.TABLE_WORKERS).run(table_names, process)
+    else:
+        for table_name in table_names:
+            process(table_name)
+
+def report_data_quality():
+    """Prints and saves the per-table report of rows routed out by key validation."""
+    if not key_validator.quality:
+        return
+    print("\n--- Data quality (rows routed out before loading):")
+    print(key_validator.report())
+    key_validator.write_report(settings.METRICS_DIR / f"data_quality_{datetime.now():%Y-%m-%d_%H-%M-%S}.json")
+
+def report_rejections(result):
+    if result.rejected_rows:
+        print(f"    > WARNING: {result.rejected_rows} row(s) of {result.table_name} were quarantined; "
+              f"fix them and re-apply with --replay-dead-letters.")
+
+def replay_dead_letters(table_names=None):
+    """Re-applies quarantined rows for the given tables (all quarantined tables by default)."""
+    table_names = table_names or postgres_loader.dead_letters.tables()
+    if not table_names:
+        print("--- No quarantined rows to replay.")
+    for table_name in table_names:
+        result = postgres_loader.replay_dead_letters(table_name)
+        report_rejections(result)
+
 def run_csv_pipeline(all_data):
-    """Runs the idempotent ETL process for all CSV files."""
+    """
+    Runs the idempotent ETL process for all CSV files.
+
+    `all_data` only holds the tables selected for reload (see
+    `CsvExtractor.tables_to_load`). After a table loads without failed
+    batches, its source file fingerprint is recorded in the manifest.
+    """
     print("\n========== CSV PIPELINE STARTED ==========")
     logging.info("CSV Pipeline Started")
-    for table_name in CSV_LOAD_ORDER:
-        if table_name not in all_data: continue
+
+    def process(table_name):
         print(f"\n[PROCESS] Loading CSV table: {table_name}")
-        df = all_data[table_name]
-        df = transformer.clean_column_names(df)
-        if table_name == "stg_pro_count__completiontb":
-            df = transformer.transform_completion_data(df)
-        postgres_loader.truncate_table(table_name)
-        postgres_loader.load_dataframe(df, table_name)
+        run_state.start_table(table_name)
+        result = load_table(table_name, all_data[table_name])
+        report_rejections(result)
+        if result.succeeded:
+            csv_extractor.mark_loaded(table_name)
+            run_state.complete_table(table_name, result.rows)
+
+    run_tables([table_name for table_name in CSV_LOAD_ORDER if table_name in all_data], process)
     print("========== CSV PIPELINE COMPLETED ==========")
     logging.info("CSV Pipeline Completed")
 
-def run_api_pipeline(all_data):
-    """Runs the idempotent ETL process for all API endpoints."""
+def run_api_pipeline(all_data, sync_plan=None, start_offsets=None):
+    """
+    Runs the idempotent ETL process for all API endpoints.
+
+    Tables listed in `sync_plan` as "incremental" are upserted without a
+    truncate. After every successful load of a planned table, its new
+    high-water mark is saved. Tables in `start_offsets` continue an
+    interrupted load (see `plan_resume`) instead of being truncated.
+    """
+    sync_plan = sync_plan or {}
+    start_offsets = start_offsets or {}
     print("\n========== API PIPELINE STARTED ==========")
     logging.info("API Pipeline Started")
-    for table_name in API_LOAD_ORDER:
-        if table_name not in all_data: continue
+
+    def process(table_name):
         print(f"\n[PROCESS] Loading API table: {table_name}")
-        df = all_data[table_name]
-        df = transformer.clean_column_names(df)
-        
-        # Professional Solution: Use a smaller batch size for the table
-        # with large text fields to avoid potential network/SSL buffer issues.
-        batch_size = 500 if table_name == "stg_wiserock__note" else 5000
-        print(f"    > Using batch size: {batch_size}")
-        
-        postgres_loader.truncate_table(table_name)
-        postgres_loader.load_dataframe(df, table_name, batch_size=batch_size)
-        
+
+        # Batches are sized by bytes, so wide tables such as stg_wiserock__note
+        # automatically get fewer rows per batch than narrow ones.
+        sync_mode = sync_plan.get(table_name)
+        run_state.start_table(table_name, rows=start_offsets.get(table_name, 0))
+        on_commit = partial(run_state.record_batch, table_name) if supports_mid_table_resume(table_name) else None
+        if sync_mode == "incremental":
+            result = load_table(table_name, all_data[table_name], truncate=False, on_conflict="update",
+                                on_commit=on_commit)
+        else:
+            result = load_table(table_name, all_data[table_name], truncate=table_name not in start_offsets,
+                                on_commit=on_commit)
+        report_rejections(result)
+        print(f"    > Batch sizing for {table_name}: {postgres_loader.batch_sizer(table_name).summary()}")
+
+        if sync_mode:
+            if result.succeeded:
+                watermark = sync_state.compute_watermark(table_name, INCREMENTAL_COLUMNS[table_name])
+                sync_state.save(table_name, watermark, full_refresh=(sync_mode == "full"))
+            else:
+                print(f"    > WARNING: {result.failed_batches} batch(es) failed; watermark for {table_name} not advanced.")
+        if result.succeeded:
+            run_state.complete_table(table_name, result.rows)
+
+    run_tables([table_name for table_name in API_LOAD_ORDER if table_name in all_data], process)
     print("========== API PIPELINE COMPLETED ==========")
     logging.info("API Pipeline Completed")
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the CSV and API ETL pipelines.")
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Stream pages/chunks from the sources straight into the loader instead of "
+             "extracting every table up front."
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Reload every CSV source, even files unchanged since their last successful load."
+    )
+    parser.add_argument(
+        "--swap", action="store_true",
+        help="Load full reloads into a shadow table and swap it in atomically, "
+             "so readers never see an empty or partial table."
+    )
+    parser.add_argument(
+        "--bulk", action="store_true",
+        help="Drop secondary indexes and foreign keys during full reloads, then rebuild, "
+             "validate and ANALYZE each table once it is loaded."
+    )
+    parser.add_argument(
+        "--differential", action="store_true",
+        help="Upsert only new or changed rows (by row hash) for the tables in "
+             "DIFFERENTIAL_TABLES instead of truncating and reloading them."
+    )
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--record", action="store_true",
+        help="Record API pages to the on-disk cache (and reuse pages still within API_CACHE_TTL_HOURS)."
+    )
+    cache_mode.add_argument(
+        "--replay", action="store_true",
+        help="Run the API pipeline entirely from previously recorded pages, with no API calls."
+    )
+    parser.add_argument(
+        "--replay-dead-letters", nargs="*", metavar="TABLE",
+        help="Re-apply quarantined (dead-letter) rows for the given tables, or for all "
+             "tables with quarantined rows, instead of running the pipelines."
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Pull only rows newer than the stored watermark for time-series API tables "
+             "and upsert them instead of truncating and reloading."
+    )
+    parser.add_argument(
+        "--full-refresh", action="store_true",
+        help="With --incremental, force a full reload of every incremental table."
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue the last interrupted run from its checkpoint: skip completed tables "
+             "and pick up part-loaded API tables after their last committed batch."
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main entry point for the ETL application."""
+    args = parse_args(argv)
+    if args.swap:
+        settings.SWAP_LOADS = True
+    if args.bulk:
+        settings.BULK_LOADS = True
+    if args.differential:
+        settings.DIFFERENTIAL_LOADS = True
+    if args.record or args.replay:
+        api_extractor.cache.mode = "replay" if args.replay else "record"
+    if args.replay_dead_letters is not None:
+        replay_dead_letters(args.replay_dead_letters)
+        return
     print("=" * 60)
     print(f"              ETL PIPELINE EXECUTION STARTED at {datetime.now()}")
     print("=" * 60)
     logging.info("ETL Pipeline Execution Started")
 
+    resuming = run_state.begin(run_options(args), resume=args.resume)
+    api_extractor.on_page = run_state.record_page
     try:
-        # Extract all data first to control the load order
-        print("--- Extracting CSV data...")
-        csv_data = csv_extractor.extract_all()
-        print("--- Extracting API data...")
-        api_data = api_extractor.extract_all()
+        postgres_loader.restore_deferred_maintenance()
+        api_filters, sync_plan = plan_api_sync(args.full_refresh) if args.incremental else ({}, {})
+        csv_tables = csv_extractor.tables_to_load(force=args.force)
+        skipped, start_offsets = plan_resume(csv_tables, sync_plan) if resuming else (set(), {})
+        csv_tables = set(csv_tables) - skipped
+        api_tables = [table_name for table_name in API_LOAD_ORDER if table_name not in skipped]
+        passthrough = csv_passthrough_tables()
+        if passthrough:
+            print(f"--- CSV pass-through for: {', '.join(sorted(passthrough))}")
+
+        if args.stream:
+            # Lazy per-table generators; data is only read while each table loads.
+            print("--- Streaming mode: sources are read while loading.")
+            csv_data = csv_extractor.stream_all(chunksize=settings.CSV_CHUNK_SIZE, tables=csv_tables)
+            api_data = api_extractor.stream_all(filters=api_filters, csv_tables=passthrough,
+                                                tables=api_tables, start_offsets=start_offsets)
+        elif settings.TABLE_WORKERS > 1:
+            # Defer extraction to each table's task so extracts run concurrently too.
+            csv_data = {
+                table_name: partial(csv_extractor.extract_table, table_name)
+                for table_name in csv_tables
+            }
+            api_data = {
+                table_name: partial(
+                    api_extractor.csv_pages if table_name in passthrough else api_extractor.extract_table,
+                    table_name, api_filters.get(table_name), start_offsets.get(table_name, 0),
+                )
+                for table_name in api_tables
+            }
+        else:
+            # Extract all data first to control the load order
+            print("--- Extracting CSV data...")
+            csv_data = csv_extractor.extract_all(tables=csv_tables)
+            print("--- Extracting API data...")
+            api_data = api_extractor.extract_all(filters=api_filters, csv_tables=passthrough,
+                                                 tables=api_tables, start_offsets=start_offsets)
         
-        #run_csv_pipeline(csv_data)
-        run_api_pipeline(api_data)
+        run_csv_pipeline(csv_data)
+        run_api_pipeline(api_data, sync_plan, start_offsets)
         
         logging.info("ETL Pipeline Execution Finished Successfully")
+        print(f"--- Connection pool: {pool_metrics.summary()}")
+        if api_extractor.cache.enabled:
+            print(f"--- API cache: {api_extractor.cache.summary()}")
+        logging.info(f"Connection pool metrics: {pool_metrics.summary()}")
     except Exception as error:
         logging.error(f"ETL pipeline failed: {error}", exc_info=True)
         print(f"[FATAL ERROR] ETL pipeline failed: {error}")
+        run_state.finish(success=False)
+        report_data_quality()
+        telemetry.finish(success=False)
         raise
 
+    run_state.finish(success=True)
+    report_data_quality()
+    telemetry.finish(success=True)
+
     print("=" * 60)
     print(f"              ETL PIPELINE EXECUTION FINISHED at {datetime.now()}")
     print("=" * 60)
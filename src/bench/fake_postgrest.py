@@ -0,0 +1,351 @@
+"""
+A local stand-in for the Supabase API (GoTrue auth + PostgREST), for
+exercising and benchmarking `ApiExtractor` offline.
+
+It serves synthetic data for every endpoint in `ENDPOINT_TO_TABLE_MAP`
+(generated from the migration-defined tables, see `src/bench/synthetic.py`)
+and implements the parts of PostgREST the extractor relies on:
+
+- `POST /auth/v1/token?grant_type=password` returns a bearer token that
+  expires after `token_ttl` seconds (requests with an expired token get 401).
+- `GET /rest/v1/<endpoint>` honours `Range`, answers with `Content-Range`
+  (with the exact total only under `Prefer: count=exact`), and supports
+  `col=op.value` filters (eq, gt, gte, lt, lte), `or=(...)`/`and=(...)` logic
+  trees (as used by keyset pagination), `select`, `order`, `limit` and
+  `offset`. Pages are JSON, or CSV under `Accept: text/csv` (gzip-compressed
+  when the client accepts it).
+
+Faults can be injected: latency, throttling (429 with `Retry-After`), 5xx
+errors and token expiry.
+
+    python -m src.bench.fake_postgrest --port 8765 --rows 200000 --error-rate 0.01
+    API_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import argparse
+import gzip
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from src.bench.synthetic import ancestors, generate_table
+from src.etl.api_extractor import ENDPOINT_TO_TABLE_MAP
+from src.etl.catalog import get_metadata
+
+FILTER_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+}
+RESERVED_PARAMS = {"select", "order", "limit", "offset"}
+LOGIC_OPERATORS = {"and", "or"}
+RANGE_PATTERN = re.compile(r"^(\d+)-(\d*)$")
+
+
+class FakePostgrest:
+    """
+    A threaded fake Supabase/PostgREST server.
+
+    Args:
+        rows: Rows served per endpoint, either one number for all endpoints
+            or a dict keyed by endpoint name (missing endpoints get `default_rows`).
+        latency_ms: Mean added latency per request (uniform jitter of +/-50%).
+        error_rate: Fraction of data requests answered with a 503.
+        throttle_rate: Fraction of data requests answered with a 429 and `Retry-After`.
+        token_ttl: Seconds an access token stays valid.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rows=10000, default_rows: int = 10000,
+                 latency_ms: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: int = 1, token_ttl: float = 3600.0, seed: int = 42):
+        self.rows = rows if isinstance(rows, dict) else {endpoint: rows for endpoint in ENDPOINT_TO_TABLE_MAP}
+        self.default_rows = default_rows
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.token_ttl = token_ttl
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._tokens: Dict[str, float] = {}
+        self._data: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "auth": 0, "throttled": 0, "errors": 0, "expired": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakePostgrest":
+        """Serves in a background thread; returns self so it can be chained."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def _rows_for(self, endpoint: str) -> int:
+        return self.rows.get(endpoint, self.default_rows)
+
+    def table_data(self, endpoint: str) -> pd.DataFrame:
+        """The endpoint's full synthetic dataset, generated on first use."""
+        with self._lock:
+            if endpoint not in self._data:
+                table_rows = {table: self._rows_for(endpoint_name) for endpoint_name, table in ENDPOINT_TO_TABLE_MAP.items()}
+                table = get_metadata().tables[ENDPOINT_TO_TABLE_MAP[endpoint]]
+                # FK values only point at rows the parent endpoint actually serves.
+                parents = {parent.name: table_rows.get(parent.name, self.default_rows) for parent in ancestors(table)}
+                chunks = list(generate_table(table, table_rows[table.name], parents, self.seed))
+                self._data[endpoint] = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            return self._data[endpoint]
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def issue_token(self) -> Tuple[str, float]:
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens[token] = time.time() + self.token_ttl
+        self._count("auth")
+        return token, self.token_ttl
+
+    def token_valid(self, authorization: Optional[str]) -> bool:
+        if not authorization or not authorization.startswith("Bearer "):
+            return False
+        with self._lock:
+            expires = self._tokens.get(authorization[len("Bearer "):])
+        return expires is not None and time.time() < expires
+
+    @staticmethod
+    def _typed(column: pd.Series, value: str):
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return pd.Timestamp(value)
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            return float(value)
+        return value
+
+    def _condition(self, df: pd.DataFrame, name: str, expression: str) -> pd.Series:
+        """Boolean mask of one filter: `col=op.value`, or a logic tree such as `or=(a.gt.1,and(...))`."""
+        if name in LOGIC_OPERATORS:
+            if not (expression.startswith("(") and expression.endswith(")")):
+                raise ValueError(f"Unsupported filter {name}={expression}")
+            masks = []
+            for term in _split_terms(expression[1:-1]):
+                head, _, rest = term.partition("(")
+                if head in LOGIC_OPERATORS and term.endswith(")"):
+                    masks.append(self._condition(df, head, "(" + rest))
+                else:
+                    column, _, condition = term.partition(".")
+                    masks.append(self._condition(df, column, condition))
+            combined = masks[0]
+            for mask in masks[1:]:
+                combined = (combined | mask) if name == "or" else (combined & mask)
+            return combined
+        operator, _, value = expression.partition(".")
+        if name not in df.columns or operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter {name}={expression}")
+        return FILTER_OPERATORS[operator](df[name], self._typed(df[name], value)).fillna(False).astype(bool)
+
+    def query(self, endpoint: str, params: Dict[str, Union[str, List[str]]]) -> pd.DataFrame:
+        """Applies PostgREST-style filters, ordering, limit and offset. Repeated filters all apply."""
+        df = self.table_data(endpoint)
+        for name, expressions in params.items():
+            if name in RESERVED_PARAMS:
+                continue
+            for expression in expressions if isinstance(expressions, list) else [expressions]:
+                df = df[self._condition(df, name, expression)]
+        if "order" in params:
+            columns, ascending = [], []
+            for term in params["order"].split(","):
+                column, _, direction = term.partition(".")
+                columns.append(column)
+                ascending.append(not direction.startswith("desc"))
+            df = df.sort_values(columns, ascending=ascending, kind="stable")
+        if "select" in params and params["select"] != "*":
+            columns = params["select"].split(",")
+            missing = [column for column in columns if column not in df.columns]
+            if missing:
+                raise ValueError(f"Unknown columns in select: {missing}")
+            df = df[columns]
+        offset = int(params.get("offset", 0))
+        if offset or "limit" in params:
+            df = df.iloc[offset:offset + int(params["limit"])] if "limit" in params else df.iloc[offset:]
+        return df
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None,
+                      content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+                self._send(status, json.dumps(payload).encode("utf-8"), headers)
+
+            def _delay(self):
+                if server.latency_ms > 0:
+                    time.sleep(server.latency_ms / 1000 * (0.5 + server._random.random()))
+
+            def do_POST(self):
+                self._delay()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                path = urlsplit(self.path).path
+                if path != "/auth/v1/token":
+                    return self._send_json(404, {"message": f"Unknown route {path}"})
+                try:
+                    credentials = json.loads(body or b"{}")
+                except ValueError:
+                    credentials = {}
+                if not credentials.get("email") or not credentials.get("password"):
+                    return self._send_json(400, {"error": "invalid_grant"})
+                token, expires_in = server.issue_token()
+                self._send_json(200, {"access_token": token, "token_type": "bearer", "expires_in": expires_in})
+
+            def do_GET(self):
+                server._count("requests")
+                self._delay()
+                parts = urlsplit(self.path)
+                if not parts.path.startswith("/rest/v1/"):
+                    return self._send_json(404, {"message": f"Unknown route {parts.path}"})
+                endpoint = parts.path[len("/rest/v1/"):]
+                if endpoint not in ENDPOINT_TO_TABLE_MAP:
+                    return self._send_json(404, {"message": f"relation \"{endpoint}\" does not exist"})
+                if not server.token_valid(self.headers.get("Authorization")):
+                    server._count("expired")
+                    return self._send_json(401, {"code": "PGRST301", "message": "JWT expired"})
+                if server._roll(server.throttle_rate):
+                    server._count("throttled")
+                    return self._send_json(429, {"message": "Too many requests"},
+                                           {"Retry-After": str(server.retry_after)})
+                if server._roll(server.error_rate):
+                    server._count("errors")
+                    return self._send_json(503, {"message": "Service unavailable"})
+
+                values: Dict[str, List[str]] = {}
+                for name, value in parse_qsl(parts.query):
+                    values.setdefault(name, []).append(value)
+                params = {name: found[0] if len(found) == 1 else found for name, found in values.items()}
+                try:
+                    rows = server.query(endpoint, params)
+                except (ValueError, KeyError) as e:
+                    return self._send_json(400, {"message": str(e)})
+
+                total = len(rows)
+                start, end = 0, total - 1
+                match = RANGE_PATTERN.match(self.headers.get("Range", ""))
+                if match:
+                    start = int(match.group(1))
+                    if match.group(2):
+                        end = min(end, int(match.group(2)))
+                page = rows.iloc[start:end + 1]
+                count = str(total) if "count=exact" in (self.headers.get("Prefer") or "") else "*"
+                content_range = f"{start}-{start + len(page) - 1}/{count}" if len(page) else f"*/{count}"
+                status = 206 if len(page) < total else 200
+                headers = {"Content-Range": content_range}
+                if "text/csv" in (self.headers.get("Accept") or ""):
+                    content_type = "text/csv"
+                    body = page.to_csv(index=False).encode("utf-8")
+                else:
+                    content_type = "application/json"
+                    body = page.to_json(orient="records", date_format="iso").encode("utf-8")
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    headers["Content-Encoding"] = "gzip"
+                self._send(status, body, headers, content_type)
+
+        return Handler
+
+
+def _split_terms(text: str) -> List[str]:
+    """Splits a logic tree body on its top-level commas, respecting parentheses and double quotes."""
+    terms, depth, quoted, current = [], 0, False, []
+    previous = ""
+    for char in text:
+        if char == '"' and previous != "\\":
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            terms.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+        previous = char
+    terms.append("".join(current))
+    return terms
+
+
+def parse_rows(value: str):
+    """Parses `--rows`: one number for every endpoint, or endpoint=n pairs."""
+    if "=" not in value:
+        return int(value)
+    return {name: int(count) for name, count in (pair.split("=") for pair in value.split(","))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local fake of the Supabase auth and PostgREST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows", type=parse_rows, default=10000,
+                        help="Rows per endpoint, e.g. 100000 or wiserock_note=50000,wellview_job=1000.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests throttled with 429.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s.")
+    parser.add_argument("--token-ttl", type=float, default=3600.0, help="Seconds before an access token expires.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    server = FakePostgrest(args.host, args.port, rows=args.rows, latency_ms=args.latency_ms,
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                           retry_after=args.retry_after, token_ttl=args.token_ttl, seed=args.seed)
+    print(f"Fake PostgREST listening on {server.url} (set API_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Loader benchmark suite.
+
+Loads synthetic data for the staging tables (see `src/bench/synthetic.py`)
+into a throwaway PostgreSQL schema with every requested load method and
+batch size, at several data scales. It reports rows/s, MB/s, peak memory
+and batch-commit latency percentiles. Results are saved as JSON together
+with the git commit they were measured at, so runs can be compared across
+commits:
+
+    python -m src.bench.run --dsn postgresql://postgres@localhost/bench
+    python -m src.bench.run --scales 10k,1m --compare bench_results/<earlier>.json
+
+Point --dsn (or BENCH_DATABASE_URL) at a local scratch database: the
+benchmark schema is dropped and re-created for every scale.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, text
+
+from src.bench.synthetic import ancestors, generate_table
+from src.config import settings
+from src.etl.batching import estimate_row_bytes
+from src.etl.catalog import get_metadata
+from src.etl.loader import LOAD_METHODS, PostgresLoader
+from src.etl.telemetry import telemetry
+
+DEFAULT_TABLES = ["stg_wiserock__note", "stg_pro_count__completiondailytb", "stg_pro_count__completiontb"]
+DEFAULT_SCALES = "10k,1m,10m"
+RESULTS_DIR = settings.ROOT_DIR / "bench_results"
+
+
+def parse_scale(value: str) -> int:
+    """Parses row counts such as "10k", "1m" or "2500"."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def parent_size(rows: int) -> int:
+    """Rows generated for each referenced (parent) table of a benchmarked table."""
+    return max(100, rows // 100)
+
+
+def git_revision() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=settings.ROOT_DIR, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, cwd=settings.ROOT_DIR).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def reset_schema(dsn: str, schema: str):
+    """Drops and re-creates the benchmark schema with every migration-defined table."""
+    engine = create_engine(dsn)
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    with engine.begin() as connection:
+        get_metadata().create_all(connection.execution_options(schema_translate_map={None: schema}))
+        # Partitioned tables need a partition to accept rows; the loader adds monthly ones as it goes.
+        for table in get_metadata().tables.values():
+            if table.dialect_options["postgresql"]["partition_by"]:
+                connection.execute(text(
+                    f'CREATE TABLE "{schema}"."{table.name}_default" PARTITION OF "{schema}"."{table.name}" DEFAULT'
+                ))
+    engine.dispose()
+
+
+def load_parents(dsn: str, schema: str, table_name: str, rows: int, seed: int):
+    """Loads (unmeasured) parent rows so that the benchmarked table's FKs are satisfied."""
+    engine = create_engine(dsn)
+    loader = PostgresLoader(engine=engine, schema=schema, method="copy")
+    table = get_metadata().tables[table_name]
+    parents = ancestors(table)
+    sizes = {parent.name: parent_size(rows) for parent in parents}
+    for parent in parents:
+        with engine.connect() as connection:
+            loaded = connection.execute(text(f'SELECT COUNT(*) FROM "{schema}"."{parent.name}"')).scalar()
+        if loaded == sizes[parent.name]:
+            continue
+        loader.truncate_table(parent.name)
+        loader.load_stream(generate_table(parent, sizes[parent.name], sizes, seed), parent.name)
+    engine.dispose()
+    return sizes
+
+
+def run_case(dsn: str, schema: str, table_name: str, rows: int, method: str,
+             batch_size: Optional[int], parent_rows: Dict[str, int], seed: int) -> Dict:
+    """
+    Runs one benchmark case. It is executed in a fresh child process so that
+    the peak RSS it reports belongs to this case alone.
+    """
+    from src.etl.telemetry import peak_rss_bytes
+
+    telemetry.jsonl_path = None
+    engine = create_engine(dsn)
+    loader = PostgresLoader(engine=engine, schema=schema, method=method)
+    loader.truncate_table(table_name)
+    table = get_metadata().tables[table_name]
+
+    generation = {"seconds": 0.0, "bytes": 0}
+
+    def timed_chunks():
+        # Time spent generating data is excluded from the load time.
+        chunks = generate_table(table, rows, parent_rows, seed)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                generation["bytes"] += int(estimate_row_bytes(chunk) * len(chunk))
+            generation["seconds"] += time.perf_counter() - started
+            if chunk is None:
+                return
+            yield chunk
+
+    rss_before = peak_rss_bytes()
+    started = time.perf_counter()
+    result = loader.load_stream(timed_chunks(), table_name, batch_size=batch_size)
+    seconds = time.perf_counter() - started - generation["seconds"]
+    engine.dispose()
+
+    latencies = telemetry.percentiles(table_name, "batch_commit")
+    return {
+        "table": table_name,
+        "scale": rows,
+        "method": method,
+        "batch_size": batch_size or "adaptive",
+        "rows": result.rows,
+        "batches": result.batches,
+        "failed_batches": result.failed_batches,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(result.rows / seconds, 1) if seconds else 0.0,
+        "mb_per_s": round(generation["bytes"] / 1e6 / seconds, 2) if seconds else 0.0,
+        "peak_rss_mb": round(peak_rss_bytes() / 1e6, 1),
+        "rss_before_mb": round(rss_before / 1e6, 1),
+        **{f"{name}_ms": round(value * 1000, 1) for name, value in latencies.items()},
+    }
+
+
+def print_results(results: List[Dict], baseline: Optional[Dict] = None):
+    def case_key(result):
+        return (result["table"], result["scale"], result["method"], str(result["batch_size"]))
+
+    previous = {case_key(result): result for result in (baseline or {}).get("results", [])}
+    header = (f"{'table':<34} {'scale':>9} {'method':<12} {'batch':>9} {'rows/s':>10} {'MB/s':>7} "
+              f"{'RSS MB':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    if previous:
+        header += f" {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (f"{result['table'][:34]:<34} {result['scale']:>9} {result['method']:<12} {str(result['batch_size']):>9} "
+                f"{result['rows_per_s']:>10.0f} {result['mb_per_s']:>7.1f} {result['peak_rss_mb']:>7.0f} "
+                f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+        before = previous.get(case_key(result))
+        if before and before["rows_per_s"]:
+            line += f" {100 * (result['rows_per_s'] / before['rows_per_s'] - 1):>+7.1f}%"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PostgresLoader strategies on synthetic data.")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL"),
+                        help="SQLAlchemy URL of a scratch PostgreSQL database (default: $BENCH_DATABASE_URL).")
+    parser.add_argument("--schema", default="bench", help="Throwaway schema to load into (dropped on every scale).")
+    parser.add_argument("--tables", default=",".join(DEFAULT_TABLES), help="Comma-separated staging tables.")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma-separated row counts, e.g. 10k,1m,10m.")
+    parser.add_argument("--methods", default=",".join(LOAD_METHODS), help="Comma-separated load methods.")
+    parser.add_argument("--batch-sizes", default="adaptive,5000",
+                        help='Comma-separated batch sizes; "adaptive" uses byte-budgeted batches.')
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data generator.")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results (default: bench_results/).")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare rows/s against.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    telemetry.jsonl_path = telemetry.prometheus_path = None
+    if not args.dsn:
+        raise SystemExit("Set --dsn or BENCH_DATABASE_URL to a scratch PostgreSQL database.")
+    if args.schema == settings.DB_SCHEMA:
+        raise SystemExit(f"Refusing to benchmark into the pipeline's own schema '{settings.DB_SCHEMA}'.")
+
+    tables = [name.strip() for name in args.tables.split(",") if name.strip()]
+    scales = [parse_scale(value) for value in args.scales.split(",")]
+    methods = [name.strip() for name in args.methods.split(",")]
+    batch_sizes = [None if value.strip() == "adaptive" else int(value) for value in args.batch_sizes.split(",")]
+
+    run = {
+        **git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "seed": args.seed,
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": [],
+    }
+    with create_engine(args.dsn).connect() as connection:
+        run["postgres"] = connection.execute(text("SHOW server_version")).scalar()
+
+    spawn = multiprocessing.get_context("spawn")
+    for rows in scales:
+        print(f"\n=== Scale {rows} rows ===")
+        reset_schema(args.dsn, args.schema)
+        for table_name in tables:
+            parent_rows = load_parents(args.dsn, args.schema, table_name, rows, args.seed)
+            for method in methods:
+                for batch_size in batch_sizes:
+                    print(f"--> {table_name}: {method}, batch size {batch_size or 'adaptive'}")
+                    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                        result = executor.submit(run_case, args.dsn, args.schema, table_name, rows, method,
+                                                 batch_size, parent_rows, args.seed).result()
+                    run["results"].append(result)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y-%m-%d_%H-%M-%S}_{(run['commit'] or 'unknown')[:10]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(run, indent=2))
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print()
+    print_results(run["results"], baseline)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
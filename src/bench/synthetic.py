@@ -0,0 +1,171 @@
+import string
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+# Composite keys are laid out as (index // KEY_BLOCK, index % KEY_BLOCK), so
+# every row index maps to one unique key tuple and FK values can be derived
+# from a sampled parent index alone.
+KEY_BLOCK = 1000
+NULL_FRACTION = 0.05
+BASE_TIMESTAMP = pd.Timestamp("2015-01-01")
+TEXT_COLUMNS = {"note_text"}
+
+
+def _rng(seed: int, table_name: str, chunk: int) -> np.random.Generator:
+    """A generator that depends only on the seed, the table and the chunk, so data is reproducible."""
+    return np.random.default_rng([seed, zlib.crc32(table_name.encode()), chunk])
+
+
+def _word_pool(rng: np.random.Generator, size: int, min_length: int, max_length: int) -> np.ndarray:
+    alphabet = np.array(list(string.ascii_letters + string.digits + " "))
+    lengths = rng.integers(min_length, max_length + 1, size)
+    return np.array(["".join(rng.choice(alphabet, length)) for length in lengths], dtype=object)
+
+
+def _text_pool(rng: np.random.Generator, size: int = 256) -> np.ndarray:
+    """
+    Free-text values with a long-tailed length distribution (median ~1 KB,
+    up to 32 KB) that include tabs, newlines and backslashes, so COPY
+    escaping is exercised the way real notes exercise it.
+    """
+    lengths = np.clip(rng.lognormal(mean=7.0, sigma=1.0, size=size), 16, 32768).astype(int)
+    words = _word_pool(rng, 512, 2, 12)
+    texts = []
+    for length in lengths:
+        text = " ".join(rng.choice(words, max(1, length // 7)))
+        texts.append(text[:length].replace("  ", "\n", 1).replace(" a", "\t", 1) + "\\")
+    return np.array(texts, dtype=object)
+
+
+def key_values(column_type: sa.types.TypeEngine, index: np.ndarray, position: int = 0,
+               width: int = 1) -> pd.Series:
+    """
+    Deterministic key values for row indexes. Column `position` of a
+    `width`-column key takes its part of the composite layout.
+    """
+    if width > 1:
+        index = index % KEY_BLOCK if position == width - 1 else index // KEY_BLOCK
+    values = pd.Series(index)
+    if isinstance(column_type, sa.Integer):
+        return (values + 1).astype("Int64")
+    if isinstance(column_type, sa.Uuid):
+        return "00000000-0000-4000-8000-" + values.map("{:012x}".format)
+    if isinstance(column_type, sa.DateTime):
+        return BASE_TIMESTAMP + pd.to_timedelta(values, unit="s")
+    if isinstance(column_type, sa.Date):
+        return BASE_TIMESTAMP + pd.to_timedelta(values, unit="D")
+    if isinstance(column_type, (sa.Numeric, sa.Float)):
+        return values.astype("float64")
+    return ("K" + values.astype(str)).astype("string")
+
+
+def _skewed_indexes(rng: np.random.Generator, parent_rows: int, size: int) -> np.ndarray:
+    """Parent row indexes with a skewed (power-law-like) distribution: a few parents get most children."""
+    return np.minimum((parent_rows * rng.random(size) ** 3).astype(np.int64), parent_rows - 1)
+
+
+def _value_column(column: sa.Column, rng: np.random.Generator, size: int, pools: Dict) -> pd.Series:
+    column_type = column.type
+    if isinstance(column_type, sa.Boolean):
+        values = pd.Series(rng.random(size) < 0.5, dtype="boolean")
+    elif isinstance(column_type, sa.BigInteger):
+        values = pd.Series(rng.integers(10 ** 9, 10 ** 14, size), dtype="Int64")
+    elif isinstance(column_type, sa.Integer):
+        values = pd.Series(rng.integers(0, 100000, size), dtype="Int64")
+    elif isinstance(column_type, (sa.Numeric, sa.Float)):
+        scale = getattr(column_type, "scale", None) or 4
+        precision = getattr(column_type, "precision", None)
+        limit = 10.0 ** min(8, (precision - scale) if precision else 8)
+        values = pd.Series(np.round(rng.normal(0, limit / 10, size).clip(-limit + 1, limit - 1), scale))
+    elif isinstance(column_type, sa.DateTime):
+        values = pd.Series(BASE_TIMESTAMP + pd.to_timedelta(rng.integers(0, 10 * 365 * 86400, size), unit="s"))
+    elif isinstance(column_type, sa.Date):
+        values = pd.Series(BASE_TIMESTAMP + pd.to_timedelta(rng.integers(0, 10 * 365, size), unit="D"))
+    elif isinstance(column_type, sa.Uuid):
+        high, low = rng.integers(0, 2 ** 62, size), rng.integers(0, 2 ** 62, size)
+        hex_values = pd.Series(high).map("{:016x}".format) + pd.Series(low).map("{:016x}".format)
+        values = (hex_values.str[:8] + "-" + hex_values.str[8:12] + "-" + hex_values.str[12:16]
+                  + "-" + hex_values.str[16:20] + "-" + hex_values.str[20:])
+    elif column.name in TEXT_COLUMNS or isinstance(column_type, sa.Text):
+        values = pd.Series(pools["text"][rng.integers(0, len(pools["text"]), size)], dtype="string")
+    else:
+        max_length = min(getattr(column_type, "length", None) or 24, 24)
+        if max_length not in pools:
+            pools[max_length] = _word_pool(pools["rng"], 1000, 1, max_length)
+        pool = pools[max_length]
+        values = pd.Series(pool[rng.integers(0, len(pool), size)], dtype="string")
+
+    if column.nullable:
+        values = values.mask(rng.random(size) < NULL_FRACTION)
+    return values
+
+
+def generate_table(table: sa.Table, rows: int, parent_rows: Optional[Dict[str, int]] = None,
+                   seed: int = 42, chunk_rows: int = 100000) -> Iterator[pd.DataFrame]:
+    """
+    Yields synthetic chunks for a staging table, matching its column types.
+
+    - Primary keys are unique and deterministic (see `key_values`).
+    - Foreign keys reference existing parent rows (`parent_rows` gives each
+      parent's size) with a skewed distribution, so hot parents exist.
+    - Non-key columns draw from realistic pools: bounded-cardinality
+      strings, long free-text notes, dates within ten years, etc.
+
+    The same (table, rows, seed) always produces the same data, in chunks of
+    `chunk_rows`, so even 10M-row tables are generated in bounded memory.
+    """
+    parent_rows = parent_rows or {}
+    primary_key = [column.name for column in table.primary_key.columns]
+    fk_columns = {}
+    for fk in table.foreign_key_constraints:
+        parent = fk.referred_table
+        if parent.name not in parent_rows:
+            continue
+        referred = [element.column for element in fk.elements]
+        parent_key = [column.name for column in parent.primary_key.columns]
+        for local, remote in zip(fk.column_keys, referred):
+            fk_columns[local] = (parent.name, remote, parent_key.index(remote.name), len(parent_key))
+
+    # Value pools are drawn once per table from their own generator.
+    pool_rng = _rng(seed, table.name, 0)
+    pools = {"rng": pool_rng, "text": _text_pool(pool_rng)}
+    for chunk_number, start in enumerate(range(0, rows, chunk_rows)):
+        size = min(chunk_rows, rows - start)
+        rng = _rng(seed, table.name, chunk_number + 1)
+        index = np.arange(start, start + size, dtype=np.int64)
+        parent_indexes: Dict[str, np.ndarray] = {}
+        columns: Dict[str, pd.Series] = {}
+        for column in table.columns:
+            if column.name in primary_key and column.name not in fk_columns:
+                columns[column.name] = key_values(column.type, index, primary_key.index(column.name), len(primary_key))
+            elif column.name in fk_columns:
+                parent_name, remote, position, width = fk_columns[column.name]
+                if parent_name not in parent_indexes:
+                    parent_indexes[parent_name] = _skewed_indexes(rng, parent_rows[parent_name], size)
+                values = key_values(remote.type, parent_indexes[parent_name], position, width)
+                if column.nullable:
+                    values = values.mask(rng.random(size) < NULL_FRACTION)
+                columns[column.name] = values
+            else:
+                columns[column.name] = _value_column(column, rng, size, pools)
+        yield pd.DataFrame({name: series.reset_index(drop=True) for name, series in columns.items()})
+
+
+def ancestors(table: sa.Table) -> List[sa.Table]:
+    """All tables `table` references through FKs, directly or transitively, parents first."""
+    ordered: List[sa.Table] = []
+
+    def visit(current: sa.Table):
+        for fk in current.foreign_key_constraints:
+            parent = fk.referred_table
+            if parent is current or parent in ordered:
+                continue
+            visit(parent)
+            ordered.append(parent)
+
+    visit(table)
+    return ordered
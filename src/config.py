@@ -33,6 +33,15 @@ class Settings:
     # now using the safely encoded password.
     DATABASE_URL: str = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+    # Connection pool. DB_POOL_MODE is "queue" (pooled, the default) or "null"
+    # (a new connection per operation). The pool is sized up automatically to
+    # cover TABLE_WORKERS concurrent loads of up to LOAD_WORKERS connections each.
+    DB_POOL_MODE: str = os.getenv("DB_POOL_MODE", "queue").lower()
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 2))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
     # Project Directories
     # This robustly defines the root directory of the project.
     ROOT_DIR = Path(__file__).parent.parent
@@ -44,8 +53,125 @@ class Settings:
     API_EMAIL: str = os.getenv("API_EMAIL")
     API_PASSWORD: str = os.getenv("API_PASSWORD")
 
+    # Checkpoint of the current run (completed tables, committed rows per
+    # table, last fetched page per endpoint), used by `--resume`.
+    RUN_STATE_PATH = Path(os.getenv("RUN_STATE_PATH", str(DATA_DIR / ".run_state.json")))
+    # Fetched pages are checkpointed every this many pages or seconds, whichever comes first.
+    RUN_STATE_PAGE_INTERVAL = int(os.getenv("RUN_STATE_PAGE_INTERVAL", 100))
+    RUN_STATE_PAGE_SECONDS = float(os.getenv("RUN_STATE_PAGE_SECONDS", 10))
+
+    # Telemetry: per-stage metrics are appended as JSON lines under METRICS_DIR
+    # and the last run's totals are written in Prometheus text format to
+    # METRICS_TEXTFILE (point it into node_exporter's textfile directory).
+    METRICS_DIR = Path(os.getenv("METRICS_DIR", str(ROOT_DIR / "logs")))
+    METRICS_TEXTFILE = Path(os.getenv("METRICS_TEXTFILE", str(ROOT_DIR / "logs" / "etl_metrics.prom")))
+
+    # Loader Settings
+    # LOAD_METHOD selects the bulk-load strategy: "copy" (default), "copy_binary" or "insert".
+    LOAD_METHOD: str = os.getenv("LOAD_METHOD", "copy").lower()
+    # Adaptive batch sizing: each batch targets LOAD_BATCH_BYTES of serialized
+    # data and is resized toward LOAD_BATCH_TARGET_SECONDS per commit, within
+    # [LOAD_BATCH_MIN_ROWS, LOAD_BATCH_MAX_ROWS] rows.
+    LOAD_BATCH_BYTES = int(os.getenv("LOAD_BATCH_BYTES", 8 * 1024 * 1024))
+    LOAD_BATCH_TARGET_SECONDS = float(os.getenv("LOAD_BATCH_TARGET_SECONDS", 2.0))
+    LOAD_BATCH_MIN_ROWS = int(os.getenv("LOAD_BATCH_MIN_ROWS", 100))
+    LOAD_BATCH_MAX_ROWS = int(os.getenv("LOAD_BATCH_MAX_ROWS", 50000))
+    # Failed batches: transient errors are retried with exponential backoff and
+    # jitter; rows rejected for bad data are quarantined in DEAD_LETTER_DIR.
+    LOAD_RETRY_BASE_SECONDS = float(os.getenv("LOAD_RETRY_BASE_SECONDS", 1.0))
+    LOAD_RETRY_MAX_SECONDS = float(os.getenv("LOAD_RETRY_MAX_SECONDS", 30.0))
+    # Intra-table parallel loads: DataFrames of PARALLEL_LOAD_TABLES are split
+    # by primary-key hash into LOAD_WORKERS partitions, each loaded over its own
+    # pooled connection. Only tables without self-referencing FKs qualify.
+    LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", 1))
+    PARALLEL_LOAD_TABLES = [
+        name.strip() for name in os.getenv(
+            "PARALLEL_LOAD_TABLES",
+            "stg_wellview__surveypoint,stg_pro_count__completiondailytb,stg_aries__daily_capacities",
+        ).split(",") if name.strip()
+    ]
+    # Pre-load key validation: rows with duplicate primary keys or foreign keys
+    # missing from the parent are routed to the dead-letter store before loading.
+    VALIDATE_KEYS = os.getenv("VALIDATE_KEYS", "true").lower() == "true"
+    DEAD_LETTER_DIR = Path(os.getenv("DEAD_LETTER_DIR", str(DATA_DIR / "dead_letter")))
+    # SWAP_LOADS loads full reloads into a shadow table and swaps it in atomically.
+    SWAP_LOADS = os.getenv("SWAP_LOADS", "false").lower() == "true"
+    # BULK_LOADS drops secondary indexes and FKs before a full reload and rebuilds
+    # them afterwards (BULK_INDEX_WORKERS indexes at a time), then validates and
+    # analyzes. Dropped definitions are kept in DEFERRED_DDL_DIR until rebuilt.
+    BULK_LOADS = os.getenv("BULK_LOADS", "false").lower() == "true"
+    BULK_INDEX_WORKERS = int(os.getenv("BULK_INDEX_WORKERS", 2))
+    # Tables range-partitioned by month (see the alembic migrations) are fully
+    # reloaded one partition at a time; partitions are created this many months ahead.
+    PARTITION_PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", 3))
+    DEFERRED_DDL_DIR = Path(os.getenv("DEFERRED_DDL_DIR", str(DATA_DIR / ".deferred_ddl")))
+
+    # Base URL of the Supabase project (auth + PostgREST). Point it at a local
+    # fake (`python -m src.bench.fake_postgrest`) to test extraction offline.
+    API_BASE_URL: str = os.getenv("API_BASE_URL", "https://qlqetcqgadxcicwfzxpw.supabase.co")
+
+    # API pagination: CHUNK_SIZE is the page size of each `Range` request.
+    # With USE_PARALLEL, pages after the first are fetched by API_MAX_WORKERS threads.
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 1000))
     USE_PARALLEL = os.getenv("USE_PARALLEL", "false").lower() == "true"
+    API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", 4))
+    # HTTP transport: connect/read timeouts (seconds) and attempts per request.
+    # 5xx responses and connection errors are retried with exponential backoff
+    # (API_RETRY_BASE_SECONDS doubling up to API_RETRY_MAX_SECONDS); 429s wait
+    # for the server's Retry-After instead.
+    API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 10))
+    API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 60))
+    API_RETRIES = int(os.getenv("API_RETRIES", 5))
+    API_RETRY_BASE_SECONDS = float(os.getenv("API_RETRY_BASE_SECONDS", 1))
+    API_RETRY_MAX_SECONDS = float(os.getenv("API_RETRY_MAX_SECONDS", 60))
+    # "offset" pages with growing `Range` offsets; "keyset" orders each endpoint
+    # by its primary key and asks for the rows after the last key seen, so
+    # per-page cost stays flat on large tables (pages are then fetched sequentially).
+    API_PAGINATION: str = os.getenv("API_PAGINATION", "offset").lower()
+
+    # API tables fetched as gzip-compressed CSV and streamed straight into
+    # COPY, without building DataFrames. Only used for tables whose columns
+    # PostgreSQL parses the same way as the type coercion (numeric, UUID and
+    # text), and not with --swap, --differential or the API cache.
+    CSV_PASSTHROUGH_TABLES = [
+        name.strip() for name in os.getenv("CSV_PASSTHROUGH_TABLES", "").split(",") if name.strip()
+    ]
+
+    # On-disk API page cache: "off" (default), "record" (serve fresh pages from
+    # the cache, fetch and store the rest) or "replay" (cache only, no network).
+    API_CACHE_MODE: str = os.getenv("API_CACHE_MODE", "off").lower()
+    API_CACHE_DIR = Path(os.getenv("API_CACHE_DIR", str(DATA_DIR / ".api_cache")))
+    API_CACHE_TTL_HOURS = float(os.getenv("API_CACHE_TTL_HOURS", 24))
+    API_CACHE_MAX_MB = int(os.getenv("API_CACHE_MAX_MB", 512))
+
+    # Number of tables extracted and loaded concurrently by the FK-aware
+    # scheduler. 1 keeps the original one-table-at-a-time load order.
+    TABLE_WORKERS = int(os.getenv("TABLE_WORKERS", 1))
+
+    # Incremental sync: force a full refresh of each incremental table after
+    # this many days (0 disables the periodic fallback).
+    SYNC_FULL_REFRESH_DAYS = int(os.getenv("SYNC_FULL_REFRESH_DAYS", 7))
+
+    # Differential loads (`main.py --differential`): these tables are upserted
+    # row-by-hash instead of truncated and reloaded. Deleting target rows that
+    # are missing from the source is destructive, so it is opt-in
+    # (DIFFERENTIAL_DELETE=true).
+    DIFFERENTIAL_LOADS = os.getenv("DIFFERENTIAL_LOADS", "false").lower() == "true"
+    DIFFERENTIAL_TABLES = [
+        name.strip() for name in os.getenv(
+            "DIFFERENTIAL_TABLES",
+            "stg_wellview__wellheader,stg_wiserock__user,stg_aries__ac_property",
+        ).split(",") if name.strip()
+    ]
+    DIFFERENTIAL_DELETE = os.getenv("DIFFERENTIAL_DELETE", "false").lower() == "true"
+
+    # Columns missing from the target table: "drop" them with a warning, or "error".
+    UNKNOWN_COLUMNS: str = os.getenv("UNKNOWN_COLUMNS", "drop").lower()
+
+    # Rows per chunk when CSV files are read in streaming mode (`main.py --stream`).
+    CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", 50000))
+    # CSV parser backend: "auto" (pyarrow when installed), "pyarrow" or "c".
+    CSV_ENGINE: str = os.getenv("CSV_ENGINE", "auto").lower()
 
 
     def __init__(self):
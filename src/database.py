@@ -1,12 +1,76 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 
 # Import the settings object from our config module.
 # This is how we access the DATABASE_URL we defined earlier.
 from src.config import settings
 
-def get_engine() -> Engine:
+
+class PoolMetrics:
+    """
+    Thread-safe counters for connection pool usage.
+
+    `wait` is the time a caller spent inside the pool's checkout, which
+    includes waiting for a free connection and, when the pool grows, the
+    TCP + TLS + auth handshake of a new connection.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "total_wait_s": round(self.total_wait, 4),
+                "avg_wait_s": round(self.total_wait / self.checkouts, 4) if self.checkouts else 0.0,
+                "max_wait_s": round(self.max_wait, 4),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """A QueuePool that records how long each checkout waits."""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_checkout(time.perf_counter() - start)
+
+
+def pool_size() -> int:
+    """
+    The pool is never smaller than the number of connections loading at once,
+    TABLE_WORKERS tables of up to LOAD_WORKERS partitions (or BULK_INDEX_WORKERS
+    index builds) each, plus one connection for truncates and bookkeeping queries.
+    """
+    per_table = max(settings.LOAD_WORKERS, settings.BULK_INDEX_WORKERS if settings.BULK_LOADS else 1, 1)
+    return max(settings.DB_POOL_SIZE, settings.TABLE_WORKERS * per_table + 1)
+
+
+def create_db_engine() -> Engine:
     """
     Creates and returns a SQLAlchemy database engine.
 
@@ -14,6 +78,12 @@ def get_engine() -> Engine:
     It's the central source of connections to a particular database,
     providing both a factory and a pool of connections.
 
+    With DB_POOL_MODE="queue" (the default), connections are kept alive and
+    reused, so each truncate and table load no longer pays a full TCP + TLS +
+    auth handshake. Stale connections are detected with a pre-ping and
+    recycled after DB_POOL_RECYCLE seconds. DB_POOL_MODE="null" restores
+    the previous connection-per-operation behaviour.
+
     Returns:
         Engine: A SQLAlchemy Engine instance connected to the database
                 specified in the settings.
@@ -23,19 +93,59 @@ def get_engine() -> Engine:
         # The `echo=False` argument means SQLAlchemy will not log every
         # single SQL statement it executes, keeping our logs clean.
         # For debugging, you could set this to True.
-        engine = create_engine(settings.DATABASE_URL, poolclass=NullPool, connect_args={"sslmode": "require"}, echo=False)
-        
+        if settings.DB_POOL_MODE == "null":
+            engine = create_engine(settings.DATABASE_URL, poolclass=NullPool, connect_args={"sslmode": "require"}, echo=False)
+        else:
+            engine = create_engine(
+                settings.DATABASE_URL,
+                poolclass=InstrumentedQueuePool,
+                pool_size=pool_size(),
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                connect_args={"sslmode": "require"},
+                echo=False,
+            )
+        event.listen(engine, "connect", lambda dbapi_connection, connection_record: pool_metrics.record_connect())
+
         # Test the connection to fail fast if credentials are wrong
         with engine.connect() as connection:
             print("Database connection successful.")
-        
+
         return engine
     except Exception as e:
         print(f"Error creating database engine: {e}")
         # Re-raise the exception to stop the application if the DB is unavailable.
         raise
 
-# Create a single, reusable engine instance that the rest of
-# our application can import and use.
-engine = get_engine()
 
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Returns the shared engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
+    return _engine
+
+
+class _LazyEngine:
+    """
+    Stand-in for the shared Engine that defers its creation until first use,
+    so importing modules that hold a reference to it never touches the network.
+    """
+    def __getattr__(self, name):
+        return getattr(get_engine(), name)
+
+    def __repr__(self):
+        return f"<LazyEngine {_engine!r}>"
+
+
+# A single, reusable engine that the rest of our application can import
+# and use. It is created (and tested) on first use.
+engine = _LazyEngine()
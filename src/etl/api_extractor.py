@@ -1,12 +1,29 @@
+import threading
+import time
 import requests
 import pandas as pd
-from typing import List, Dict, Iterator, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, Dict, Iterable, Iterator, Tuple, Optional
+from src.etl.catalog import get_table
+from src.etl.response_cache import ResponseCache
+from src.etl.retry import backoff_delay
+from src.etl.telemetry import telemetry
 
 try:
     from src.config import settings
 except ImportError:
     settings = None
 
+DEFAULT_BASE_URL = "https://qlqetcqgadxcicwfzxpw.supabase.co"
+PAGINATION_MODES = ("offset", "keyset")
+# Responses worth retrying: throttling and transient server-side failures.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 # Mapping endpoint names to the database table names
 ENDPOINT_TO_TABLE_MAP = {
     "aries_daily_capacities": "stg_aries__daily_capacities",
@@ -20,6 +37,14 @@ ENDPOINT_TO_TABLE_MAP = {
     "eia_oil_price": "stg_eia__oil_price",
 }
 
+# Append-mostly time-series tables that support incremental (watermark) syncs,
+# mapped to the column whose high-water mark is tracked between runs.
+INCREMENTAL_COLUMNS = {
+    "stg_pro_count__completiondailytb": "productiondate",
+    "stg_aries__daily_capacities": "date",
+    "stg_eia__oil_price": "period",
+}
+
 # Define the explicit, correct loading order for API endpoints
 # This is critical to ensure foreign key constraints are met.
 API_LOAD_ORDER = [
@@ -35,92 +60,619 @@ API_LOAD_ORDER = [
 ]
 
 
+def keyset_columns(endpoint_name: str) -> List[str]:
+    """The primary key columns of an endpoint's table, which keyset pages are ordered by."""
+    return [column.name for column in get_table(ENDPOINT_TO_TABLE_MAP[endpoint_name]).primary_key.columns]
+
+
+def order_by(columns: List[str]) -> str:
+    """PostgREST `order` parameter sorting ascending by `columns`."""
+    return ",".join(f"{column}.asc" for column in columns)
+
+
+def _quote(value) -> str:
+    # Values inside PostgREST logic trees may contain reserved characters (,.:()).
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def keyset_filter(columns: List[str], last_key: Tuple) -> Dict[str, str]:
+    """
+    PostgREST filter selecting the rows that sort after `last_key`.
+
+    A single-column key becomes `col=gt.value`. A composite key expands the
+    row comparison (a, b) > (x, y) into `or=(a.gt.x,and(a.eq.x,b.gt.y))`.
+    """
+    if len(columns) == 1:
+        return {columns[0]: f"gt.{last_key[0]}"}
+    terms = []
+    for position, column in enumerate(columns):
+        conditions = [f"{previous}.eq.{_quote(last_key[index])}" for index, previous in enumerate(columns[:position])]
+        conditions.append(f"{column}.gt.{_quote(last_key[position])}")
+        terms.append(conditions[0] if len(conditions) == 1 else f"and({','.join(conditions)})")
+    return {"or": f"({','.join(terms)})"}
+
+
+def _parse_content_range(content_range: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parses a `Content-Range` header such as "0-999/5000" or "*/0".
+
+    Returns:
+        The number of rows in the page and the total row count (each None when not reported).
+    """
+    if not content_range or "/" not in content_range:
+        return None, None
+    page_range, total_part = content_range.split("/", 1)
+    rows = 0
+    if page_range != "*":
+        start, _, end = page_range.partition("-")
+        rows = int(end) - int(start) + 1
+    return rows, (None if total_part == "*" else int(total_part))
+
+
+class IncompleteExtractionError(RuntimeError):
+    """An endpoint could not be fetched completely; its partial data must not be loaded."""
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parses a `Retry-After` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CsvPages:
+    """
+    An endpoint fetched as PostgREST CSV, for loading with COPY without
+    building any Python rows. `pages` yields `(body, rows)` tuples. Bodies
+    have no header line and their fields are in `columns` order.
+    """
+    table_name: str
+    columns: List[str]
+    pages: Iterator[Tuple[bytes, int]]
+
+
+def _merge_params(filters: Optional[Dict[str, str]], extra: Dict[str, str]) -> Dict:
+    # A filter on a column that is also a key column is sent twice (both apply).
+    params = dict(filters or {})
+    for name, value in extra.items():
+        params[name] = [params[name], value] if name in params else value
+    return params
+
+
 class ApiExtractor:
     """
     Extracts paginated data from Supabase API endpoints in a specific order.
+
+    The first page of every endpoint is fetched on its own to learn the total
+    row count from `Content-Range`. When `use_parallel` is enabled, the remaining
+    page ranges are then fetched concurrently by a bounded thread pool and
+    reassembled in their original order. Every offset request sorts by the
+    endpoint's primary key, so separate `Range` pages agree on the row order.
+
+    With `pagination="keyset"`, each request instead asks for the rows after
+    the last primary key seen. The server then never scans past an OFFSET,
+    and the exact count is requested only once. Keyset pages depend on each other, so they are
+    always fetched sequentially.
+
+    With a `ResponseCache`, pages are recorded to (and replayed from) disk;
+    in replay mode the extractor makes no network calls at all.
+
+    Every request has connect/read timeouts. Connection errors and 5xx
+    responses are retried with exponential backoff, and 429s wait for the
+    server's `Retry-After`. The access token is refreshed shortly before it
+    expires, and again whenever a request comes back 401. An endpoint that
+    still cannot be fetched completely raises `IncompleteExtractionError`,
+    so a partial table is never loaded over good data.
     """
-    def __init__(self, api_key: str, email: str, password: str):
-        self.base_url = "https://qlqetcqgadxcicwfzxpw.supabase.co"
+    def __init__(self, api_key: str, email: str, password: str,
+                 page_size: int = 1000, use_parallel: bool = False, max_workers: int = 4,
+                 cache: Optional[ResponseCache] = None, base_url: str = DEFAULT_BASE_URL,
+                 pagination: str = "offset", timeout: Tuple[float, float] = (10.0, 60.0),
+                 retries: int = 5, retry_base_seconds: float = 1.0, retry_max_seconds: float = 60.0,
+                 pool_size: Optional[int] = None):
+        if pagination not in PAGINATION_MODES:
+            raise ValueError(f"Unknown API pagination '{pagination}'. Expected one of {PAGINATION_MODES}.")
+        self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.email = email
         self.password = password
         self.access_token = None
+        self._token_expires_at = None
+        self._token_lock = threading.Lock()
+        self.page_size = page_size
+        self.use_parallel = use_parallel
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.pagination = pagination
+        self.timeout = timeout
+        self.retries = max(1, retries)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        # Optional `(endpoint, offset, rows)` callback for every fetched page (run checkpoints).
+        self.on_page: Optional[Callable[[str, int, int], None]] = None
         self.session = requests.Session()
+        # Size the keep-alive pool to the fetch concurrency (page workers times
+        # concurrently extracted tables) so workers reuse connections instead
+        # of opening new ones.
+        pool_size = pool_size or self.max_workers
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _get_access_token(self) -> str:
-        if self.access_token:
+        # Tables may be extracted concurrently; authenticate only once.
+        with self._token_lock:
+            return self._authenticate()
+
+    def _refresh_access_token(self, rejected_token: Optional[str]) -> str:
+        """Re-authenticates after a 401, unless another thread already replaced the rejected token."""
+        with self._token_lock:
+            if self.access_token == rejected_token:
+                self.access_token = None
+            return self._authenticate()
+
+    def _authenticate(self) -> str:
+        if self.access_token and (self._token_expires_at is None or time.monotonic() < self._token_expires_at):
             return self.access_token
         print("--> Authenticating with API to get access token...")
         auth_url = f"{self.base_url}/auth/v1/token?grant_type=password"
         headers = {"apikey": self.api_key, "Content-Type": "application/json"}
         payload = {"email": self.email.strip(), "password": self.password.strip()}
         try:
-            response = self.session.post(auth_url, headers=headers, json=payload)
-            response.raise_for_status()
-            self.access_token = response.json()["access_token"]
+            with telemetry.stage("api", "auth"):
+                response = self._send("post", auth_url, "api", stage="auth", headers=headers, json=payload)
+            token = response.json()
+            self.access_token = token["access_token"]
+            expires_in = token.get("expires_in")
+            # Refresh a little early so in-flight requests never carry an expired token.
+            self._token_expires_at = (
+                time.monotonic() + float(expires_in) - min(60.0, 0.1 * float(expires_in)) if expires_in else None
+            )
             print("--> Successfully authenticated.")
             return self.access_token
         except requests.exceptions.RequestException as e:
             print(f"FATAL: API authentication error: {e}")
             raise
 
-    def _fetch_all_from_endpoint(self, endpoint_name: str) -> List[Dict]:
-        access_token = self._get_access_token()
+    def _send(self, method: str, url: str, table_name: str, stage: str = "page_fetch",
+              authenticated: bool = False, **kwargs) -> requests.Response:
+        """
+        Sends one request with timeouts and retries, and returns the successful response.
+
+        Connection errors, timeouts and 5xx responses are retried with
+        exponential backoff and jitter. A 429 waits for `Retry-After` (capped
+        at `retry_max_seconds`). With `authenticated`, the current bearer
+        token is attached, and a 401 refreshes it once before retrying.
+
+        Raises:
+            requests.exceptions.RequestException: When the request still fails
+                after `retries` attempts, or fails with a non-retryable status.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        refreshed = False
+        for attempt in range(self.retries):
+            token = self._get_access_token() if authenticated else None
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.retries - 1:
+                    raise
+                reason, delay = str(e), backoff_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+            else:
+                if response.status_code == 401 and authenticated and not refreshed:
+                    # The token expired (or was revoked) mid-run: get a new one and retry at once.
+                    print("    > Access token rejected (401); re-authenticating...")
+                    self._refresh_access_token(token)
+                    refreshed = True
+                    continue
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries - 1:
+                    response.raise_for_status()
+                    return response
+                reason = f"HTTP {response.status_code}"
+                delay = backoff_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+                if response.status_code == 429:
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        delay = min(retry_after, self.retry_max_seconds)
+            telemetry.record(table_name, stage, retries=1, calls=0)
+            print(f"    > Request to {url.rsplit('/', 1)[-1]} failed ({reason}); "
+                  f"retry {attempt + 1}/{self.retries - 1} in {delay:.1f}s...")
+            time.sleep(delay)
+        # Only reached when every attempt was spent on 401s; `retries` is at least one.
+        response.raise_for_status()
+        return response
+
+    def _fetch_page(self, url: str, headers: Dict, offset: int,
+                    params: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Fetches a single `Range` page, going through the response cache when enabled.
+
+        Returns:
+            The page's records and the total row count reported by
+            `Content-Range` (None when the header is missing).
+        """
+        if self.cache is None or not self.cache.enabled:
+            return self._request_page(url, headers, offset, params)
+        endpoint_name = url.rsplit("/", 1)[-1]
+        key = ResponseCache.key(endpoint_name, offset, self.page_size, params)
+        with telemetry.stage(ENDPOINT_TO_TABLE_MAP.get(endpoint_name, endpoint_name), "cache_read") as timer:
+            cached = self.cache.get(key)
+            timer.rows = len(cached[0]) if cached else 0
+        if cached is not None:
+            return cached
+        records, total = self._request_page(url, headers, offset, params)
+        self.cache.put(key, records, total)
+        return records, total
+
+    def _request_page(self, url: str, headers: Dict, offset: int,
+                      params: Optional[Dict[str, str]] = None) -> Tuple[List[Dict], Optional[int]]:
+        page_headers = dict(headers)
+        page_headers["Range"] = f"{offset}-{offset + self.page_size - 1}"
+        endpoint_name = url.rsplit("/", 1)[-1]
+        table_name = ENDPOINT_TO_TABLE_MAP.get(endpoint_name, endpoint_name)
+        with telemetry.stage(table_name, "page_fetch") as timer:
+            response = self._send("get", url, table_name, authenticated=True, headers=page_headers, params=params)
+            records = response.json()
+            timer.rows = len(records)
+            timer.bytes = len(response.content)
+        _, total = _parse_content_range(response.headers.get("Content-Range"))
+        return records, total
+
+    def _request_csv_page(self, url: str, headers: Dict, offset: int, columns: List[str],
+                          params: Optional[Dict] = None) -> Tuple[bytes, int, Optional[int]]:
+        """
+        Fetches one `Range` page as gzip-compressed CSV. The body is kept as
+        bytes; it is never parsed into rows.
+
+        Returns:
+            The page body without its header line, the number of rows in the
+            page and the total row count (None when not reported).
+        """
+        page_headers = dict(headers)
+        page_headers.update({"Accept": "text/csv", "Accept-Encoding": "gzip",
+                             "Range": f"{offset}-{offset + self.page_size - 1}"})
+        endpoint_name = url.rsplit("/", 1)[-1]
+        table_name = ENDPOINT_TO_TABLE_MAP.get(endpoint_name, endpoint_name)
+        with telemetry.stage(table_name, "page_fetch") as timer:
+            response = self._send("get", url, table_name, authenticated=True, headers=page_headers, params=params)
+            body = response.content
+            rows, total = _parse_content_range(response.headers.get("Content-Range"))
+            timer.rows = rows or 0
+            timer.bytes = len(body)
+        header, _, body = body.partition(b"\n")
+        if header and header.decode("utf-8").strip() != ",".join(columns):
+            raise ValueError(f"Unexpected CSV header from {endpoint_name}: {header[:200]!r}")
+        if body and not body.endswith(b"\n"):
+            body += b"\n"
+        return body, rows or 0, total
+
+    def _page_fetched(self, endpoint_name: str, offset: int, rows: int):
+        if self.on_page is not None:
+            self.on_page(endpoint_name, offset, rows)
+
+    def iter_csv_pages(self, endpoint_name: str, columns: List[str], filters: Optional[Dict[str, str]] = None,
+                       start_offset: int = 0) -> Iterator[Tuple[bytes, int]]:
+        """
+        Yields an endpoint's pages as raw CSV bodies with their row counts,
+        selecting exactly `columns`. Pages are fetched sequentially by offset,
+        starting at `start_offset`, and bypass the response cache. The exact
+        count is requested only on the first page.
+        """
+        headers = {"apikey": self.api_key, "Prefer": "count=exact"}
+        url = f"{self.base_url}/rest/v1/{endpoint_name}"
+        params = _merge_params(filters, {"select": ",".join(columns), **self._offset_order(endpoint_name)})
+        # `fetched` counts rows from the start of the endpoint, including any skipped by `start_offset`.
+        fetched, offset, total = start_offset, start_offset, None
+        print(f"\n--> Fetching CSV from endpoint: {endpoint_name}")
+        if filters:
+            print(f"    > Filters: {filters}")
+        if start_offset:
+            print(f"    > Resuming at offset {start_offset}")
+        try:
+            while True:
+                body, rows, page_total = self._request_csv_page(url, headers, offset, columns, params)
+                headers.pop("Prefer", None)
+                total = page_total if page_total is not None else total
+                if not rows:
+                    break
+                fetched += rows
+                self._page_fetched(endpoint_name, offset, rows)
+                yield body, rows
+                print(f"    > Fetched {fetched} / {total if total is not None else '?'} records...")
+                if rows < self.page_size or (total is not None and fetched >= total):
+                    break
+                offset += self.page_size
+        except requests.exceptions.RequestException as e:
+            print(f"    > ERROR: Fetching {endpoint_name} failed after {fetched} records: {e}")
+            raise IncompleteExtractionError(f"{endpoint_name}: fetch failed after {fetched} records: {e}") from e
+        if total is not None and fetched < total:
+            print(f"    > ERROR: {endpoint_name} returned {fetched} of {total} records.")
+            raise IncompleteExtractionError(f"{endpoint_name}: fetched {fetched} of {total} records")
+        print(f"--> Finished fetching {endpoint_name}. Total records: {fetched - start_offset}")
+
+    def csv_pages(self, table_name: str, filters: Optional[Dict[str, str]] = None,
+                  start_offset: int = 0) -> CsvPages:
+        """Lazily fetches a table's endpoint as CSV, selecting the target table's columns."""
+        endpoint_map = {v: k for k, v in ENDPOINT_TO_TABLE_MAP.items()}
+        columns = [column.name for column in get_table(table_name).columns]
+        return CsvPages(table_name, columns,
+                        self.iter_csv_pages(endpoint_map[table_name], columns, filters, start_offset))
+
+    @staticmethod
+    def _offset_order(endpoint_name: str) -> Dict[str, str]:
+        """
+        The `order` parameter for offset pages. Without an ORDER BY, Postgres
+        may return rows in a different order for each `Range` request (e.g.
+        under synchronized seqscans), so pages could overlap or skip rows.
+        """
+        key_columns = keyset_columns(endpoint_name)
+        return {"order": order_by(key_columns)} if key_columns else {}
+
+    def offset_pages_ordered(self, table_name: str) -> bool:
+        """
+        Whether a table's offset pages come back in a stable (primary key)
+        order, so that the same offset addresses the same rows in every run.
+        """
+        endpoint_map = {v: k for k, v in ENDPOINT_TO_TABLE_MAP.items()}
+        return self.pagination == "offset" and bool(self._offset_order(endpoint_map[table_name]))
+
+    def _iter_remaining_pages(self, url: str, headers: Dict,
+                              offsets: List[int], params: Optional[Dict[str, str]] = None) -> Iterator[List[Dict]]:
+        """
+        Fetches the given page offsets concurrently and yields their records in order.
+
+        Only a bounded window of pages (twice the worker count) is in flight at
+        any time, so memory stays bounded even when the consumer is streaming.
+        Fetching stops at the first empty page; a page that fails after its
+        retries raises, and the queued pages are cancelled.
+        """
+        offsets_iter = iter(offsets)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque(
+                executor.submit(self._fetch_page, url, headers, offset, params)
+                for offset in islice(offsets_iter, self.max_workers * 2)
+            )
+            while pending:
+                future = pending.popleft()
+                try:
+                    data, _ = future.result()
+                except Exception:
+                    for queued in pending:
+                        queued.cancel()
+                    raise
+                if not data:
+                    for queued in pending:
+                        queued.cancel()
+                    return
+                next_offset = next(offsets_iter, None)
+                if next_offset is not None:
+                    pending.append(executor.submit(self._fetch_page, url, headers, next_offset, params))
+                yield data
+
+    def _iter_keyset_pages(self, url: str, headers: Dict, key_columns: List[str],
+                           filters: Optional[Dict[str, str]] = None) -> Iterator[Tuple[List[Dict], Optional[int]]]:
+        """
+        Yields `(records, total)` pages ordered by `key_columns`, each one
+        requested with a filter on the last key of the previous page.
+        Only the first request asks for the exact count.
+        """
+        order = order_by(key_columns)
+        page_headers = dict(headers)
+        params = _merge_params(filters, {"order": order})
+        total = None
+        while True:
+            data, page_total = self._fetch_page(url, page_headers, 0, params)
+            page_headers.pop("Prefer", None)
+            total = page_total if page_total is not None else total
+            if not data:
+                return
+            yield data, total
+            if len(data) < self.page_size:
+                return
+            last_key = tuple(data[-1][column] for column in key_columns)
+            params = _merge_params(filters, {**keyset_filter(key_columns, last_key), "order": order})
+
+    def iter_pages(self, endpoint_name: str, filters: Optional[Dict[str, str]] = None,
+                   start_offset: int = 0) -> Iterator[List[Dict]]:
+        """
+        Yields the records of an endpoint one page at a time, in order.
+        Only the pages currently being fetched are held in memory.
+
+        Args:
+            endpoint_name (str): The PostgREST endpoint to read.
+            filters (Dict[str, str], optional): PostgREST column filters passed as
+                query parameters, e.g. {"period": "gte.2024-01-01"}.
+            start_offset (int): Row offset to start at, e.g. to resume an
+                interrupted load (offset pagination only).
+
+        Raises:
+            IncompleteExtractionError: When a page still fails after its retries,
+                or fewer rows than the reported total arrive.
+        """
+        # The bearer token is attached per request (see `_send`), so replays
+        # served entirely from disk never authenticate.
         headers = {
             "apikey": self.api_key,
-            "Authorization": f"Bearer {access_token}",
             "Prefer": "count=exact"
         }
         url = f"{self.base_url}/rest/v1/{endpoint_name}"
-        all_records = []
-        offset = 0
-        page_size = 1000
+        key_columns = keyset_columns(endpoint_name) if self.pagination == "keyset" else []
+        if key_columns and start_offset:
+            raise ValueError("start_offset requires offset pagination.")
+        # `fetched` counts rows from the start of the endpoint, including any skipped by `start_offset`.
+        fetched = start_offset
+        offset = start_offset
         print(f"\n--> Fetching data from endpoint: {endpoint_name}")
-        while True:
-            headers["Range"] = f"{offset}-{offset + page_size - 1}"
-            try:
-                response = self.session.get(url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                if not data:
-                    break
-                all_records.extend(data)
-                content_range = response.headers.get("Content-Range")
-                if content_range and "/" in content_range:
-                    total = int(content_range.split("/")[1])
-                    print(f"    > Fetched {len(all_records)} / {total} records...")
-                    if len(all_records) >= total:
+        if filters:
+            print(f"    > Filters: {filters}")
+        if start_offset:
+            print(f"    > Resuming at offset {start_offset}")
+        total = None
+        try:
+            if key_columns:
+                for data, total in self._iter_keyset_pages(url, headers, key_columns, filters):
+                    self._page_fetched(endpoint_name, fetched, len(data))
+                    fetched += len(data)
+                    yield data
+                    print(f"    > Fetched {fetched} / {total if total is not None else '?'} records...")
+            else:
+                params = _merge_params(filters, self._offset_order(endpoint_name))
+                while True:
+                    data, total = self._fetch_page(url, headers, offset, params)
+                    if not data:
                         break
-                else:
-                    break
-                offset += page_size
-            except requests.exceptions.RequestException as e:
-                print(f"    > Error fetching from {endpoint_name}: {e}")
-                break
-        print(f"--> Finished fetching {endpoint_name}. Total records: {len(all_records)}")
+                    self._page_fetched(endpoint_name, offset, len(data))
+                    fetched += len(data)
+                    yield data
+                    if total is None:
+                        break
+                    print(f"    > Fetched {fetched} / {total} records...")
+                    if fetched >= total:
+                        break
+                    offset += self.page_size
+                    if self.use_parallel:
+                        # The total is known now, so fan out the remaining ranges.
+                        offsets = list(range(offset, total, self.page_size))
+                        print(f"    > Fetching {len(offsets)} remaining pages with {self.max_workers} workers...")
+                        for page_offset, data in zip(offsets, self._iter_remaining_pages(
+                                url, headers, offsets, params)):
+                            self._page_fetched(endpoint_name, page_offset, len(data))
+                            fetched += len(data)
+                            yield data
+                            print(f"    > Fetched {fetched} / {total} records...")
+                        break
+        except requests.exceptions.RequestException as e:
+            print(f"    > ERROR: Fetching {endpoint_name} failed after {fetched} records: {e}")
+            raise IncompleteExtractionError(f"{endpoint_name}: fetch failed after {fetched} records: {e}") from e
+        # Keyset pages cannot skip rows, so a short count there only means rows were deleted meanwhile.
+        if not key_columns and total is not None and fetched < total:
+            print(f"    > ERROR: {endpoint_name} returned {fetched} of {total} records.")
+            raise IncompleteExtractionError(f"{endpoint_name}: fetched {fetched} of {total} records")
+        print(f"--> Finished fetching {endpoint_name}. Total records: {fetched - start_offset}")
+
+    def _fetch_all_from_endpoint(self, endpoint_name: str, filters: Optional[Dict[str, str]] = None,
+                                 start_offset: int = 0) -> List[Dict]:
+        all_records = []
+        for page in self.iter_pages(endpoint_name, filters, start_offset):
+            all_records.extend(page)
         return all_records
 
-    def extract_all(self) -> Dict[str, pd.DataFrame]:
+    def extract_all(self, filters: Optional[Dict[str, Dict[str, str]]] = None,
+                    csv_tables: Iterable[str] = (), tables: Optional[Iterable[str]] = None,
+                    start_offsets: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
         """
         Fetches data from all endpoints and returns a dictionary mapping
         table names to their DataFrames. This allows the orchestrator (main.py)
         to control the load order.
+
+        Args:
+            filters (Dict[str, Dict[str, str]], optional): Per-table PostgREST
+                filters, keyed by table name (used by incremental syncs).
+            csv_tables (Iterable[str]): Tables to pass through as lazy `CsvPages`
+                instead of extracting them into DataFrames.
+            tables (Iterable[str], optional): Only extract these tables.
+            start_offsets (Dict[str, int], optional): Per-table row offsets to
+                start fetching at (used to resume interrupted loads).
         """
+        filters = filters or {}
+        start_offsets = start_offsets or {}
         data_map = {}
         # Get the endpoint name from the table name for the request
         endpoint_map = {v: k for k, v in ENDPOINT_TO_TABLE_MAP.items()}
         for table_name in API_LOAD_ORDER:
+            if tables is not None and table_name not in tables:
+                continue
+            if table_name in csv_tables:
+                data_map[table_name] = self.csv_pages(table_name, filters.get(table_name),
+                                                      start_offsets.get(table_name, 0))
+                continue
             endpoint = endpoint_map[table_name]
-            records = self._fetch_all_from_endpoint(endpoint)
+            records = self._fetch_all_from_endpoint(endpoint, filters.get(table_name),
+                                                    start_offsets.get(table_name, 0))
             if records:
-                data_map[table_name] = pd.DataFrame(records)
+                data_map[table_name] = self._build_dataframe(table_name, records)
         return data_map
 
+    def extract_table(self, table_name: str, filters: Optional[Dict[str, str]] = None,
+                      start_offset: int = 0) -> pd.DataFrame:
+        """
+        Fetches a single table's endpoint into a DataFrame (empty if it has no records).
+        Used when tables are extracted on demand by the parallel scheduler.
+        """
+        endpoint_map = {v: k for k, v in ENDPOINT_TO_TABLE_MAP.items()}
+        records = self._fetch_all_from_endpoint(endpoint_map[table_name], filters, start_offset)
+        return self._build_dataframe(table_name, records)
+
+    @staticmethod
+    def _build_dataframe(table_name: str, records: List[Dict]) -> pd.DataFrame:
+        with telemetry.stage(table_name, "dataframe_build") as timer:
+            df = pd.DataFrame(records)
+            timer.rows = len(df)
+        return df
+
+    def _iter_dataframes(self, endpoint_name: str, filters: Optional[Dict[str, str]] = None,
+                         start_offset: int = 0) -> Iterator[pd.DataFrame]:
+        table_name = ENDPOINT_TO_TABLE_MAP[endpoint_name]
+        for page in self.iter_pages(endpoint_name, filters, start_offset):
+            yield self._build_dataframe(table_name, page)
+
+    def stream_all(self, filters: Optional[Dict[str, Dict[str, str]]] = None,
+                   csv_tables: Iterable[str] = (), tables: Optional[Iterable[str]] = None,
+                   start_offsets: Optional[Dict[str, int]] = None) -> Dict[str, Iterator[pd.DataFrame]]:
+        """
+        Streaming counterpart of `extract_all` (with the same arguments).
+
+        Returns a dictionary mapping table names to lazy generators of
+        per-page DataFrames (or lazy `CsvPages` for `csv_tables`). Nothing is
+        fetched until a generator is consumed, so memory is bounded by one
+        page per table instead of the whole table.
+        """
+        filters = filters or {}
+        start_offsets = start_offsets or {}
+        endpoint_map = {v: k for k, v in ENDPOINT_TO_TABLE_MAP.items()}
+        streams = {}
+        for table_name in API_LOAD_ORDER:
+            if tables is not None and table_name not in tables:
+                continue
+            table_filters, start_offset = filters.get(table_name), start_offsets.get(table_name, 0)
+            if table_name in csv_tables:
+                streams[table_name] = self.csv_pages(table_name, table_filters, start_offset)
+            else:
+                streams[table_name] = self._iter_dataframes(endpoint_map[table_name], table_filters, start_offset)
+        return streams
+
 if settings:
     api_extractor = ApiExtractor(
         api_key=settings.API_KEY,
         email=settings.API_EMAIL,
-        password=settings.API_PASSWORD
+        password=settings.API_PASSWORD,
+        page_size=settings.CHUNK_SIZE,
+        use_parallel=settings.USE_PARALLEL,
+        max_workers=settings.API_MAX_WORKERS,
+        base_url=settings.API_BASE_URL,
+        pagination=settings.API_PAGINATION,
+        timeout=(settings.API_CONNECT_TIMEOUT, settings.API_READ_TIMEOUT),
+        retries=settings.API_RETRIES,
+        retry_base_seconds=settings.API_RETRY_BASE_SECONDS,
+        retry_max_seconds=settings.API_RETRY_MAX_SECONDS,
+        # Tables are extracted concurrently by the scheduler, each with its own page workers.
+        pool_size=settings.API_MAX_WORKERS * max(1, settings.TABLE_WORKERS),
+        cache=ResponseCache(
+            directory=settings.API_CACHE_DIR,
+            mode=settings.API_CACHE_MODE,
+            ttl_seconds=settings.API_CACHE_TTL_HOURS * 3600,
+            max_bytes=settings.API_CACHE_MAX_MB * 1024 * 1024,
+        )
     )
 else:
     api_extractor = None
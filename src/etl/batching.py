@@ -0,0 +1,121 @@
+import threading
+from typing import Iterable, Iterator, List, Union
+
+import pandas as pd
+
+# Rows sampled per chunk to estimate its serialized row width.
+SAMPLE_ROWS = 1000
+
+
+def estimate_row_bytes(df: pd.DataFrame) -> float:
+    """
+    Estimates the average serialized (COPY text) width of a row, in bytes.
+
+    A sample of rows is rendered column by column as strings and measured, so
+    wide free-text columns weigh in at their real size while numeric columns
+    cost what their digits cost. One delimiter byte per column is added.
+    """
+    if df.empty:
+        return 1.0
+    sample = df.sample(SAMPLE_ROWS, random_state=0) if len(df) > SAMPLE_ROWS else df
+    widths = sum(
+        sample[col].astype("string").str.len().fillna(2).astype("float64")
+        for col in sample.columns
+    )
+    return max(float(widths.mean()) + len(sample.columns), 1.0)
+
+
+class BatchSizer:
+    """
+    Sizes load batches by estimated bytes instead of a fixed row count.
+
+    The row count of each batch is `target_bytes * scale / row_bytes`, clamped
+    to [min_rows, max_rows]. `scale` adapts multiplicatively to observed commit
+    latency: it grows by 25% while batches commit in under half of
+    `target_seconds`, shrinks by 25% when they take over 1.5 times as long,
+    and is halved after every failed attempt, so a table with oversized rows
+    backs off instead of failing repeatedly.
+    """
+    def __init__(self, target_bytes: int = 8 * 1024 * 1024, target_seconds: float = 2.0,
+                 min_rows: int = 100, max_rows: int = 50000):
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.scale = 1.0
+        self.row_bytes = None
+        self._lock = threading.Lock()
+
+    def fork(self) -> "BatchSizer":
+        """
+        A new sizer with the same limits, starting from this one's learned
+        scale and row width. Each connection of a parallel load gets its own,
+        so one connection's commit latency never sizes another's batches.
+        """
+        sizer = BatchSizer(self.target_bytes, self.target_seconds, self.min_rows, self.max_rows)
+        with self._lock:
+            sizer.scale, sizer.row_bytes = self.scale, self.row_bytes
+        return sizer
+
+    def rows_per_batch(self) -> int:
+        with self._lock:
+            row_bytes = self.row_bytes or 1.0
+            rows = int(self.target_bytes * self.scale / row_bytes)
+        return max(self.min_rows, min(self.max_rows, rows))
+
+    def observe_rows(self, df: pd.DataFrame):
+        """Folds a new chunk's estimated row width into the running estimate."""
+        estimate = estimate_row_bytes(df)
+        with self._lock:
+            self.row_bytes = estimate if self.row_bytes is None else 0.7 * self.row_bytes + 0.3 * estimate
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            if seconds > self.target_seconds * 1.5:
+                self.scale = max(self.scale * 0.75, 0.01)
+            elif seconds < self.target_seconds / 2:
+                self.scale = min(self.scale * 1.25, 4.0)
+
+    def record_failure(self):
+        with self._lock:
+            self.scale = max(self.scale * 0.5, 0.01)
+
+    def batches(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+        """
+        Splits a DataFrame, or regroups a stream of chunks, into byte-sized batches.
+
+        The batch size is re-evaluated before every batch. Because the
+        consumer commits each batch before asking for the next, adjustments
+        from `record_success`/`record_failure` apply immediately.
+        """
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        # Chunks are buffered and concatenated once per emitted batch, not once per chunk.
+        buffer: List[pd.DataFrame] = []
+        buffered_rows = 0
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            self.observe_rows(chunk)
+            buffer.append(chunk)
+            buffered_rows += len(chunk)
+            rows = self.rows_per_batch()
+            if buffered_rows < rows:
+                continue
+            combined = pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
+            offset = 0
+            while buffered_rows - offset >= rows:
+                yield combined.iloc[offset:offset + rows]
+                offset += rows
+                rows = self.rows_per_batch()
+            remainder = combined.iloc[offset:]
+            buffer = [remainder] if not remainder.empty else []
+            buffered_rows = len(remainder)
+        if buffer:
+            yield pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "row_bytes": round(self.row_bytes or 0.0, 1),
+                "scale": round(self.scale, 3),
+            }
@@ -0,0 +1,106 @@
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Set
+
+import sqlalchemy as sa
+
+from src.config import settings
+
+MIGRATIONS_DIR = settings.ROOT_DIR / "alembic" / "versions"
+
+
+class _MigrationRecorder:
+    """
+    A stand-in for `alembic.op` that records table definitions into a
+    SQLAlchemy MetaData instead of executing DDL against a database.
+
+    Operations that do not change table definitions (e.g. `op.execute`)
+    are accepted and ignored.
+    """
+    def __init__(self, metadata: sa.MetaData):
+        self.metadata = metadata
+
+    def f(self, name: str) -> str:
+        return name
+
+    def create_table(self, table_name: str, *columns, **kwargs) -> sa.Table:
+        kwargs.pop("schema", None)
+        return sa.Table(table_name, self.metadata, *columns, **kwargs)
+
+    def drop_table(self, table_name: str, **kwargs):
+        self.metadata.remove(self.metadata.tables[table_name])
+
+    def rename_table(self, old_table_name: str, new_table_name: str, **kwargs):
+        table = self.metadata.tables[old_table_name]
+        table.to_metadata(self.metadata, name=new_table_name)
+        self.metadata.remove(table)
+
+    def create_index(self, index_name: str, table_name: str, columns, unique: bool = False, **kwargs):
+        table = self.metadata.tables[table_name]
+        sa.Index(index_name, *[table.c[col] for col in columns], unique=unique)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _load_revisions(migrations_dir: Path) -> list:
+    """Imports every migration script and returns them ordered from base to head."""
+    modules = {}
+    for path in migrations_dir.glob("*.py"):
+        spec = importlib.util.spec_from_file_location(f"_migration_{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules[module.down_revision] = module
+
+    ordered = []
+    revision = None
+    while revision in modules:
+        module = modules[revision]
+        ordered.append(module)
+        revision = module.revision
+    return ordered
+
+
+@lru_cache(maxsize=1)
+def get_metadata() -> sa.MetaData:
+    """
+    Builds the target schema by replaying the alembic migrations' `upgrade()`
+    steps into an in-memory MetaData. This keeps the migrations the single
+    source of truth for table columns, keys and indexes without a database
+    round trip.
+    """
+    metadata = sa.MetaData()
+    recorder = _MigrationRecorder(metadata)
+    for module in _load_revisions(MIGRATIONS_DIR):
+        module.op = recorder
+        module.upgrade()
+    return metadata
+
+
+def get_table(table_name: str) -> sa.Table:
+    """Returns the migration-defined definition of a staging table."""
+    return get_metadata().tables[table_name]
+
+
+def get_dependencies(table_names: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Derives the FK dependency graph between the given tables.
+
+    Returns:
+        A dictionary mapping every table to the set of its parent tables
+        (tables it references through a foreign key), restricted to
+        `table_names`. Self-references are ignored.
+    """
+    table_names = list(table_names)
+    tables = get_metadata().tables
+    dependencies = {}
+    for table_name in table_names:
+        parents = set()
+        if table_name in tables:
+            for fk in tables[table_name].foreign_key_constraints:
+                parent = fk.referred_table.name
+                if parent != table_name and parent in table_names:
+                    parents.add(parent)
+        dependencies[table_name] = parents
+    return dependencies
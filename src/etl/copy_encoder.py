@@ -0,0 +1,213 @@
+import io
+import struct
+import uuid
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, List
+
+import pandas as pd
+
+# PostgreSQL epoch used by the binary COPY format for date/timestamp values.
+PG_EPOCH = pd.Timestamp("2000-01-01")
+
+# Binary COPY framing: signature, flags field and header extension length.
+BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+BINARY_TRAILER = struct.pack("!h", -1)
+BINARY_NULL = struct.pack("!i", -1)
+
+# Text COPY marker for NULL values.
+TEXT_NULL = "\\N"
+
+INTEGER_TYPES = {"int2", "int4", "int8"}
+TEMPORAL_TYPES = {"date", "timestamp", "timestamptz"}
+TRUE_STRINGS = {"t", "true", "1", "y", "yes", "on"}
+
+
+def _text_column(series: pd.Series, pg_type: str) -> pd.Series:
+    """
+    Renders one DataFrame column as COPY text-format fields.
+
+    Conversions are column-wise so that no Python row objects are built.
+    Only string-like columns need escaping; numeric, boolean and
+    datetime columns can never contain the COPY delimiters.
+    """
+    null_mask = series.isna()
+    values = series
+
+    is_plain_scalar = (
+        pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values)
+    )
+
+    if pg_type == "bool" and is_plain_scalar:
+        values = values.fillna(False).astype(bool).map({True: "t", False: "f"})
+    elif pg_type in INTEGER_TYPES and pd.api.types.is_float_dtype(values):
+        # Integer columns with missing values arrive as float64 (e.g. 1.0),
+        # which COPY would reject for an integer target.
+        values = values.astype("Int64").astype(str)
+    elif pg_type in TEMPORAL_TYPES and pd.api.types.is_datetime64_any_dtype(values):
+        fmt = {"date": "%Y-%m-%d", "timestamptz": "%Y-%m-%d %H:%M:%S.%f%z"}.get(pg_type, "%Y-%m-%d %H:%M:%S.%f")
+        values = values.dt.strftime(fmt)
+    elif not is_plain_scalar:
+        values = (
+            values.astype(str)
+            .str.replace("\\", "\\\\", regex=False)
+            .str.replace("\t", "\\t", regex=False)
+            .str.replace("\n", "\\n", regex=False)
+            .str.replace("\r", "\\r", regex=False)
+        )
+    else:
+        values = values.astype(str)
+
+    return values.where(~null_mask, TEXT_NULL)
+
+
+def encode_text(df: pd.DataFrame, column_types: Dict[str, str]) -> io.StringIO:
+    """
+    Encodes a DataFrame as a COPY ... WITH (FORMAT text) stream.
+
+    Args:
+        df (pd.DataFrame): The batch to encode. Column names must match the target table.
+        column_types (Dict[str, str]): Maps column name to PostgreSQL type name (pg_type.typname).
+
+    Returns:
+        io.StringIO: A tab-separated stream ready for `cursor.copy_expert`.
+    """
+    columns = [_text_column(df[col], column_types.get(col, "text")) for col in df.columns]
+    lines = columns[0].str.cat(columns[1:], sep="\t") if len(columns) > 1 else columns[0]
+    buffer = io.StringIO()
+    buffer.write("\n".join(lines.tolist()))
+    buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _encode_numeric(value) -> bytes:
+    """Encodes a number in PostgreSQL's base-10000 binary NUMERIC layout."""
+    number = value if isinstance(value, Decimal) else Decimal(str(value))
+    if number.is_nan():
+        return struct.pack("!hhHH", 0, 0, 0xC000, 0)
+    if number.is_infinite():
+        raise ValueError(f"Cannot encode infinite value {value!r} as NUMERIC.")
+
+    sign, digit_tuple, exponent = number.as_tuple()
+    digits = "".join(map(str, digit_tuple))
+    if exponent > 0:
+        digits += "0" * exponent
+        exponent = 0
+    scale = -exponent
+    if scale > len(digits):
+        digits = "0" * (scale - len(digits)) + digits
+    integer_part = digits[:len(digits) - scale] or "0"
+    fraction_part = digits[len(digits) - scale:]
+
+    integer_part = integer_part.zfill((len(integer_part) + 3) // 4 * 4)
+    fraction_part = fraction_part.ljust((len(fraction_part) + 3) // 4 * 4, "0")
+    groups = [int(integer_part[i:i + 4]) for i in range(0, len(integer_part), 4)]
+    weight = len(groups) - 1
+    groups += [int(fraction_part[i:i + 4]) for i in range(0, len(fraction_part), 4)]
+
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+
+    header = struct.pack("!hhHH", len(groups), weight, 0x4000 if sign else 0x0000, scale)
+    return header + struct.pack(f"!{len(groups)}H", *groups)
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_STRINGS
+    return bool(value)
+
+
+def _to_uuid_bytes(value) -> bytes:
+    return value.bytes if isinstance(value, uuid.UUID) else uuid.UUID(str(value)).bytes
+
+
+def _binary_field_encoder(pg_type: str):
+    """Returns a function converting a non-null Python value to its binary COPY payload."""
+    if pg_type == "int2":
+        return lambda v: struct.pack("!h", int(v))
+    if pg_type == "int4":
+        return lambda v: struct.pack("!i", int(v))
+    if pg_type == "int8":
+        return lambda v: struct.pack("!q", int(v))
+    if pg_type == "float4":
+        return lambda v: struct.pack("!f", float(v))
+    if pg_type == "float8":
+        return lambda v: struct.pack("!d", float(v))
+    if pg_type == "bool":
+        return lambda v: struct.pack("!?", _to_bool(v))
+    if pg_type == "numeric":
+        return _encode_numeric
+    if pg_type == "uuid":
+        return _to_uuid_bytes
+    if pg_type in ("text", "varchar", "bpchar", "name"):
+        return lambda v: str(v).encode("utf-8")
+    raise ValueError(f"Unsupported column type for binary COPY: {pg_type}")
+
+
+def _binary_temporal_column(series: pd.Series, pg_type: str) -> List[bytes]:
+    """Converts a date/timestamp column to binary payloads in one vectorized pass."""
+    null_mask = series.isna()
+    parsed = pd.to_datetime(series, utc=(pg_type == "timestamptz"))
+    if pg_type == "timestamptz":
+        parsed = parsed.dt.tz_convert(None)
+    elif getattr(parsed.dt, "tz", None) is not None:
+        # PostgreSQL ignores the offset when casting to timestamp without time zone.
+        parsed = parsed.dt.tz_localize(None)
+
+    delta = parsed - PG_EPOCH
+    if pg_type == "date":
+        offsets = delta.dt.days
+        fmt = "!ii"
+        size = 4
+    else:
+        offsets = delta // pd.Timedelta(microseconds=1)
+        fmt = "!iq"
+        size = 8
+
+    return [
+        BINARY_NULL if is_null else struct.pack(fmt, size, int(offset))
+        for offset, is_null in zip(offsets.tolist(), null_mask.tolist())
+    ]
+
+
+def _binary_column(series: pd.Series, pg_type: str) -> List[bytes]:
+    """Renders one column as length-prefixed binary COPY fields."""
+    if pg_type in TEMPORAL_TYPES:
+        return _binary_temporal_column(series, pg_type)
+
+    encode = _binary_field_encoder(pg_type)
+    fields = []
+    for value, is_null in zip(series.tolist(), series.isna().tolist()):
+        if is_null:
+            fields.append(BINARY_NULL)
+        else:
+            payload = encode(value)
+            fields.append(struct.pack("!i", len(payload)) + payload)
+    return fields
+
+
+def encode_binary(df: pd.DataFrame, column_types: Dict[str, str]) -> io.BytesIO:
+    """
+    Encodes a DataFrame as a COPY ... WITH (FORMAT binary) stream.
+
+    Args:
+        df (pd.DataFrame): The batch to encode. Column names must match the target table.
+        column_types (Dict[str, str]): Maps column name to PostgreSQL type name (pg_type.typname).
+
+    Returns:
+        io.BytesIO: A binary stream ready for `cursor.copy_expert`.
+
+    Raises:
+        ValueError: If a column has a type the binary encoder does not support.
+    """
+    columns = [_binary_column(df[col], column_types.get(col, "text")) for col in df.columns]
+    row_prefix = (struct.pack("!h", len(columns)),)
+    body = b"".join(chain.from_iterable(row_prefix + fields for fields in zip(*columns)))
+    return io.BytesIO(BINARY_HEADER + body + BINARY_TRAILER)
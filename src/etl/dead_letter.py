@@ -0,0 +1,105 @@
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+# The kind of quarantined rows the database rejected (the default).
+REJECTED = "rejected"
+# Rows set aside because another row with the same primary key was loaded
+# instead; replaying them must not overwrite that row.
+DUPLICATE_KEY = "duplicate_key"
+
+
+class DeadLetterStore:
+    """
+    Quarantine for rows the loader could not write.
+
+    Rejected rows are appended to `<directory>/<table>.jsonl`, one JSON object
+    per row with the database error that rejected it, so nothing is silently
+    dropped and the rows can be fixed and replayed later (`main.py --replay-dead-letters`).
+    Each row is tagged with a `kind` (`REJECTED` or `DUPLICATE_KEY`), so a
+    replay can treat the kinds differently.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _path(self, table_name: str) -> Path:
+        return self.directory / f"{table_name}.jsonl"
+
+    def write(self, table_name: str, rows: pd.DataFrame, error: BaseException, kind: str = REJECTED):
+        """Appends the rejected rows of one table together with their error and kind."""
+        if rows.empty:
+            return
+        rejected_at = datetime.now(timezone.utc).isoformat()
+        message = str(getattr(error, "orig", None) or error).strip()
+        records = json.loads(rows.to_json(orient="records", date_format="iso"))
+        lines = [
+            json.dumps({"table": table_name, "kind": kind, "error": message, "rejected_at": rejected_at,
+                        "row": record})
+            for record in records
+        ]
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(table_name), "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        print(f"    > Quarantined {len(rows)} row(s) of {table_name} in {self._path(table_name)}")
+
+    def tables(self) -> List[str]:
+        """Tables that currently have quarantined rows."""
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.jsonl"))
+
+    def read(self, table_name: str) -> Tuple[Dict[str, pd.DataFrame], int]:
+        """
+        Returns a table's quarantined rows, grouped by kind (empty if there
+        are none), without removing them. Rows written before kinds were
+        recorded count as `REJECTED`.
+
+        Also returns the file's size at the time of reading, to be passed to
+        `settle` once the rows were replayed. Rows rejected again during the
+        replay are appended after that mark.
+        """
+        path = self._path(table_name)
+        with self._lock:
+            if not path.exists():
+                return {}, 0
+            data = path.read_bytes()
+        rows: Dict[str, List[dict]] = {}
+        for line in data.decode("utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                rows.setdefault(record.get("kind", REJECTED), []).append(record["row"])
+        return {kind: pd.DataFrame(records) for kind, records in rows.items()}, len(data)
+
+    def settle(self, table_name: str, mark: int, applied: bool):
+        """
+        Finishes a replay of the rows `read` returned up to `mark`.
+
+        When `applied`, those rows are moved to `<table>.jsonl.replayed` (appended,
+        so earlier replays are kept) and only the rows rejected again remain.
+        Otherwise the file is cut back to `mark`: every original row stays
+        quarantined, and the partial replay's rejections, which repeat
+        some of them, are dropped. Replays upsert, so retrying is safe.
+        """
+        path = self._path(table_name)
+        with self._lock:
+            if not path.exists():
+                return
+            if not applied:
+                with open(path, "r+b") as handle:
+                    handle.truncate(mark)
+                return
+            data = path.read_bytes()
+            with open(path.with_suffix(".jsonl.replayed"), "ab") as handle:
+                handle.write(data[:mark])
+            if len(data) > mark:
+                temp_path = path.with_suffix(".jsonl.tmp")
+                temp_path.write_bytes(data[mark:])
+                temp_path.replace(path)
+            else:
+                path.unlink()
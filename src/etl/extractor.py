@@ -1,25 +1,114 @@
+import importlib.util
 import pandas as pd
+import sqlalchemy as sa
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 # Import the settings object to get the data directory path
 from src.config import settings
+from src.etl.catalog import get_dependencies, get_metadata
+from src.etl.manifest import SourceManifest
+
+def _pandas_dtype(column_type: sa.types.TypeEngine) -> Optional[str]:
+    """
+    Maps a migration column type to the pandas dtype used to parse it.
+    Nullable extension dtypes keep integer columns exact even when values
+    are missing. Date/time columns return None and go through `parse_dates`
+    instead.
+    """
+    if isinstance(column_type, sa.Boolean):
+        # Source flags are integers where any non-zero value means true
+        # (activeflag holds 1 and 2); the Transformer casts them to bool.
+        return "Int64"
+    if isinstance(column_type, sa.Integer):
+        return "Int64"
+    if isinstance(column_type, (sa.Numeric, sa.Float)):
+        return "float64"
+    if isinstance(column_type, (sa.Date, sa.DateTime)):
+        return None
+    return "string"
+
 
 class CsvExtractor:
     """
     A class to handle the extraction of data from CSV files.
+
+    Column dtypes are taken from the target table definitions in the alembic
+    migrations, so pandas does not have to infer them and values arrive
+    already typed (quoted integers, zero-padded IDs, 1/0 flags).
     """
 
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, engine: str = "auto", manifest_path: Optional[Path] = None):
         """
         Initializes the CsvExtractor with the directory containing the data files.
 
         Args:
             data_dir (Path): The path to the directory where CSV files are stored.
+            engine (str): The pandas parser backend: "c", "pyarrow", or "auto"
+                (pyarrow when it is installed, otherwise c).
+            manifest_path (Path, optional): Where the change-detection manifest
+                is persisted. Defaults to `.csv_manifest.json` in `data_dir`.
         """
         self.data_dir = data_dir
+        self.manifest = SourceManifest(manifest_path or data_dir / ".csv_manifest.json")
+        # Fingerprints of the files as they were when last read, keyed by table (see `mark_loaded`).
+        self._fingerprints: Dict[str, Dict] = {}
         if not self.data_dir.is_dir():
             raise FileNotFoundError(f"Data directory not found at: {self.data_dir}")
+        if engine == "auto":
+            engine = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+        self.engine = engine
+
+    def _read_options(self, file_path: Path, table_name: str) -> Dict:
+        """
+        Builds the typed `pd.read_csv` options for a file from its target table.
+
+        Only columns that exist in the target table are read. Files whose
+        table is not defined in the migrations fall back to type inference.
+        """
+        tables = get_metadata().tables
+        if table_name not in tables:
+            return {}
+        table = tables[table_name]
+        header = pd.read_csv(file_path, nrows=0).columns
+        target_columns = {col.name.lower(): col for col in table.columns}
+
+        usecols, dtype, parse_dates = [], {}, []
+        for name in header:
+            column = target_columns.get(name.lower())
+            if column is None:
+                continue
+            usecols.append(name)
+            pandas_dtype = _pandas_dtype(column.type)
+            if pandas_dtype is None:
+                parse_dates.append(name)
+            else:
+                dtype[name] = pandas_dtype
+
+        options = {"usecols": usecols, "dtype": dtype}
+        if parse_dates:
+            options["parse_dates"] = parse_dates
+        return options
+
+    def read_file(self, file_path: Path, chunksize: Optional[int] = None):
+        """
+        Reads one CSV file with its schema-derived dtypes.
+
+        Args:
+            file_path (Path): The CSV file.
+            chunksize (int, optional): When given, returns a chunk reader instead
+                of a DataFrame. The pyarrow backend cannot read in chunks, so
+                chunked reads always use the C parser.
+
+        The file's fingerprint is taken before it is parsed, so the manifest
+        records the contents that were actually loaded.
+        """
+        table_name = self._generate_table_name(file_path)
+        self._fingerprints[table_name] = SourceManifest.fingerprint(file_path)
+        options = self._read_options(file_path, table_name)
+        if chunksize:
+            return pd.read_csv(file_path, chunksize=chunksize, engine="c", **options)
+        return pd.read_csv(file_path, engine=self.engine, **options)
 
     def _generate_table_name(self, file_path: Path) -> str:
         """
@@ -36,19 +125,29 @@ class CsvExtractor:
             
         return f"stg_{source_system}__{file_name}"
 
-    def extract_all(self) -> Dict[str, pd.DataFrame]:
+    def _csv_files(self, tables: Optional[Iterable[str]] = None) -> List[Path]:
+        csv_files = list(self.data_dir.glob("*.csv"))
+        if tables is not None:
+            tables = set(tables)
+            csv_files = [path for path in csv_files if self._generate_table_name(path) in tables]
+        return csv_files
+
+    def extract_all(self, tables: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
         """
         Finds all CSV files, reads them, and returns a dictionary mapping
         the target table name to its corresponding pandas DataFrame.
 
         This allows the orchestrator to control the processing order.
 
+        Args:
+            tables (Iterable[str], optional): Only read the files feeding these tables.
+
         Returns:
             A dictionary where keys are table names and values are DataFrames.
         """
         print(f"Starting extraction from directory: {self.data_dir}")
         data_map = {}
-        csv_files = list(self.data_dir.glob("*.csv"))
+        csv_files = self._csv_files(tables)
         
         if not csv_files:
             print(f"Warning: No CSV files found in {self.data_dir}")
@@ -57,7 +156,7 @@ class CsvExtractor:
         for file_path in csv_files:
             try:
                 print(f"--> Reading file: {file_path.name}")
-                df = pd.read_csv(file_path)
+                df = self.read_file(file_path)
                 table_name = self._generate_table_name(file_path)
                 data_map[table_name] = df
             except Exception as e:
@@ -67,5 +166,95 @@ class CsvExtractor:
         print("Extraction complete.")
         return data_map
 
+    def list_tables(self) -> List[str]:
+        """Returns the target table names of every CSV file in the data directory."""
+        return [self._generate_table_name(file_path) for file_path in self.data_dir.glob("*.csv")]
+
+    def _file_for_table(self, table_name: str) -> Path:
+        """Maps a target table name back to its source CSV file."""
+        for file_path in self.data_dir.glob("*.csv"):
+            if self._generate_table_name(file_path) == table_name:
+                return file_path
+        raise FileNotFoundError(f"No CSV file in {self.data_dir} feeds table {table_name}")
+
+    def extract_table(self, table_name: str) -> pd.DataFrame:
+        """
+        Reads the CSV file that feeds a single table.
+        Used when tables are extracted on demand by the parallel scheduler.
+        """
+        file_path = self._file_for_table(table_name)
+        print(f"--> Reading file: {file_path.name}")
+        return self.read_file(file_path)
+
+    def _iter_chunks(self, file_path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+        print(f"--> Streaming file: {file_path.name} in chunks of {chunksize} rows")
+        with self.read_file(file_path, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+
+    def stream_all(self, chunksize: int, tables: Optional[Iterable[str]] = None) -> Dict[str, Iterator[pd.DataFrame]]:
+        """
+        Streaming counterpart of `extract_all`.
+
+        Returns a dictionary mapping the target table name to a lazy generator
+        of DataFrame chunks. A file is only opened once its generator is
+        consumed, so memory is bounded by one chunk per table.
+
+        Args:
+            chunksize (int): Number of rows per chunk.
+            tables (Iterable[str], optional): Only stream the files feeding these tables.
+        """
+        csv_files = self._csv_files(tables)
+        if not csv_files:
+            print(f"Warning: No CSV files found in {self.data_dir}")
+        return {
+            self._generate_table_name(file_path): self._iter_chunks(file_path, chunksize)
+            for file_path in csv_files
+        }
+
+    def tables_to_load(self, force: bool = False) -> Set[str]:
+        """
+        Decides which CSV tables need to be reloaded.
+
+        A table is reloaded when its file changed since its last successful
+        load, when it has never been loaded, or when any of its FK parents is
+        reloaded (truncating a parent with CASCADE also empties its children).
+        With `force`, every table is reloaded.
+        """
+        file_map = {self._generate_table_name(path): path for path in self._csv_files()}
+        if force:
+            return set(file_map)
+
+        selected = {
+            table_name for table_name, file_path in file_map.items()
+            if not self.manifest.is_unchanged(table_name, file_path)
+        }
+        dependencies = get_dependencies(file_map)
+        # Propagate reloads from parents to children until nothing changes.
+        while True:
+            children = {
+                table_name for table_name, parents in dependencies.items()
+                if table_name not in selected and parents & selected
+            }
+            if not children:
+                break
+            selected |= children
+
+        for table_name in sorted(set(file_map) - selected):
+            print(f"--> Skipping unchanged CSV source for {table_name}")
+        return selected
+
+    def mark_loaded(self, table_name: str):
+        """
+        Records the fingerprint a table's source file had when it was read,
+        after a successful load. If the file changed since, its new contents
+        no longer match the manifest and are loaded by the next run.
+        """
+        fingerprint = self._fingerprints.pop(table_name, None)
+        if fingerprint is None:
+            print(f"Warning: {table_name} was not read from its CSV file; its manifest entry is left as is.")
+            return
+        self.manifest.record(table_name, fingerprint)
+
 # Create a single, reusable extractor instance for our application.
-csv_extractor = CsvExtractor(data_dir=settings.DATA_DIR)
+csv_extractor = CsvExtractor(data_dir=settings.DATA_DIR, engine=settings.CSV_ENGINE)
@@ -1,11 +1,43 @@
+import io
+import itertools
+import json
 import pandas as pd
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.engine import Engine
 from sqlalchemy import text
 from psycopg2.extras import execute_values
 from src.database import engine
 from src.config import settings
+from src.etl.batching import BatchSizer
+from src.etl.copy_encoder import encode_text, encode_binary
+from src.etl.dead_letter import DUPLICATE_KEY, DeadLetterStore
+from src.etl.retry import DATA, FATAL, backoff_delay, classify_error
+from src.etl.telemetry import telemetry
+from src.etl.table_ddl import (
+    get_constraints, get_indexes, get_owned_sequences, get_partitions, get_referencing_foreign_keys,
+    qualified_name, retarget_index_definition, temporary_name,
+)
+
+# Supported load strategies:
+# - "insert":      multi-row INSERT via psycopg2's execute_values (legacy path).
+# - "copy":        COPY ... FROM STDIN in text format.
+# - "copy_binary": COPY ... FROM STDIN in binary format.
+LOAD_METHODS = ("insert", "copy", "copy_binary")
+
+# Conflict handling on the primary key:
+# - "nothing": `ON CONFLICT DO NOTHING` (idempotent append, the default).
+# - "update":  `ON CONFLICT (pk) DO UPDATE` (upsert, used by incremental sync).
+CONFLICT_MODES = ("nothing", "update")
+
+# Control table (created by alembic) holding per-row hashes for differential loads.
+ROW_HASH_TABLE = "etl_row_hashes"
 
 # Configure logger for batch errors
 logger = logging.getLogger("loader")
@@ -16,16 +48,181 @@ formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 if not logger.handlers:
     logger.addHandler(file_handler)
 
+@dataclass
+class LoadResult:
+    """Outcome of loading one table."""
+    table_name: str
+    rows: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    # Rows that were not written and were quarantined instead.
+    rejected_rows: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.failed_batches == 0
+
+    def add(self, other: "LoadResult"):
+        """Adds the counters of another load of the same table."""
+        self.rows += other.rows
+        self.batches += other.batches
+        self.failed_batches += other.failed_batches
+        self.rejected_rows += other.rejected_rows
+
+
 class PostgresLoader:
     """
     A robust, production-grade PostgreSQL loader.
-    - Uses a single connection per table load for efficiency.
-    - Implements automatic retries for transient network errors.
+    - Uses a single connection per table load for efficiency, or several
+      pooled connections over disjoint partitions of a DataFrame (`workers`).
+    - Retries transient errors with exponential backoff and jitter.
+    - Bisects batches rejected for bad data and quarantines only the offending rows.
     - Supports `ON CONFLICT DO NOTHING` for idempotent writes.
+    - Streams batches with `COPY ... FROM STDIN` (text or binary), selectable per table.
+    - Optionally defers secondary indexes and FK checks during full reloads.
     """
-    def __init__(self, engine: Engine, schema: str):
+    def __init__(self, engine: Engine, schema: str, method: str = "copy",
+                 table_methods: Optional[Dict[str, str]] = None,
+                 dead_letters: Optional[DeadLetterStore] = None,
+                 deferred_ddl_dir: Optional[Path] = None):
         self.engine = engine
         self.schema = schema
+        self.method = method
+        self.table_methods = table_methods or {}
+        self.dead_letters = dead_letters
+        # Where the definitions dropped by `deferred_maintenance` are kept until rebuilt.
+        self.deferred_ddl_dir = Path(deferred_ddl_dir) if deferred_ddl_dir else None
+        self._column_types_cache: Dict[str, Dict[str, str]] = {}
+        self._primary_key_cache: Dict[str, List[str]] = {}
+        self._partition_column_cache: Dict[str, Optional[str]] = {}
+        # One adaptive sizer per table, so what was learned carries over between loads.
+        self._batch_sizers: Dict[str, BatchSizer] = {}
+        self._sizer_lock = threading.Lock()
+        for load_method in [method, *self.table_methods.values()]:
+            if load_method not in LOAD_METHODS:
+                raise ValueError(f"Unknown load method '{load_method}'. Expected one of {LOAD_METHODS}.")
+
+    def _resolve_method(self, table_name: str, method: Optional[str]) -> str:
+        """Picks the load strategy: explicit argument, then per-table override, then default."""
+        resolved = method or self.table_methods.get(table_name, self.method)
+        if resolved not in LOAD_METHODS:
+            raise ValueError(f"Unknown load method '{resolved}'. Expected one of {LOAD_METHODS}.")
+        return resolved
+
+    def _get_column_types(self, connection, table_name: str) -> Dict[str, str]:
+        """
+        Reads the target table's column types from the PostgreSQL catalog.
+        The result is cached per table, so the catalog is only queried once per run.
+        """
+        if table_name not in self._column_types_cache:
+            query = text("""
+                SELECT a.attname, t.typname
+                FROM pg_attribute a
+                JOIN pg_type t ON t.oid = a.atttypid
+                WHERE a.attrelid = CAST(:qualified_name AS regclass)
+                  AND a.attnum > 0 AND NOT a.attisdropped
+            """)
+            rows = connection.execute(query, {"qualified_name": f'"{self.schema}"."{table_name}"'})
+            self._column_types_cache[table_name] = {name: type_name for name, type_name in rows}
+        return self._column_types_cache[table_name]
+
+    def _is_self_referencing(self, connection, table_name: str) -> bool:
+        """Whether the target table has a foreign key onto itself (e.g. a parent_id column)."""
+        query = text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE contype = 'f'
+                  AND conrelid = CAST(:qualified_name AS regclass)
+                  AND confrelid = conrelid
+            )
+        """)
+        return bool(connection.execute(query, {"qualified_name": f'"{self.schema}"."{table_name}"'}).scalar())
+
+    def _get_primary_key(self, connection, table_name: str) -> List[str]:
+        """Reads (and caches) the target table's primary key columns, in key order."""
+        if table_name not in self._primary_key_cache:
+            query = text("""
+                SELECT a.attname
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = CAST(:qualified_name AS regclass) AND i.indisprimary
+                ORDER BY array_position(i.indkey::int2[], a.attnum)
+            """)
+            rows = connection.execute(query, {"qualified_name": f'"{self.schema}"."{table_name}"'})
+            self._primary_key_cache[table_name] = [name for (name,) in rows]
+        return self._primary_key_cache[table_name]
+
+    @staticmethod
+    def _conflict_clause(columns: list, primary_key: List[str], on_conflict: str, table_name: str = "") -> str:
+        """
+        Builds the ON CONFLICT clause for the requested conflict mode.
+
+        Upserts only rewrite rows whose values actually differ, so unchanged
+        rows produce no new tuple versions and no WAL.
+        """
+        if on_conflict == "nothing" or not primary_key:
+            return "ON CONFLICT DO NOTHING"
+        key_list = ', '.join(f'"{col}"' for col in primary_key)
+        value_columns = [col for col in columns if col.strip('"') not in primary_key]
+        if not value_columns:
+            return f"ON CONFLICT ({key_list}) DO NOTHING"
+        updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+        current = ', '.join(f'"{table_name}".{col}' for col in value_columns)
+        incoming = ', '.join(f"EXCLUDED.{col}" for col in value_columns)
+        return (
+            f"ON CONFLICT ({key_list}) DO UPDATE SET {updates} "
+            f"WHERE ROW({current}) IS DISTINCT FROM ROW({incoming})"
+        )
+
+    def _insert_batch(self, cursor, batch_df: pd.DataFrame, table_name: str, columns: list,
+                      conflict_clause: str = "ON CONFLICT DO NOTHING"):
+        """Writes one batch with a multi-row INSERT built by execute_values."""
+        # Nullable extension dtypes hold pd.NA, which psycopg2 cannot adapt.
+        batch_df = batch_df.astype(object).where(batch_df.notna(), None)
+        values = [tuple(row) for row in batch_df.itertuples(index=False, name=None)]
+        sql = f"""
+            INSERT INTO "{self.schema}"."{table_name}" ({', '.join(columns)})
+            VALUES %s
+            {conflict_clause}
+        """
+        execute_values(cursor, sql, values)
+
+    def _copy_batch(self, cursor, batch_df: pd.DataFrame, table_name: str, columns: list,
+                    column_types: Dict[str, str], binary: bool,
+                    conflict_clause: str = "ON CONFLICT DO NOTHING"):
+        """
+        Streams one batch with COPY FROM STDIN.
+
+        COPY has no ON CONFLICT clause, so rows are first copied into a
+        session-local temp table and then moved into the target with a single
+        set-based `INSERT ... SELECT ... ON CONFLICT ...`. This keeps the
+        same idempotent semantics as the INSERT path.
+
+        Returns the size of the COPY payload in bytes (characters for text).
+        """
+        if binary:
+            payload = encode_binary(batch_df, column_types)
+        else:
+            payload = encode_text(batch_df, column_types)
+        self._copy_through_staging(cursor, payload, table_name, columns,
+                                   "binary" if binary else "text", conflict_clause)
+        return payload.seek(0, 2)
+
+    def _copy_through_staging(self, cursor, payload, table_name: str, columns: list, copy_format: str,
+                              conflict_clause: str = "ON CONFLICT DO NOTHING"):
+        """COPYs a file-like payload into the session's temp staging table, then merges it into the target."""
+        staging_table = f'"tmp_{table_name}"'
+        cursor.execute(
+            f'CREATE TEMP TABLE IF NOT EXISTS {staging_table} '
+            f'(LIKE "{self.schema}"."{table_name}" INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+        )
+        column_list = ', '.join(columns)
+        cursor.copy_expert(f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT {copy_format})", payload)
+        cursor.execute(f"""
+            INSERT INTO "{self.schema}"."{table_name}" ({column_list})
+            SELECT {column_list} FROM {staging_table}
+            {conflict_clause}
+        """)
 
     def truncate_table(self, table_name: str):
         """Clears all data from a table to ensure a clean slate."""
@@ -33,7 +230,8 @@ class PostgresLoader:
         try:
             # The connection.execution_options is crucial for TRUNCATE
             # as it cannot run inside a transaction block in some PostgreSQL versions.
-            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            with telemetry.stage(table_name, "truncate"), \
+                    self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
                 query = text(f'TRUNCATE TABLE "{self.schema}"."{table_name}" RESTART IDENTITY CASCADE;')
                 connection.execute(query)
             print(f"--> Successfully truncated {table_name}.")
@@ -41,56 +239,1126 @@ class PostgresLoader:
             print(f"[ERROR] Failed to truncate {table_name}: {e}")
             raise
 
-    def load_dataframe(self, df: pd.DataFrame, table_name: str, batch_size: int = 5000, retries: int = 3):
+    def load_dataframe(self, df: pd.DataFrame, table_name: str, batch_size: Optional[int] = None, retries: int = 3,
+                       method: Optional[str] = None, on_conflict: str = "nothing",
+                       on_commit: Optional[Callable[[int, int], None]] = None, workers: int = 1) -> LoadResult:
         """
         Loads a DataFrame into a PostgreSQL table with a single connection and retries.
+
+        Args:
+            df (pd.DataFrame): The data to load. Column names must match the target table.
+            table_name (str): The target table in `self.schema`.
+            batch_size (int, optional): Fixed number of rows committed per transaction.
+                By default batches are sized adaptively by estimated bytes (see `BatchSizer`).
+            retries (int): Attempts per batch before it is reported as failed.
+            method (str, optional): One of LOAD_METHODS. Defaults to the per-table
+                override or the loader's default method.
+            on_conflict (str): One of CONFLICT_MODES. "update" upserts on the primary key.
+            on_commit (Callable, optional): Called with `(batch_num, rows)` once a
+                batch's rows are committed or quarantined (used for checkpoints).
+            workers (int): With more than one, the DataFrame is split into that many
+                disjoint partitions loaded concurrently (see `_load_partitions`).
+
+        Returns:
+            LoadResult: Rows sent and the number of batches that failed all retries.
         """
         if df.empty:
             print(f"[SKIP] No data to load for table: {table_name}")
-            return
+            return LoadResult(table_name)
 
-        columns = [f'"{col}"' for col in df.columns]
         total_rows = len(df)
-        num_batches = (total_rows + batch_size - 1) // batch_size
+        method = self._resolve_method(table_name, method)
+        if workers > 1 and total_rows > 1:
+            with self.engine.connect() as connection:
+                self_referencing = self._is_self_referencing(connection, table_name)
+                primary_key = self._get_primary_key(connection, table_name)
+            if not self_referencing:
+                return self._load_partitions(df, table_name, primary_key, workers, batch_size, retries, method,
+                                             on_conflict, on_commit)
+            print(f"--> {table_name} references itself; loading it over a single connection")
+        batches, sizer = self._batches(df, table_name, batch_size)
+
+        if sizer is None:
+            num_batches = (total_rows + batch_size - 1) // batch_size
+            print(f"--> Loading {total_rows} rows into {self.schema}.{table_name} in {num_batches} batches (method: {method})")
+        else:
+            num_batches = None
+            print(f"--> Loading {total_rows} rows into {self.schema}.{table_name} in adaptive batches (method: {method})")
+
+        result = self._load_batches(batches, table_name, method, retries, on_conflict, num_batches, sizer, on_commit)
+        print(f"--> Finished loading {table_name}")
+        return result
+
+    def _load_partitions(self, df: pd.DataFrame, table_name: str, primary_key: List[str], workers: int,
+                         batch_size: Optional[int], retries: int, method: str, on_conflict: str,
+                         on_commit: Optional[Callable[[int, int], None]]) -> LoadResult:
+        """
+        Splits `df` into `workers` disjoint partitions and loads each one over
+        its own pooled connection, in parallel threads. psycopg2 releases the
+        GIL while the server consumes a COPY, so threads are enough to keep
+        several connections busy.
+
+        Rows are assigned by a hash of the primary key, so every version of a
+        key lands in the same partition (in its original order) and
+        concurrent upserts never contend for the same row. Tables without a
+        primary key are split round-robin.
+
+        Failure semantics:
+        - Each batch still commits on its own, with the usual retries,
+          bisection and quarantine. Each partition sizes its batches with its
+          own `BatchSizer`, forked from the table's. A batch that fails only marks the table as
+          failed (`LoadResult.succeeded`); the other partitions carry on.
+        - An error that escapes a partition (e.g. the database went away)
+          stops the other partitions after their current batch and is
+          re-raised once all of them have stopped. What they committed stays
+          committed, as with a sequential load that fails part-way.
+        """
+        partitions = _split_partitions(df, primary_key, workers)
+        print(f"--> Loading {len(df)} rows into {self.schema}.{table_name} as {len(partitions)} partitions "
+              f"over {len(partitions)} connections (method: {method})")
+
+        stop = threading.Event()
+
+        def load_partition(number: int, partition: pd.DataFrame) -> LoadResult:
+            if batch_size is None:
+                # A sizer per partition: each adapts to its own connection's commit latency.
+                sizer = self.batch_sizer(table_name).fork()
+                batches = sizer.batches(partition)
+            else:
+                batches, sizer = self._batches(partition, table_name, batch_size)
+            batches = itertools.takewhile(lambda _: not stop.is_set(), batches)
+            try:
+                return self._load_batches(batches, table_name, method, retries, on_conflict, sizer=sizer,
+                                          on_commit=on_commit, label=f"p{number}:")
+            except BaseException:
+                stop.set()
+                raise
+
+        result = LoadResult(table_name)
+        with telemetry.stage(table_name, "parallel_load") as timer:
+            with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix=f"load-{table_name}") as executor:
+                futures = [executor.submit(load_partition, number, partition)
+                           for number, partition in enumerate(partitions, start=1)]
+            # Leaving the executor waits for every partition; now surface the first error.
+            for future in futures:
+                result.add(future.result())
+            timer.rows = result.rows
+        seconds = time.perf_counter() - timer.started
+        print(f"--> Finished loading {table_name}: {result.rows} rows over {len(partitions)} connections "
+              f"in {seconds:.1f}s ({result.rows / seconds if seconds else 0.0:.0f} rows/s)")
+        return result
+
+    def load_stream(self, chunks: Iterable[pd.DataFrame], table_name: str, batch_size: Optional[int] = None,
+                    retries: int = 3, method: Optional[str] = None,
+                    on_conflict: str = "nothing",
+                    on_commit: Optional[Callable[[int, int], None]] = None) -> LoadResult:
+        """
+        Loads an iterable of DataFrame chunks (e.g. API pages or CSV chunks) batch by batch.
+
+        Chunks are consumed lazily and regrouped into batches of `batch_size`
+        rows (or adaptively sized batches by default), so at most one batch is
+        held in memory regardless of table size.
+        Retry and `on_commit` semantics are the same as `load_dataframe`.
+
+        Returns:
+            LoadResult: Rows sent and the number of batches that failed all retries.
+        """
+        method = self._resolve_method(table_name, method)
+        batches, sizer = self._batches(chunks, table_name, batch_size)
+        size_label = batch_size if sizer is None else "adaptive size"
+        print(f"--> Streaming rows into {self.schema}.{table_name} in batches of {size_label} (method: {method})")
+        result = self._load_batches(batches, table_name, method, retries, on_conflict, sizer=sizer,
+                                    on_commit=on_commit)
+        if result.rows == 0:
+            print(f"[SKIP] No data to load for table: {table_name}")
+        else:
+            print(f"--> Finished loading {result.rows} rows into {table_name}")
+        return result
+
+    def load_csv_pages(self, pages: Iterable[Tuple[bytes, int]], table_name: str, columns: List[str],
+                       retries: int = 3, on_conflict: str = "nothing",
+                       on_commit: Optional[Callable[[int, int], None]] = None) -> LoadResult:
+        """
+        Loads raw CSV pages (e.g. PostgREST `text/csv` responses) with
+        `COPY ... (FORMAT csv)` without parsing them into Python rows.
+
+        Pages are concatenated into batches of up to LOAD_BATCH_BYTES and
+        merged through the same temp staging table as the other COPY paths,
+        so conflict handling is unchanged. When the database rejects a batch's
+        data, that batch alone is parsed into a DataFrame and bisected, so
+        only the offending rows are quarantined.
+
+        Args:
+            pages: `(body, rows)` tuples. Bodies have no header line and hold `columns` in order.
+            columns (List[str]): The target columns, in CSV field order.
+            on_commit (Callable, optional): As for `load_dataframe`.
+
+        Returns:
+            LoadResult: Rows sent and the number of batches that failed all retries.
+        """
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"Unknown conflict mode '{on_conflict}'. Expected one of {CONFLICT_MODES}.")
+        print(f"--> Streaming CSV into {self.schema}.{table_name} with COPY (batches of up to "
+              f"{settings.LOAD_BATCH_BYTES / 1e6:.0f} MB)")
+        result = LoadResult(table_name)
+        quoted_columns = [f'"{col}"' for col in columns]
+        with self.engine.connect() as connection:
+            primary_key = self._get_primary_key(connection, table_name) if on_conflict == "update" else []
+            if connection.in_transaction():
+                connection.commit()
+            conflict_clause = self._conflict_clause(quoted_columns, primary_key, on_conflict, table_name)
+
+            def write(cursor, payload: bytes):
+                self._copy_through_staging(cursor, io.BytesIO(payload), table_name, quoted_columns, "csv",
+                                           conflict_clause)
+
+            def write_rows(cursor, rows: pd.DataFrame):
+                # Rejected batches fall back to INSERT, which lets the server cast the text values.
+                self._insert_batch(cursor, rows, table_name, quoted_columns, conflict_clause)
+
+            for batch_num, (payload, rows) in enumerate(_csv_batches(pages, settings.LOAD_BATCH_BYTES), start=1):
+                result.rows += rows
+                result.batches += 1
+                started = time.perf_counter()
+                try:
+                    error = self._write_with_retry(connection, write, payload, table_name, batch_num, retries)
+                except Exception as e:
+                    telemetry.record(table_name, "batch_commit", time.perf_counter() - started, errors=1)
+                    print(f"    > CRITICAL: Batch {batch_num} failed after retries ({classify_error(e)} error). See logs.")
+                    result.failed_batches += 1
+                    self._quarantine(table_name, _parse_csv(payload, columns), e, result)
+                    if on_commit is not None:
+                        on_commit(batch_num, rows)
+                    continue
+                if error is None:
+                    print(f"    > Batch {batch_num} ({rows} rows) committed successfully.")
+                    telemetry.record(table_name, "batch_commit", time.perf_counter() - started, rows=rows,
+                                     bytes=len(payload))
+                    if on_commit is not None:
+                        on_commit(batch_num, rows)
+                    continue
+
+                print(f"    > Batch {batch_num} rejected by the database ({error}); bisecting...")
+                batch_df = _parse_csv(payload, columns)
+                rejected = self._bisect_batch(connection, write_rows, batch_df, error, table_name, batch_num, retries)
+                for rejected_rows, row_error in rejected:
+                    self._quarantine(table_name, rejected_rows, row_error, result)
+                telemetry.record(table_name, "batch_commit", time.perf_counter() - started,
+                                 rows=len(batch_df) - _rejected_count(rejected), errors=len(rejected))
+                print(f"    > Batch {batch_num}: {len(batch_df) - _rejected_count(rejected)} rows committed, "
+                      f"{_rejected_count(rejected)} quarantined.")
+                if on_commit is not None:
+                    on_commit(batch_num, rows)
+        if result.rows == 0:
+            print(f"[SKIP] No data to load for table: {table_name}")
+        else:
+            print(f"--> Finished loading {result.rows} rows into {table_name}")
+        return result
+
+    def load_with_swap(self, data, table_name: str, batch_size: Optional[int] = None, retries: int = 3,
+                       method: Optional[str] = None) -> LoadResult:
+        """
+        Zero-downtime full reload through a shadow table and an atomic swap.
+
+        The data is bulk-loaded into an index-free shadow copy of the table.
+        Its keys, indexes and constraints are then built in set-based passes,
+        and it replaces the live table in one short transaction. Readers keep
+        seeing the previous complete contents until the swap commits. Unlike
+        `TRUNCATE ... CASCADE`, child tables are left untouched: FKs that
+        reference the table are re-created against the new copy.
+
+        If any batch fails, the shadow table is discarded and the live table
+        is left as it was.
+
+        Args:
+            data: A DataFrame or an iterable of DataFrame chunks.
+            table_name (str): The live target table in `self.schema`.
+        """
+        method = self._resolve_method(table_name, method)
+        shadow_table = temporary_name(table_name, "shadow_")
+        self._create_shadow_table(table_name, shadow_table)
+
+        # The sizer is keyed by the live table: the shadow copy has the same row shape.
+        batches, sizer = self._batches(data, table_name, batch_size)
+        print(f"--> Loading {self.schema}.{table_name} through shadow table {shadow_table} (method: {method})")
+        try:
+            result = self._load_batches(batches, shadow_table, method, retries, sizer=sizer)
+        except Exception:
+            # E.g. the source stream failed part-way: never swap in a partial table.
+            print(f"    > ERROR: Loading {table_name} was interrupted; keeping the live table unchanged.")
+            self._drop_shadow_table(shadow_table)
+            raise
+        result.table_name = table_name
+
+        if not result.succeeded:
+            print(f"    > WARNING: {result.failed_batches} batch(es) failed; keeping the live {table_name} unchanged.")
+            self._drop_shadow_table(shadow_table)
+            return result
+
+        renames = self._build_shadow_keys(table_name, shadow_table)
+        self._swap_shadow_table(table_name, shadow_table, renames)
+        print(f"--> Swapped in {result.rows} rows for {table_name}")
+        return result
+
+    def _drop_shadow_table(self, shadow_table: str):
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {qualified_name(self.schema, shadow_table)}"))
+
+    def _create_shadow_table(self, table_name: str, shadow_table: str):
+        """Creates an empty, index-free copy of the live table (columns, NOT NULLs and defaults only)."""
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {qualified_name(self.schema, shadow_table)}"))
+            connection.execute(text(
+                f"CREATE TABLE {qualified_name(self.schema, shadow_table)} "
+                f"(LIKE {qualified_name(self.schema, table_name)} INCLUDING DEFAULTS)"
+            ))
+
+    def _build_shadow_keys(self, table_name: str, shadow_table: str) -> Dict[str, Dict[str, str]]:
+        """
+        Rebuilds the live table's keys, indexes and constraints on the loaded shadow table,
+        under temporary names (index and constraint names are unique per schema).
+
+        Rows that would violate a unique key are removed first, matching the
+        `ON CONFLICT DO NOTHING` behaviour of a regular load.
+
+        Returns:
+            Temporary-to-original name maps for "constraints" and "indexes".
+        """
+        shadow = qualified_name(self.schema, shadow_table)
+        renames = {"constraints": {}, "indexes": {}}
+        foreign_keys = []
+        with self.engine.begin() as connection:
+            indexes = get_indexes(connection, self.schema, table_name)
+            constraints = get_constraints(connection, self.schema, table_name)
+
+            for index in indexes:
+                if index["is_unique"] and index["columns"]:
+                    matches = " AND ".join(f'a."{col}" = b."{col}"' for col in index["columns"])
+                    connection.execute(text(
+                        f"DELETE FROM {shadow} a USING {shadow} b WHERE a.ctid > b.ctid AND {matches}"
+                    ))
 
-        print(f"--> Loading {total_rows} rows into {self.schema}.{table_name} in {num_batches} batches")
+            # Unique keys first so that their indexes exist before other constraints.
+            for constraint in sorted(constraints, key=lambda c: c["type"] not in ("p", "u", "x")):
+                temp_name = temporary_name(constraint["name"], "tmp_")
+                definition = constraint["definition"]
+                if constraint["type"] == "f":
+                    # Added NOT VALID and validated in one set-based pass below.
+                    definition += " NOT VALID"
+                    foreign_keys.append(temp_name)
+                connection.execute(text(f'ALTER TABLE {shadow} ADD CONSTRAINT "{temp_name}" {definition}'))
+                renames["constraints"][temp_name] = constraint["name"]
+
+            for index in indexes:
+                if index["is_constraint"]:
+                    continue
+                temp_name = temporary_name(index["name"], "tmp_")
+                connection.execute(text(
+                    retarget_index_definition(index["definition"], temp_name, self.schema, shadow_table)
+                ))
+                renames["indexes"][temp_name] = index["name"]
+            print(f"    > Built {len(renames['constraints'])} constraints and {len(renames['indexes'])} indexes on {shadow_table}")
+
+        for temp_name in foreign_keys:
+            self._validate_constraint(shadow, temp_name)
+
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"ANALYZE {shadow}"))
+        return renames
+
+    def _validate_constraint(self, table: str, constraint_name: str):
+        """Validates a NOT VALID constraint; a failure is reported but the constraint stays in place."""
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{constraint_name}"'))
+        except Exception as e:
+            print(f"    > WARNING: Constraint {constraint_name} on {table} could not be validated: {e}")
+            logger.error(f"Validation of {constraint_name} on {table} failed: {e}")
+
+    def _swap_shadow_table(self, table_name: str, shadow_table: str, renames: Dict[str, Dict[str, str]]):
+        """Atomically replaces the live table with the shadow table in a single transaction."""
+        live = qualified_name(self.schema, table_name)
+        with self.engine.begin() as connection:
+            referencing = get_referencing_foreign_keys(connection, self.schema, table_name)
+            sequences = get_owned_sequences(connection, self.schema, table_name)
+
+            connection.execute(text(f"LOCK TABLE {live} IN ACCESS EXCLUSIVE MODE"))
+            for fk in referencing:
+                connection.execute(text(f'ALTER TABLE {fk["table"]} DROP CONSTRAINT "{fk["name"]}"'))
+            for sequence in sequences.values():
+                # Detach serial sequences so they survive the DROP and keep counting.
+                connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+
+            # No CASCADE: dependent views make the swap fail (and roll back) instead of vanishing.
+            connection.execute(text(f"DROP TABLE {live}"))
+            connection.execute(text(f'ALTER TABLE {qualified_name(self.schema, shadow_table)} RENAME TO "{table_name}"'))
+
+            for column, sequence in sequences.items():
+                connection.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY {live}."{column}"'))
+            for temp_name, original in renames["constraints"].items():
+                connection.execute(text(f'ALTER TABLE {live} RENAME CONSTRAINT "{temp_name}" TO "{original}"'))
+            for temp_name, original in renames["indexes"].items():
+                connection.execute(text(f'ALTER INDEX "{self.schema}"."{temp_name}" RENAME TO "{original}"'))
+            for fk in referencing:
+                connection.execute(text(
+                    f'ALTER TABLE {fk["table"]} ADD CONSTRAINT "{fk["name"]}" {fk["definition"]} NOT VALID'
+                ))
+
+        # Re-check child rows against the new parent without blocking readers or writers.
+        for fk in referencing:
+            self._validate_constraint(fk["table"], fk["name"])
+
+    def partition_column(self, table_name: str) -> Optional[str]:
+        """The column a table is range-partitioned on, or None for a plain table (cached)."""
+        if table_name not in self._partition_column_cache:
+            query = text("""
+                SELECT a.attname
+                FROM pg_partitioned_table p
+                JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+                WHERE p.partrelid = CAST(:qualified_name AS regclass)
+                  AND p.partstrat = 'r' AND p.partnatts = 1
+            """)
+            with self.engine.connect() as connection:
+                column = connection.execute(query, {"qualified_name": qualified_name(self.schema, table_name)}).scalar()
+            self._partition_column_cache[table_name] = column
+        return self._partition_column_cache[table_name]
+
+    def load_partitioned(self, table_name: str, load: Callable[[str], LoadResult]) -> LoadResult:
+        """
+        Full reload of a table range-partitioned by month, touching only the months that changed.
+
+        `load(target)` loads the new data into the table named `target`; it
+        is pointed at an UNLOGGED, index-free staging copy (with the primary
+        key, so `ON CONFLICT DO NOTHING` and quarantining work as usual).
+        Each month's row count and content hash are then compared with its
+        live partition (see `_month_fingerprints`); unchanged months are left
+        alone. Every changed month's rows are copied into a fresh table, which
+        gets its indexes and statistics built while the live partition keeps
+        serving reads. A CHECK constraint matching the bounds lets ATTACH skip
+        its validation scan.
+
+        All swaps then happen in one short transaction: the DEFAULT partition
+        is emptied (every loaded month gets its own partition), each changed
+        month is swapped in (DETACH, DROP, ATTACH) and months missing from the
+        new data are truncated. Readers see either the old or the new table.
+
+        If any batch fails, the staging table is discarded and the live
+        table is left as it was; so is an error while the months are built.
+        """
+        column = self.partition_column(table_name)
+        staging = temporary_name(table_name, "load_")
+        with self.engine.begin() as connection:
+            constraints = get_constraints(connection, self.schema, table_name)
+            connection.execute(text(f"DROP TABLE IF EXISTS {qualified_name(self.schema, staging)}"))
+            connection.execute(text(
+                f"CREATE UNLOGGED TABLE {qualified_name(self.schema, staging)} "
+                f"(LIKE {qualified_name(self.schema, table_name)} INCLUDING DEFAULTS)"
+            ))
+            for constraint in constraints:
+                if constraint["type"] == "p":
+                    connection.execute(text(
+                        f"ALTER TABLE {qualified_name(self.schema, staging)} ADD {constraint['definition']}"
+                    ))
+
+        print(f"--> Loading {self.schema}.{table_name} by month through staging table {staging}")
+        try:
+            result = load(staging)
+        except Exception:
+            print(f"    > ERROR: Loading {table_name} was interrupted; keeping the live table unchanged.")
+            self._drop_shadow_table(staging)
+            raise
+        result.table_name = table_name
+        if not result.succeeded:
+            print(f"    > WARNING: {result.failed_batches} batch(es) failed; keeping the live {table_name} unchanged.")
+            self._drop_shadow_table(staging)
+            return result
+
+        with self.engine.begin() as connection:
+            new_months = self._month_fingerprints(connection, staging, column)
+            live_months = self._month_fingerprints(connection, table_name, column)
+            partitions = get_partitions(connection, self.schema, table_name)
+        live = {pd.Timestamp(p["lower"]): p["name"] for p in partitions if p["lower"] is not None}
+        default = next((p["name"] for p in partitions if p["is_default"]), None)
+        changed, stale, in_default = _partition_changes(new_months, live_months, live)
+
+        built: List[Tuple[pd.Timestamp, str, Dict[str, str]]] = []
+        try:
+            for month in changed:
+                built.append((month, *self._build_partition(table_name, staging, column, month, live.get(month))))
+            if built or stale or (default and in_default):
+                self._swap_partitions(table_name, built, live, default, stale)
+        except Exception:
+            print(f"    > ERROR: Replacing the partitions of {table_name} failed; keeping the live table unchanged.")
+            for _, new_table, _ in built:
+                self._drop_shadow_table(new_table)
+            raise
+        finally:
+            self._drop_shadow_table(staging)
+        self.premake_partitions(table_name)
+        print(f"--> Replaced {len(changed)} of {len(new_months)} monthly partition(s) of {table_name} "
+              f"({result.rows} rows loaded; {len(new_months) - len(changed)} unchanged)"
+              + (f"; emptied {len(stale)} month(s) no longer in the source" if stale else ""))
+        return result
 
+    def _month_fingerprints(self, connection, table_name: str, column: str) -> Dict[pd.Timestamp, Tuple[int, str]]:
+        """
+        Maps every month present in a table to its row count and an
+        order-independent hash of its rows' text, so a staged month can be
+        compared with the live one without moving any data.
+        """
+        rows = connection.execute(text(f"""
+            SELECT date_trunc('month', "{column}")::date AS month, count(*),
+                   md5(string_agg(md5(t::text), '' ORDER BY md5(t::text)))
+            FROM {qualified_name(self.schema, table_name)} AS t
+            WHERE "{column}" IS NOT NULL
+            GROUP BY 1
+        """))
+        return {pd.Timestamp(month): (count, digest) for month, count, digest in rows}
+
+    def _build_partition(self, table_name: str, staging: str, column: str, month: pd.Timestamp,
+                         live_partition: Optional[str]) -> Tuple[str, Dict[str, str]]:
+        """
+        Builds one month's partition from the staging table, next to the live one.
+
+        Returns:
+            The new table's name and its index renames (temporary -> final name).
+        """
+        name = live_partition or partition_name(table_name, month)
+        new_table = temporary_name(name, "new_")
+        lower, upper = month_bounds(month)
+        parent, new = qualified_name(self.schema, table_name), qualified_name(self.schema, new_table)
+        renames: Dict[str, str] = {}
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {new}"))
+            connection.execute(text(f"CREATE TABLE {new} (LIKE {parent} INCLUDING DEFAULTS)"))
+            connection.execute(text(
+                f'INSERT INTO {new} SELECT * FROM {qualified_name(self.schema, staging)} '
+                f'WHERE "{column}" >= \'{lower}\' AND "{column}" < \'{upper}\''
+            ))
+            connection.execute(text(
+                f'ALTER TABLE {new} ADD CONSTRAINT partition_range '
+                f'CHECK ("{column}" IS NOT NULL AND "{column}" >= \'{lower}\' AND "{column}" < \'{upper}\')'
+            ))
+            # Build the parent's keys and indexes up front, so ATTACH only has to link them.
+            for constraint in get_constraints(connection, self.schema, table_name):
+                if constraint["type"] in ("p", "u"):
+                    final = f"{name}_pkey" if constraint["type"] == "p" else f"{name}_{constraint['name']}"
+                    renames[temporary_name(final, "new_")] = final[:63]
+                    connection.execute(text(
+                        f'ALTER TABLE {new} ADD CONSTRAINT "{temporary_name(final, "new_")}" {constraint["definition"]}'
+                    ))
+            for index in get_indexes(connection, self.schema, table_name):
+                if index["is_constraint"]:
+                    continue
+                final = f"{name}_{'_'.join(index['columns']) or len(renames)}_idx"
+                temp_name = temporary_name(final, "new_")
+                renames[temp_name] = final[:63]
+                connection.execute(text(retarget_index_definition(index["definition"], temp_name, self.schema, new_table)))
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text(f"ANALYZE {new}"))
+        return new_table, renames
+
+    def _swap_partitions(self, table_name: str, built: List[Tuple[pd.Timestamp, str, Dict[str, str]]],
+                         live: Dict[pd.Timestamp, str], default: Optional[str], stale: List[str]):
+        """Empties the DEFAULT partition, swaps the built months in and truncates stale months, atomically."""
+        parent = qualified_name(self.schema, table_name)
+        with self.engine.begin() as connection:
+            if default:
+                connection.execute(text(f"TRUNCATE TABLE {qualified_name(self.schema, default)}"))
+            for month, new_table, renames in built:
+                name = live.get(month) or partition_name(table_name, month)
+                lower, upper = month_bounds(month)
+                if month in live:
+                    connection.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {qualified_name(self.schema, name)}"))
+                    connection.execute(text(f"DROP TABLE {qualified_name(self.schema, name)}"))
+                connection.execute(text(f'ALTER TABLE {qualified_name(self.schema, new_table)} RENAME TO "{name}"'))
+                for temp_name, final in renames.items():
+                    connection.execute(text(f'ALTER INDEX "{self.schema}"."{temp_name}" RENAME TO "{final}"'))
+                connection.execute(text(
+                    f"ALTER TABLE {parent} ATTACH PARTITION {qualified_name(self.schema, name)} "
+                    f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                ))
+            for name in stale:
+                connection.execute(text(f"TRUNCATE TABLE {qualified_name(self.schema, name)}"))
+
+    def premake_partitions(self, table_name: str, months: Optional[int] = None):
+        """
+        Makes sure monthly partitions exist from the current month through
+        `months` (PARTITION_PREMAKE_MONTHS) months ahead, so incremental
+        loads of recent rows never land in the DEFAULT partition. Rows the
+        DEFAULT partition already holds for a new month are moved into it.
+        """
+        months = settings.PARTITION_PREMAKE_MONTHS if months is None else months
+        column = self.partition_column(table_name)
+        current = pd.Timestamp.now().normalize().replace(day=1)
+        parent = qualified_name(self.schema, table_name)
+        with self.engine.begin() as connection:
+            partitions = get_partitions(connection, self.schema, table_name)
+            existing = {pd.Timestamp(p["lower"]) for p in partitions if p["lower"] is not None}
+            default = next((p["name"] for p in partitions if p["is_default"]), None)
+            for offset in range(months + 1):
+                month = current + pd.DateOffset(months=offset)
+                if month in existing:
+                    continue
+                name = qualified_name(self.schema, partition_name(table_name, month))
+                lower, upper = month_bounds(month)
+                condition = f'"{column}" >= \'{lower}\' AND "{column}" < \'{upper}\''
+                connection.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)"))
+                if default:
+                    connection.execute(text(
+                        f"WITH moved AS (DELETE FROM {qualified_name(self.schema, default)} WHERE {condition} "
+                        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+                    ))
+                connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+                print(f"--> Created partition {partition_name(table_name, month)}")
+
+    @contextmanager
+    def deferred_maintenance(self, table_name: str):
+        """
+        Bulk-load mode for a full reload: defers index and FK maintenance
+        until the block has loaded the table.
+
+        On entry, the table's secondary indexes (everything not backing a
+        PRIMARY KEY / UNIQUE constraint, so `ON CONFLICT` keeps working) and
+        its own foreign keys are dropped, so rows are appended without
+        per-row index updates or FK lookups. On exit, also after an error:
+        - rows that would violate a dropped unique index are removed (the
+          first loaded row is kept, as `ON CONFLICT DO NOTHING` would),
+        - the indexes are rebuilt, up to BULK_INDEX_WORKERS at a time,
+        - the FKs are re-added NOT VALID and validated in one set-based pass
+          each (a violation is reported, and the FK stays NOT VALID),
+        - the table is ANALYZEd, so the planner has fresh statistics.
+
+        The dropped definitions are saved under `deferred_ddl_dir` first, so
+        that a run killed mid-load still gets them back from
+        `restore_deferred_maintenance` at the start of the next run.
+        """
+        deferred = self._drop_deferred_objects(table_name)
+        try:
+            yield
+        finally:
+            if deferred["indexes"] or deferred["foreign_keys"]:
+                self._rebuild_deferred_objects(table_name, deferred)
+
+    def restore_deferred_maintenance(self):
+        """Rebuilds indexes and FKs left dropped by a bulk load that never finished."""
+        if self.deferred_ddl_dir is None or not self.deferred_ddl_dir.exists():
+            return
+        for path in sorted(self.deferred_ddl_dir.glob("*.json")):
+            print(f"--> Restoring indexes and foreign keys left dropped by an interrupted bulk load of {path.stem}")
+            self._rebuild_deferred_objects(path.stem, json.loads(path.read_text()))
+
+    def _deferred_ddl_path(self, table_name: str) -> Optional[Path]:
+        return self.deferred_ddl_dir / f"{table_name}.json" if self.deferred_ddl_dir else None
+
+    def _drop_deferred_objects(self, table_name: str) -> Dict[str, List[Dict]]:
+        table = qualified_name(self.schema, table_name)
+        with self.engine.begin() as connection:
+            indexes = [
+                {key: index[key] for key in ("name", "definition", "is_unique", "columns")}
+                for index in get_indexes(connection, self.schema, table_name) if not index["is_constraint"]
+            ]
+            foreign_keys = [
+                {"name": constraint["name"], "definition": constraint["definition"]}
+                for constraint in get_constraints(connection, self.schema, table_name) if constraint["type"] == "f"
+            ]
+            deferred = {"indexes": indexes, "foreign_keys": foreign_keys}
+            if not indexes and not foreign_keys:
+                return deferred
+            path = self._deferred_ddl_path(table_name)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(deferred, indent=2))
+            for fk in foreign_keys:
+                connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+            for index in indexes:
+                connection.execute(text(f'DROP INDEX "{self.schema}"."{index["name"]}"'))
+        print(f"--> Deferred {len(indexes)} index(es) and {len(foreign_keys)} foreign key(s) on {table_name} "
+              f"until the load completes")
+        return deferred
+
+    def _rebuild_deferred_objects(self, table_name: str, deferred: Dict[str, List[Dict]]):
+        """Re-creates what `_drop_deferred_objects` dropped; objects that already exist are skipped."""
+        table = qualified_name(self.schema, table_name)
+        with telemetry.stage(table_name, "index_rebuild"):
+            with self.engine.begin() as connection:
+                existing_indexes = {index["name"] for index in get_indexes(connection, self.schema, table_name)}
+                existing_constraints = {c["name"] for c in get_constraints(connection, self.schema, table_name)}
+                indexes = [index for index in deferred["indexes"] if index["name"] not in existing_indexes]
+                foreign_keys = [fk for fk in deferred["foreign_keys"] if fk["name"] not in existing_constraints]
+                for index in indexes:
+                    if index["is_unique"] and index["columns"]:
+                        matches = " AND ".join(f'a."{col}" = b."{col}"' for col in index["columns"])
+                        removed = connection.execute(text(
+                            f"DELETE FROM {table} a USING {table} b WHERE a.ctid > b.ctid AND {matches}"
+                        )).rowcount
+                        if removed:
+                            print(f"    > Removed {removed} row(s) of {table_name} duplicating {index['name']}")
+
+            def build(index: Dict):
+                with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                    connection.execute(text(index["definition"]))
+
+            if indexes:
+                workers = max(1, min(settings.BULK_INDEX_WORKERS, len(indexes)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"index-{table_name}") as executor:
+                    list(executor.map(build, indexes))
+
+            with self.engine.begin() as connection:
+                for fk in foreign_keys:
+                    connection.execute(text(
+                        f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" {fk["definition"]} NOT VALID'
+                    ))
+            for fk in foreign_keys:
+                self._validate_constraint(table, fk["name"])
+
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text(f"ANALYZE {table}"))
+        path = self._deferred_ddl_path(table_name)
+        if path is not None:
+            path.unlink(missing_ok=True)
+        print(f"--> Rebuilt {len(indexes)} index(es) and {len(foreign_keys)} foreign key(s) on {table_name} "
+              f"and analyzed it")
+
+    def load_differential(self, data, table_name: str, batch_size: Optional[int] = None, retries: int = 3,
+                          method: Optional[str] = None, delete_missing: bool = False) -> LoadResult:
+        """
+        Differential load: only new or changed rows are written.
+
+        A stable 64-bit hash of every source row is computed in one vectorized
+        pass and compared, by primary key, with the hashes stored in the
+        `etl_row_hashes` control table at the previous load. Only rows whose
+        hash differs (or that are new) are upserted, with an
+        `IS DISTINCT FROM` guard. When the stored hashes no longer match the
+        target's row count (e.g. it was truncated or reloaded by another
+        mode), every row is treated as changed and the hashes are rebuilt.
+
+        Args:
+            data: A DataFrame or an iterable of DataFrame chunks (materialized,
+                since the whole source is needed to detect changes and deletions).
+            table_name (str): The target table in `self.schema`.
+            delete_missing (bool): Also delete target rows whose key is no
+                longer present in the source.
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.concat(list(data), ignore_index=True)
+        method = self._resolve_method(table_name, method)
+        if df.empty:
+            print(f"[SKIP] No data to load for table: {table_name}")
+            return LoadResult(table_name)
+
+        with self.engine.connect() as connection:
+            primary_key = self._get_primary_key(connection, table_name)
+            if not primary_key:
+                raise ValueError(f"Differential loads need a primary key; {table_name} has none.")
+            stored = pd.DataFrame(
+                connection.execute(
+                    text(f"SELECT key_hash, row_hash FROM {qualified_name(self.schema, ROW_HASH_TABLE)} "
+                         f"WHERE table_name = :table_name"),
+                    {"table_name": table_name},
+                ).fetchall(),
+                columns=["key_hash", "row_hash"],
+            )
+            target_rows = connection.execute(
+                text(f"SELECT COUNT(*) FROM {qualified_name(self.schema, table_name)}")
+            ).scalar()
+
+        df = df.drop_duplicates(subset=primary_key, keep="last")
+        key_hashes = row_hashes(df, primary_key)
+        all_hashes = row_hashes(df, list(df.columns))
+
+        rebuild = target_rows != len(stored)
+        if rebuild:
+            print(f"--> Stored hashes for {table_name} are out of sync ({len(stored)} vs {target_rows} rows); rebuilding.")
+            changed_mask = pd.Series(True, index=df.index)
+        else:
+            previous = key_hashes.map(stored.set_index("key_hash")["row_hash"])
+            changed_mask = previous.isna() | (previous != all_hashes)
+
+        changed = df[changed_mask.to_numpy()]
+        print(f"--> Differential load of {table_name}: {len(changed)} new/changed of {len(df)} rows (method: {method})")
+        batches, sizer = self._batches(changed, table_name, batch_size)
+        result = self._load_batches(batches, table_name, method, retries, on_conflict="update", sizer=sizer)
+        result.table_name = table_name
+
+        if not result.succeeded or result.rejected_rows:
+            # Leave the stored hashes untouched; the next run re-sends these rows.
+            print(f"    > WARNING: {result.failed_batches} batch(es) failed and {result.rejected_rows} row(s) "
+                  f"were quarantined; row hashes for {table_name} not updated.")
+            return result
+
+        deleted = self._delete_missing_rows(df, table_name, primary_key) if delete_missing else 0
+        self._store_row_hashes(
+            table_name,
+            key_hashes[changed_mask.to_numpy()],
+            all_hashes[changed_mask.to_numpy()],
+            current_keys=key_hashes if (delete_missing or rebuild) else None,
+        )
+        print(f"--> Finished differential load of {table_name} ({deleted} rows deleted)")
+        return result
+
+    def _delete_missing_rows(self, df: pd.DataFrame, table_name: str, primary_key: List[str]) -> int:
+        """Deletes target rows whose primary key is absent from the source, in one set-based statement."""
+        keys = df[primary_key]
+        key_list = ', '.join(f'"{col}"' for col in primary_key)
+        staging_table = f'"{temporary_name(table_name, "tmp_keys_")}"'
+        with self.engine.begin() as connection:
+            column_types = self._get_column_types(connection, table_name)
+            raw_conn = connection.connection
+            with raw_conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+                    f"SELECT {key_list} FROM {qualified_name(self.schema, table_name)} WITH NO DATA"
+                )
+                cursor.copy_expert(f"COPY {staging_table} ({key_list}) FROM STDIN WITH (FORMAT text)",
+                                   encode_text(keys, column_types))
+                matches = " AND ".join(f't."{col}" = k."{col}"' for col in primary_key)
+                cursor.execute(
+                    f"DELETE FROM {qualified_name(self.schema, table_name)} t "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM {staging_table} k WHERE {matches})"
+                )
+                return cursor.rowcount
+
+    def _store_row_hashes(self, table_name: str, key_hashes: pd.Series, hashes: pd.Series,
+                          current_keys: Optional[pd.Series] = None):
+        """
+        Upserts the hashes of the rows just written. When `current_keys` is
+        given, hashes for keys no longer in the source are removed as well.
+        """
+        hash_table = qualified_name(self.schema, ROW_HASH_TABLE)
+        with self.engine.begin() as connection:
+            raw_conn = connection.connection
+            with raw_conn.cursor() as cursor:
+                if current_keys is not None:
+                    cursor.execute(
+                        f"DELETE FROM {hash_table} WHERE table_name = %s AND NOT (key_hash = ANY(%s))",
+                        (table_name, current_keys.tolist()),
+                    )
+                execute_values(
+                    cursor,
+                    f"""
+                        INSERT INTO {hash_table} (table_name, key_hash, row_hash) VALUES %s
+                        ON CONFLICT (table_name, key_hash) DO UPDATE SET row_hash = EXCLUDED.row_hash
+                    """,
+                    list(zip([table_name] * len(key_hashes), key_hashes.tolist(), hashes.tolist())),
+                    page_size=10000,
+                )
+
+    def batch_sizer(self, table_name: str) -> BatchSizer:
+        """Returns the table's adaptive batch sizer, creating it from settings on first use."""
+        with self._sizer_lock:
+            if table_name not in self._batch_sizers:
+                self._batch_sizers[table_name] = BatchSizer(
+                    target_bytes=settings.LOAD_BATCH_BYTES,
+                    target_seconds=settings.LOAD_BATCH_TARGET_SECONDS,
+                    min_rows=settings.LOAD_BATCH_MIN_ROWS,
+                    max_rows=settings.LOAD_BATCH_MAX_ROWS,
+                )
+            return self._batch_sizers[table_name]
+
+    def _batches(self, data, table_name: str,
+                 batch_size: Optional[int]) -> Tuple[Iterator[pd.DataFrame], Optional[BatchSizer]]:
+        """
+        Splits a DataFrame or regroups a chunk stream into batches: fixed-size
+        when `batch_size` is given, byte-budgeted and adaptive otherwise.
+        """
+        if batch_size is None:
+            sizer = self.batch_sizer(table_name)
+            return sizer.batches(data), sizer
+        if isinstance(data, pd.DataFrame):
+            return (data.iloc[i:i + batch_size] for i in range(0, len(data), batch_size)), None
+        return _rebatch(data, batch_size), None
+
+    def _write_with_retry(self, connection, write, rows: pd.DataFrame, table_name: str, batch_num: int,
+                          retries: int, sizer: Optional[BatchSizer] = None) -> Optional[Exception]:
+        """
+        Writes `rows` in one transaction, retrying transient errors with
+        exponential backoff and jitter.
+
+        Returns:
+            None on success, or the error when the rows were rejected as invalid (a data error).
+
+        Raises:
+            The last error when a transient error outlives `retries` attempts,
+            or immediately on a fatal (statement-level) error.
+        """
+        for attempt in range(retries):
+            try:
+                # Use a nested transaction for the batch insert.
+                with connection.begin():
+                    # Work on the raw psycopg2 connection for execute_values / COPY.
+                    with connection.connection.cursor() as cursor:
+                        write(cursor, rows)
+                return None
+            except Exception as e:
+                kind = classify_error(e)
+                logger.error(f"Batch {batch_num} (Table: {table_name}) Attempt {attempt + 1} failed ({kind}): {e}")
+                if kind == DATA:
+                    return e
+                if kind == FATAL or attempt == retries - 1:
+                    raise
+                if sizer is not None:
+                    sizer.record_failure()
+                telemetry.record(table_name, "batch_commit", retries=1, calls=0)
+                delay = backoff_delay(attempt, settings.LOAD_RETRY_BASE_SECONDS, settings.LOAD_RETRY_MAX_SECONDS)
+                print(f"    > Batch {batch_num} Attempt {attempt + 1}/{retries} failed: {e}")
+                print(f"    > Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _bisect_batch(self, connection, write, rows: pd.DataFrame, error: Exception, table_name: str,
+                      batch_num: int, retries: int) -> List[Tuple[pd.DataFrame, Exception]]:
+        """
+        Isolates the rows of a rejected batch that cause data errors.
+
+        The batch is split in halves and each half is retried on its own,
+        recursively, until the failing rows are singled out. Valid halves are
+        committed along the way, so only the offending rows are returned,
+        each with the error that rejected it. A handful of bad rows in a batch
+        of n costs O(log n) extra statements per bad row.
+        """
+        if len(rows) == 1:
+            return [(rows, error)]
+        middle = len(rows) // 2
+        rejected = []
+        for half in (rows.iloc[:middle], rows.iloc[middle:]):
+            try:
+                half_error = self._write_with_retry(connection, write, half, table_name, batch_num, retries)
+            except Exception as e:
+                rejected.append((half, e))
+                continue
+            if half_error is not None:
+                rejected.extend(self._bisect_batch(connection, write, half, half_error, table_name, batch_num, retries))
+        return rejected
+
+    def _quarantine(self, table_name: str, rows: pd.DataFrame, error: Exception, result: LoadResult):
+        result.rejected_rows += len(rows)
+        if self.dead_letters is not None:
+            self.dead_letters.write(table_name, rows, error)
+
+    def replay_dead_letters(self, table_name: str, method: Optional[str] = None,
+                            on_conflict: str = "update") -> LoadResult:
+        """
+        Re-applies a table's quarantined rows (e.g. after fixing the target
+        schema or the rows themselves). Rows rejected again go back to the
+        dead-letter store. Upserts by default, so replaying is idempotent.
+        The store is only cleared once every batch went through: if a batch
+        fails or the replay raises, all rows stay quarantined for the next try.
+        Rows set aside as duplicate keys are replayed with `DO NOTHING`, so they
+        never overwrite the occurrence that was loaded instead.
+        """
+        if self.dead_letters is None:
+            raise ValueError("This loader has no dead-letter store configured.")
+        result = LoadResult(table_name)
+        groups, mark = self.dead_letters.read(table_name)
+        if not groups:
+            print(f"--> No quarantined rows to replay into {table_name}")
+            return result
+        try:
+            for kind, df in sorted(groups.items()):
+                kind_conflict = "nothing" if kind == DUPLICATE_KEY else on_conflict
+                print(f"--> Replaying {len(df)} quarantined row(s) ({kind}) into {table_name}")
+                result.add(self.load_dataframe(df, table_name, method=method, on_conflict=kind_conflict))
+        except BaseException:
+            self.dead_letters.settle(table_name, mark, applied=False)
+            raise
+        self.dead_letters.settle(table_name, mark, applied=result.succeeded)
+        if not result.succeeded:
+            print(f"    > WARNING: {result.failed_batches} batch(es) failed; all {table_name} rows stay quarantined.")
+        return result
+
+    def _load_batches(self, batches: Iterable[pd.DataFrame], table_name: str, method: str,
+                      retries: int, on_conflict: str = "nothing",
+                      num_batches: Optional[int] = None, sizer: Optional[BatchSizer] = None,
+                      on_commit: Optional[Callable[[int, int], None]] = None, label: str = "") -> LoadResult:
+        """
+        Writes each batch in its own transaction over a single connection.
+
+        Transient errors are retried with exponential backoff. When the
+        database rejects a batch's data, the batch is bisected so that the
+        valid rows are still loaded and only the offending rows are
+        quarantined in the dead-letter store. Commit latencies and failures
+        are reported to `sizer`, which sizes the next batch. Once a batch's
+        rows are durably committed or quarantined, `on_commit(batch_num, rows)`
+        is called with the number of source rows the batch consumed.
+        `label` prefixes the batch numbers in progress messages.
+        """
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError(f"Unknown conflict mode '{on_conflict}'. Expected one of {CONFLICT_MODES}.")
+        result = LoadResult(table_name)
         # Use a single connection for the entire table load for efficiency and stability.
         with self.engine.connect() as connection:
-            for i in range(0, total_rows, batch_size):
-                batch_df = df.iloc[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
-                
-                # --- Retry Logic ---
-                for attempt in range(retries):
-                    try:
-                        # Use a nested transaction for the batch insert.
-                        with connection.begin():
-                            values = [tuple(row) for row in batch_df.itertuples(index=False, name=None)]
-                            
-                            # Use execute_values from psycopg2 for high performance
-                            raw_conn = connection.connection
-                            with raw_conn.cursor() as cursor:
-                                sql = f"""
-                                    INSERT INTO "{self.schema}"."{table_name}" ({', '.join(columns)})
-                                    VALUES %s
-                                    ON CONFLICT DO NOTHING
-                                """
-                                execute_values(cursor, sql, values)
-                        
-                        print(f"    > Batch {batch_num}/{num_batches} committed successfully.")
-                        break # Success, exit the retry loop.
-
-                    except Exception as e:
-                        print(f"    > Batch {batch_num} Attempt {attempt + 1}/{retries} failed: {e}")
-                        logger.error(f"Batch {batch_num} (Table: {table_name}) Attempt {attempt + 1} failed: {e}")
-                        if attempt < retries - 1:
-                            time.sleep(2) # Wait for 2 seconds before retrying
-                        else:
-                            print(f"    > CRITICAL: Batch {batch_num} failed after {retries} attempts. See logs.")
-                            
-        print(f"--> Finished loading {table_name}")
+            column_types = self._get_column_types(connection, table_name) if method != "insert" else {}
+            primary_key = self._get_primary_key(connection, table_name) if on_conflict == "update" else []
+            if connection.in_transaction():
+                connection.commit()
+            for batch_num, batch_df in enumerate(batches, start=1):
+                source_rows = len(batch_df)
+                if primary_key:
+                    # An upsert cannot touch the same row twice in one statement.
+                    batch_df = batch_df.drop_duplicates(subset=primary_key, keep="last")
+                columns = [f'"{col}"' for col in batch_df.columns]
+                conflict_clause = self._conflict_clause(columns, primary_key, on_conflict, table_name)
+                batch_label = f"{label}{batch_num}/{num_batches}" if num_batches else f"{label}{batch_num}"
+                result.rows += len(batch_df)
+                result.batches += 1
+
+                payload_bytes = 0
+
+                def write(cursor, rows):
+                    nonlocal payload_bytes
+                    if method == "insert":
+                        self._insert_batch(cursor, rows, table_name, columns, conflict_clause)
+                    else:
+                        payload_bytes = self._copy_batch(cursor, rows, table_name, columns, column_types,
+                                                         binary=(method == "copy_binary"),
+                                                         conflict_clause=conflict_clause)
+
+                started = time.perf_counter()
+                try:
+                    error = self._write_with_retry(connection, write, batch_df, table_name, batch_num, retries, sizer)
+                except Exception as e:
+                    # Retries exhausted on a transient error, or the statement itself is invalid.
+                    telemetry.record(table_name, "batch_commit", time.perf_counter() - started, errors=1)
+                    print(f"    > CRITICAL: Batch {batch_label} failed after retries ({classify_error(e)} error). See logs.")
+                    result.failed_batches += 1
+                    self._quarantine(table_name, batch_df, e, result)
+                    if on_commit is not None:
+                        on_commit(batch_num, source_rows)
+                    continue
+
+                elapsed = time.perf_counter() - started
+                if error is None:
+                    print(f"    > Batch {batch_label} ({len(batch_df)} rows) committed successfully.")
+                    telemetry.record(table_name, "batch_commit", elapsed, rows=len(batch_df),
+                                     bytes=payload_bytes)
+                    if sizer is not None:
+                        sizer.record_success(elapsed)
+                    if on_commit is not None:
+                        on_commit(batch_num, source_rows)
+                    continue
+
+                # A data error: isolate the offending rows and load the rest.
+                print(f"    > Batch {batch_label} rejected by the database ({error}); bisecting...")
+                rejected = self._bisect_batch(connection, write, batch_df, error, table_name, batch_num, retries)
+                for rows, row_error in rejected:
+                    self._quarantine(table_name, rows, row_error, result)
+                telemetry.record(table_name, "batch_commit", time.perf_counter() - started,
+                                 rows=len(batch_df) - _rejected_count(rejected), errors=len(rejected))
+                print(f"    > Batch {batch_label}: {len(batch_df) - _rejected_count(rejected)} rows committed, "
+                      f"{_rejected_count(rejected)} quarantined.")
+                if on_commit is not None:
+                    on_commit(batch_num, source_rows)
+        return result
+
+
+def partition_name(table_name: str, month: pd.Timestamp) -> str:
+    """The name of a table's monthly partition, e.g. `stg_aries__daily_capacities_p2024_01`."""
+    return f"{table_name}_p{month:%Y_%m}"
+
+
+def month_bounds(month: pd.Timestamp) -> Tuple[str, str]:
+    """The inclusive lower and exclusive upper bound of a monthly partition, as ISO dates."""
+    return f"{month:%Y-%m-%d}", f"{month + pd.DateOffset(months=1):%Y-%m-%d}"
+
+
+def _partition_changes(new_months: Dict[pd.Timestamp, Tuple[int, str]],
+                       live_months: Dict[pd.Timestamp, Tuple[int, str]],
+                       live: Dict[pd.Timestamp, str]) -> Tuple[List[pd.Timestamp], List[str], bool]:
+    """
+    Compares the staged months with the live table (see `_month_fingerprints`).
+
+    Returns:
+        The months to rebuild (new, or with a different fingerprint), the
+        live partitions holding months no longer in the source, and whether
+        the DEFAULT partition holds rows of months without a partition.
+    """
+    changed = [month for month, fingerprint in sorted(new_months.items())
+               if month not in live or live_months.get(month) != fingerprint]
+    stale = [name for month, name in live.items() if month not in new_months and month in live_months]
+    return changed, stale, any(month not in live for month in live_months)
+
+
+def _split_partitions(df: pd.DataFrame, primary_key: List[str], workers: int) -> List[pd.DataFrame]:
+    """
+    Splits `df` into at most `workers` disjoint, non-empty partitions by a
+    hash of the primary key (round-robin without one), keeping row order.
+    """
+    if primary_key:
+        keys = pd.util.hash_pandas_object(df[primary_key], index=False).to_numpy()
+    else:
+        keys = pd.RangeIndex(len(df)).to_numpy()
+    assignment = keys % workers
+    partitions = [df[assignment == i] for i in range(workers)]
+    return [partition for partition in partitions if not partition.empty]
+
+
+def _rejected_count(rejected: List[Tuple[pd.DataFrame, Exception]]) -> int:
+    return sum(len(rows) for rows, _ in rejected)
+
+
+def row_hashes(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """
+    Computes a stable signed 64-bit hash per row over `columns`, vectorized.
+
+    Values are normalized to strings (with a fixed NULL marker) first, so the
+    hash does not depend on whether a column arrived as object, string or a
+    nullable extension dtype. Columns are hashed in name order, so neither
+    does it depend on the order the source sent them in.
+    """
+    normalized = df[sorted(columns)].astype("string").fillna("\\N")
+    return pd.util.hash_pandas_object(normalized, index=False).astype("int64")
+
+
+def _csv_batches(pages: Iterable[Tuple[bytes, int]], max_bytes: int) -> Iterator[Tuple[bytes, int]]:
+    """Concatenates `(body, rows)` CSV pages into batches of up to `max_bytes` (a larger page is its own batch)."""
+    buffer: List[bytes] = []
+    buffered_bytes = buffered_rows = 0
+    for body, rows in pages:
+        if buffer and buffered_bytes + len(body) > max_bytes:
+            yield b"".join(buffer), buffered_rows
+            buffer, buffered_bytes, buffered_rows = [], 0, 0
+        buffer.append(body)
+        buffered_bytes += len(body)
+        buffered_rows += rows
+    if buffer:
+        yield b"".join(buffer), buffered_rows
+
+
+def _parse_csv(payload: bytes, columns: List[str]) -> pd.DataFrame:
+    """Parses a CSV batch into text columns; empty fields become NULL."""
+    return pd.read_csv(io.BytesIO(payload), names=columns, header=None, dtype=str, keep_default_na=False,
+                       na_values=[""])
+
+
+def _rebatch(chunks: Iterable[pd.DataFrame], batch_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Regroups a stream of DataFrames of arbitrary sizes into batches of `batch_size` rows.
+    Small chunks are buffered and concatenated; large chunks are sliced.
+    """
+    buffer: List[pd.DataFrame] = []
+    buffered_rows = 0
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        buffer.append(chunk)
+        buffered_rows += len(chunk)
+        if buffered_rows < batch_size:
+            continue
+        combined = pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
+        full_rows = buffered_rows - buffered_rows % batch_size
+        for i in range(0, full_rows, batch_size):
+            yield combined.iloc[i:i + batch_size]
+        remainder = combined.iloc[full_rows:]
+        buffer = [remainder] if not remainder.empty else []
+        buffered_rows = len(remainder)
+    if buffer:
+        yield pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
 
 
 # Global instance for reuse
-postgres_loader = PostgresLoader(engine=engine, schema=settings.DB_SCHEMA)
+postgres_loader = PostgresLoader(
+    engine=engine,
+    schema=settings.DB_SCHEMA,
+    method=settings.LOAD_METHOD,
+    dead_letters=DeadLetterStore(settings.DEAD_LETTER_DIR),
+    deferred_ddl_dir=settings.DEFERRED_DDL_DIR,
+)
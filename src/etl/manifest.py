@@ -0,0 +1,74 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+
+class SourceManifest:
+    """
+    A persisted record of the source files that were last loaded successfully.
+
+    Each entry maps a target table to the size, mtime and SHA-256 hash of the
+    file that fed it. A file counts as unchanged when its size and mtime
+    match the entry. If only the mtime moved (e.g. the file was touched or
+    copied), the content hash decides.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = self._read()
+
+    def _read(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable manifest {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+        # Atomic replace so an interrupted run never leaves a truncated manifest.
+        temp_path.replace(self.path)
+
+    @staticmethod
+    def file_hash(file_path: Path, block_size: int = 1 << 20) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as handle:
+            for block in iter(lambda: handle.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def fingerprint(cls, file_path: Path) -> Dict:
+        """The file's name, size, mtime and SHA-256 hash, as stored in a manifest entry."""
+        stat = file_path.stat()
+        return {"file": file_path.name, "size": stat.st_size, "mtime": stat.st_mtime,
+                "sha256": cls.file_hash(file_path)}
+
+    def is_unchanged(self, table_name: str, file_path: Path) -> bool:
+        """True when the file matches the entry recorded for the table at its last successful load."""
+        entry = self.entries.get(table_name)
+        if not entry or entry.get("file") != file_path.name:
+            return False
+        stat = file_path.stat()
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime == entry["mtime"]:
+            return True
+        return self.file_hash(file_path) == entry["sha256"]
+
+    def record(self, table_name: str, fingerprint: Dict):
+        """
+        Stores a file fingerprint (see `fingerprint`) for the table and persists
+        the manifest. Pass the fingerprint taken when the file was read, so a
+        file that changed during the load is picked up again by the next run.
+        """
+        with self._lock:
+            self.entries[table_name] = {**fingerprint, "loaded_at": datetime.now(timezone.utc).isoformat()}
+            self._write()
@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Cache modes:
+# - "off":    every page is fetched from the API (the default).
+# - "record": pages are served from the cache while fresh (younger than the
+#             TTL) and fetched and stored otherwise.
+# - "replay": pages are only ever served from the cache, whatever their age;
+#             a missing page is an error and no network call is made.
+CACHE_MODES = ("off", "record", "replay")
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a requested page was never recorded."""
+
+
+class ResponseCache:
+    """
+    An on-disk, gzip-compressed cache of API pages.
+
+    Each page is stored in its own file, keyed by a hash of the endpoint,
+    the `Range` requested and the query parameters, so filtered (incremental)
+    requests never collide with full ones. The directory is kept under
+    `max_bytes` by evicting the least recently used pages when a write
+    goes over budget. Recency is tracked in memory, starting from a single
+    scan of the directory in write (mtime) order, so it does not depend on
+    the filesystem updating access times; pages from earlier runs are
+    therefore evicted oldest-written first.
+    """
+    def __init__(self, directory: Path, mode: str = "off",
+                 ttl_seconds: float = 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown API cache mode '{mode}'. Expected one of {CACHE_MODES}.")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Page sizes in least- to most-recently-used order, and their total (see `_scan`).
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def key(endpoint_name: str, offset: int, page_size: int,
+            params: Optional[Dict[str, str]] = None) -> str:
+        payload = json.dumps(
+            {"endpoint": endpoint_name, "range": [offset, offset + page_size - 1], "params": params or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[Tuple[List[Dict], Optional[int]]]:
+        """
+        Returns the cached `(records, total)` for a page, or None on a miss.
+        Expired pages count as misses except in replay mode.
+        """
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self.mode != "replay" and time.time() - stat.st_mtime > self.ttl_seconds:
+                raise FileNotFoundError(path)
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            if self.mode == "replay":
+                raise CacheMissError(f"Page {key} is not in the API cache ({self.directory}).")
+            return None
+        with self._lock:
+            self.hits += 1
+            if self._entries is not None and key in self._entries:
+                self._entries.move_to_end(key)
+        return entry["records"], entry["total"]
+
+    def put(self, key: str, records: List[Dict], total: Optional[int]):
+        """Stores a page atomically, then evicts old pages if the cache is over budget."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+            json.dump({"records": records, "total": total}, handle)
+        size = temp_path.stat().st_size
+        with self._lock:
+            if self._entries is None:
+                self._scan()
+            temp_path.replace(self._path(key))
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Loads the sizes of the pages already on disk, oldest written first (once per instance)."""
+        entries = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.name[:-len(".json.gz")], stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._size = sum(self._entries.values())
+
+    def _evict(self):
+        # Least recently used first; the page just written is the most recent.
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._path(key).unlink(missing_ok=True)
+            self._size -= size
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,41 @@
+import random
+import struct
+
+import psycopg2
+
+# Failure classes used by the loader's retry logic:
+# - "transient": connection drops, timeouts, deadlocks, serialization failures.
+#                Retrying the same statement later can succeed.
+# - "data":      the server rejected the rows themselves (bad values, constraint
+#                violations). Retrying cannot help; the offending rows must be isolated.
+# - "fatal":     the statement itself is wrong (e.g. unknown column), or the
+#                batch could not be encoded on the client (an unsupported type,
+#                a programming error), so every row would fail the same way.
+TRANSIENT, DATA, FATAL = "transient", "data", "fatal"
+
+
+def classify_error(error: BaseException) -> str:
+    """Classifies a batch failure as TRANSIENT, DATA or FATAL."""
+    if getattr(error, "connection_invalidated", False):
+        return TRANSIENT
+    # SQLAlchemy wraps DBAPI errors; classify the underlying psycopg2 error.
+    original = getattr(error, "orig", None) or error
+    if isinstance(original, (psycopg2.DataError, psycopg2.IntegrityError)):
+        return DATA
+    if isinstance(original, (ValueError, TypeError, OverflowError, struct.error)):
+        # Raised on the client while encoding a batch; bisecting would only repeat it row by row.
+        return FATAL
+    if isinstance(original, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return TRANSIENT
+    if isinstance(original, psycopg2.Error):
+        return FATAL
+    # Unknown failures (e.g. SSL or socket errors) keep the old retry behaviour.
+    return TRANSIENT
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter for the given zero-based attempt:
+    a random delay in [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
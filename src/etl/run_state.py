@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Set
+
+from src.config import settings
+
+
+class RunState:
+    """
+    A persisted checkpoint of the current pipeline run, so that an
+    interrupted run can be continued with `--resume`.
+
+    It records which tables finished loading, how many source rows of each
+    in-progress table are durably committed (updated after every batch) and
+    the last page fetched from each API endpoint. The file is rewritten
+    atomically at every checkpoint, so a crash never leaves it half-written.
+
+    Resuming relies on committed rows only: fetched pages are not kept, so
+    pages past the last commit are fetched again. Page progress is therefore
+    informational and written at most every `page_interval` pages or
+    `page_seconds` seconds (and with every other checkpoint).
+    """
+    def __init__(self, path: Path, page_interval: int = 100, page_seconds: float = 10.0):
+        self.path = Path(path)
+        self.page_interval = page_interval
+        self.page_seconds = page_seconds
+        self._lock = threading.Lock()
+        self.state: Dict = {}
+        self._pages_since_write = 0
+        self._last_write = 0.0
+
+    def _read(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable run state {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+        temp_path.replace(self.path)
+        self._pages_since_write = 0
+        self._last_write = time.monotonic()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def begin(self, options: Dict, resume: bool = False) -> bool:
+        """
+        Starts checkpointing a run. With `resume`, the previous run's state is
+        picked up if that run did not complete and used the same `options`.
+        Otherwise a fresh state replaces it.
+
+        Returns:
+            True when the previous run is being resumed.
+        """
+        previous = self._read()
+        with self._lock:
+            if resume:
+                if not previous:
+                    print("--- Nothing to resume: no checkpoint found; starting a new run.")
+                elif previous.get("status") == "completed":
+                    print("--- Nothing to resume: the last run completed; starting a new run.")
+                elif previous.get("options") != options:
+                    print(f"--- Not resuming: the interrupted run used different options "
+                          f"({previous.get('options')}); starting a new run.")
+                else:
+                    self.state = previous
+                    self.state["resumed_at"] = self._now()
+                    self._write()
+                    print(f"--- Resuming run {self.state['run_id']} started at {self.state['started_at']}")
+                    return True
+            self.state = {
+                "run_id": uuid.uuid4().hex[:12],
+                "started_at": self._now(),
+                "status": "running",
+                "options": options,
+                "tables": {},
+                "endpoints": {},
+            }
+            self._write()
+            return False
+
+    def completed_tables(self) -> Set[str]:
+        with self._lock:
+            return {name for name, entry in self.state.get("tables", {}).items() if entry["status"] == "completed"}
+
+    def committed_rows(self, table_name: str) -> int:
+        """Source rows of an unfinished table that are durably committed (or quarantined)."""
+        with self._lock:
+            entry = self.state.get("tables", {}).get(table_name)
+        return entry["rows"] if entry and entry["status"] == "loading" else 0
+
+    def start_table(self, table_name: str, rows: int = 0):
+        """Marks a table as loading, with `rows` source rows already committed."""
+        with self._lock:
+            self.state["tables"][table_name] = {"status": "loading", "rows": rows, "batches": 0,
+                                                "updated_at": self._now()}
+            self._write()
+
+    def record_batch(self, table_name: str, batch_num: int, rows: int):
+        """Checkpoints one committed batch of `rows` source rows."""
+        with self._lock:
+            entry = self.state["tables"].setdefault(table_name, {"status": "loading", "rows": 0, "batches": 0})
+            entry["rows"] += rows
+            entry["batches"] += 1
+            entry["last_batch"] = batch_num
+            entry["updated_at"] = self._now()
+            self._write()
+
+    def record_page(self, endpoint_name: str, offset: int, rows: int):
+        """Records the last page fetched from an endpoint; written out every few pages or seconds."""
+        with self._lock:
+            if not self.state:
+                return
+            self.state["endpoints"][endpoint_name] = {"offset": offset, "rows": rows, "updated_at": self._now()}
+            self._pages_since_write += 1
+            if (self._pages_since_write >= self.page_interval
+                    or time.monotonic() - self._last_write >= self.page_seconds):
+                self._write()
+
+    def complete_table(self, table_name: str, rows: int):
+        with self._lock:
+            self.state["tables"][table_name] = {"status": "completed", "rows": rows, "updated_at": self._now()}
+            self._write()
+
+    def reset_table(self, table_name: str):
+        """Forgets a table's progress, so it is reloaded from scratch."""
+        with self._lock:
+            self.state["tables"].pop(table_name, None)
+            self._write()
+
+    def finish(self, success: bool):
+        with self._lock:
+            if not self.state:
+                return
+            self.state["status"] = "completed" if success else "failed"
+            self.state["finished_at"] = self._now()
+            self._write()
+
+
+# A single run-state store shared by main and the extractors.
+run_state = RunState(settings.RUN_STATE_PATH, page_interval=settings.RUN_STATE_PAGE_INTERVAL,
+                     page_seconds=settings.RUN_STATE_PAGE_SECONDS)
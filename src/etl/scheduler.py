@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from src.etl.catalog import get_dependencies
+
+
+@dataclass
+class TableRun:
+    """Timing and outcome of one scheduled table."""
+    table_name: str
+    status: str = "pending"  # pending | running | success | failed | skipped
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class TableScheduler:
+    """
+    Runs per-table tasks concurrently while respecting FK dependencies.
+
+    The dependency DAG is derived from the foreign keys defined in the alembic
+    migrations (see `src.etl.catalog`). A table is only started once all of
+    its parents have finished successfully; independent tables run in
+    parallel on a bounded thread pool. If a table fails, every table that
+    depends on it (directly or transitively) is skipped.
+    """
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max(1, max_workers)
+
+    @staticmethod
+    def _check_acyclic(dependencies: Dict[str, Set[str]]):
+        remaining = {table: set(parents) for table, parents in dependencies.items()}
+        while remaining:
+            ready = [table for table, parents in remaining.items() if not parents]
+            if not ready:
+                raise ValueError(f"Cyclic FK dependencies between tables: {sorted(remaining)}")
+            for table in ready:
+                del remaining[table]
+            for parents in remaining.values():
+                parents.difference_update(ready)
+
+    def run(self, table_names: List[str], task: Callable[[str], object],
+            dependencies: Optional[Dict[str, Set[str]]] = None) -> Dict[str, TableRun]:
+        """
+        Executes `task(table_name)` for every table in dependency order.
+
+        Args:
+            table_names (List[str]): Tables to process. Their list order is used
+                as a tie-breaker when several tables are ready at once.
+            task (Callable[[str], object]): The work for one table (extract, transform, load).
+            dependencies (Dict[str, Set[str]], optional): Parent tables per table.
+                Derived from the migrations' foreign keys when omitted.
+
+        Returns:
+            Dict[str, TableRun]: Per-table timing and status, in `table_names` order.
+
+        Raises:
+            RuntimeError: After all runnable tables finished, if any table failed.
+        """
+        dependencies = dependencies or get_dependencies(table_names)
+        self._check_acyclic(dependencies)
+        runs = {table: TableRun(table) for table in table_names}
+        futures = {}
+
+        def start_ready(executor):
+            for table in table_names:
+                run = runs[table]
+                if run.status != "pending":
+                    continue
+                parent_states = {runs[parent].status for parent in dependencies[table]}
+                if parent_states & {"failed", "skipped"}:
+                    run.status = "skipped"
+                    print(f"[SCHEDULER] Skipping {table}: a parent table did not load.")
+                elif parent_states <= {"success"}:
+                    run.status = "running"
+                    run.started = time.perf_counter()
+                    futures[executor.submit(task, table)] = table
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            start_ready(executor)
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = futures.pop(future)
+                    run = runs[table]
+                    run.finished = time.perf_counter()
+                    try:
+                        future.result()
+                        run.status = "success"
+                    except Exception as e:
+                        run.status = "failed"
+                        run.error = e
+                        print(f"[SCHEDULER] {table} failed: {e}")
+                # Re-scan until no new table becomes ready or skipped.
+                before = None
+                while before != [r.status for r in runs.values()]:
+                    before = [r.status for r in runs.values()]
+                    start_ready(executor)
+
+        self.report(runs, dependencies)
+        failed = [table for table, run in runs.items() if run.status == "failed"]
+        if failed:
+            raise RuntimeError(f"Tables failed to load: {', '.join(failed)}") from runs[failed[0]].error
+        return runs
+
+    @staticmethod
+    def critical_path(runs: Dict[str, TableRun], dependencies: Dict[str, Set[str]]) -> List[str]:
+        """
+        Returns the chain of dependent tables with the largest summed duration.
+        This chain bounds the total run time no matter how many workers are used.
+        """
+        best: Dict[str, tuple] = {}
+
+        def longest(table: str) -> tuple:
+            if table not in best:
+                chains = [longest(parent) for parent in dependencies.get(table, ())]
+                cost, chain = max(chains, default=(0.0, []))
+                best[table] = (cost + runs[table].duration, chain + [table])
+            return best[table]
+
+        return max((longest(table) for table in runs), default=(0.0, []))[1]
+
+    def report(self, runs: Dict[str, TableRun], dependencies: Dict[str, Set[str]]):
+        """Prints per-table durations and the critical path."""
+        print("\n[SCHEDULER] Table timings:")
+        for run in runs.values():
+            print(f"    > {run.table_name:<40} {run.status:<8} {run.duration:8.2f}s")
+        path = self.critical_path(runs, dependencies)
+        total = sum(runs[table].duration for table in path)
+        print(f"[SCHEDULER] Critical path ({total:.2f}s): {' -> '.join(path)}")
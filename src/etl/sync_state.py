@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from src.database import engine
+from src.config import settings
+
+# Control table (created by alembic) holding one high-water mark per target table.
+SYNC_STATE_TABLE = "etl_sync_state"
+
+
+class SyncStateStore:
+    """
+    Persists per-table high-water marks for incremental (watermark-based) syncs.
+
+    A watermark is the largest value of a table's incremental column that has
+    been durably loaded. The next run only pulls rows at or beyond it. The
+    store also remembers when each table was last fully reloaded so the
+    pipeline can fall back to a periodic full refresh.
+    """
+    def __init__(self, engine: Engine, schema: str, table_name: str = SYNC_STATE_TABLE):
+        self.engine = engine
+        self.schema = schema
+        self.table_name = table_name
+
+    @property
+    def _qualified_table(self) -> str:
+        return f'"{self.schema}"."{self.table_name}"'
+
+    def get(self, table_name: str) -> Optional[Dict]:
+        """Returns the stored state for a table, or None if it has never been synced."""
+        query = text(f"""
+            SELECT watermark, last_full_refresh, updated_at
+            FROM {self._qualified_table}
+            WHERE table_name = :table_name
+        """)
+        with self.engine.connect() as connection:
+            row = connection.execute(query, {"table_name": table_name}).mappings().first()
+        return dict(row) if row else None
+
+    def needs_full_refresh(self, table_name: str, max_age_days: int) -> bool:
+        """
+        True when the table has no watermark yet, or its last full refresh is
+        older than `max_age_days` (0 disables the periodic fallback).
+        """
+        state = self.get(table_name)
+        if not state or state["watermark"] is None or state["last_full_refresh"] is None:
+            return True
+        if max_age_days <= 0:
+            return False
+        last_full_refresh = state["last_full_refresh"]
+        if last_full_refresh.tzinfo is None:
+            last_full_refresh = last_full_refresh.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - last_full_refresh > timedelta(days=max_age_days)
+
+    def compute_watermark(self, table_name: str, column: str) -> Optional[str]:
+        """Reads the current maximum of the incremental column from the target table."""
+        query = text(f'SELECT MAX("{column}") FROM "{self.schema}"."{table_name}"')
+        with self.engine.connect() as connection:
+            value = connection.execute(query).scalar()
+        if value is None:
+            return None
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+    def save(self, table_name: str, watermark: Optional[str], full_refresh: bool = False):
+        """Upserts the watermark for a table; `full_refresh` also stamps the full-refresh time."""
+        query = text(f"""
+            INSERT INTO {self._qualified_table} (table_name, watermark, last_full_refresh, updated_at)
+            VALUES (:table_name, :watermark, CASE WHEN :full_refresh THEN now() END, now())
+            ON CONFLICT (table_name) DO UPDATE SET
+                watermark = EXCLUDED.watermark,
+                last_full_refresh = COALESCE(EXCLUDED.last_full_refresh, {self._qualified_table}.last_full_refresh),
+                updated_at = now()
+        """)
+        with self.engine.begin() as connection:
+            connection.execute(query, {
+                "table_name": table_name,
+                "watermark": watermark,
+                "full_refresh": full_refresh,
+            })
+        print(f"--> Saved watermark for {table_name}: {watermark}")
+
+
+# Create a single, reusable state store instance for our application.
+sync_state = SyncStateStore(engine=engine, schema=settings.DB_SCHEMA)
@@ -0,0 +1,135 @@
+import re
+from typing import Dict, List
+
+from sqlalchemy import text
+
+# PostgreSQL identifiers are truncated to 63 bytes.
+MAX_IDENTIFIER_LENGTH = 63
+
+_INDEX_DEF_PATTERN = re.compile(r"^(CREATE (?:UNIQUE )?INDEX )(\S+)( ON (?:ONLY )?)(\S+)(.*)$", re.DOTALL)
+_RANGE_BOUND_PATTERN = re.compile(r"^FOR VALUES FROM \('([^']*)'\) TO \('([^']*)'\)$")
+
+
+def qualified_name(schema: str, table_name: str) -> str:
+    return f'"{schema}"."{table_name}"'
+
+
+def temporary_name(name: str, prefix: str) -> str:
+    """Builds a collision-free temporary identifier for an index or constraint."""
+    return f"{prefix}{name}"[:MAX_IDENTIFIER_LENGTH]
+
+
+def get_indexes(connection, schema: str, table_name: str) -> List[Dict]:
+    """
+    Lists a table's indexes.
+
+    Returns:
+        Dicts with `name`, `definition` (pg_get_indexdef), `is_constraint`
+        (True when the index backs a PRIMARY KEY / UNIQUE / EXCLUDE constraint),
+        `is_unique`, `is_primary` and `columns` (plain key columns only).
+    """
+    query = text("""
+        SELECT i.relname AS name,
+               pg_get_indexdef(i.oid) AS definition,
+               c.conname IS NOT NULL AS is_constraint,
+               x.indisunique AS is_unique,
+               x.indisprimary AS is_primary,
+               ARRAY(
+                   SELECT a.attname
+                   FROM unnest(x.indkey) AS k(attnum)
+                   JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+               ) AS columns
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+        WHERE x.indrelid = CAST(:qualified_name AS regclass)
+        ORDER BY i.relname
+    """)
+    rows = connection.execute(query, {"qualified_name": qualified_name(schema, table_name)})
+    return [dict(row) for row in rows.mappings()]
+
+
+def get_constraints(connection, schema: str, table_name: str) -> List[Dict]:
+    """
+    Lists a table's own constraints.
+
+    Returns:
+        Dicts with `name`, `type` (p, u, f, c or x) and `definition` (pg_get_constraintdef).
+    """
+    query = text("""
+        SELECT conname AS name, contype AS type, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = CAST(:qualified_name AS regclass)
+          AND contype IN ('p', 'u', 'f', 'c', 'x')
+        ORDER BY conname
+    """)
+    rows = connection.execute(query, {"qualified_name": qualified_name(schema, table_name)})
+    return [dict(row) for row in rows.mappings()]
+
+
+def get_referencing_foreign_keys(connection, schema: str, table_name: str) -> List[Dict]:
+    """
+    Lists foreign keys on *other* tables that reference this table.
+
+    Returns:
+        Dicts with `table` (schema-qualified, already quoted where needed),
+        `name` and `definition`.
+    """
+    query = text("""
+        SELECT conrelid::regclass::text AS table, conname AS name,
+               pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE confrelid = CAST(:qualified_name AS regclass)
+          AND contype = 'f'
+          AND conrelid <> confrelid
+        ORDER BY conname
+    """)
+    rows = connection.execute(query, {"qualified_name": qualified_name(schema, table_name)})
+    return [dict(row) for row in rows.mappings()]
+
+
+def get_owned_sequences(connection, schema: str, table_name: str) -> Dict[str, str]:
+    """Maps column name to the serial sequence it owns (e.g. `id` -> `public.tbl_id_seq`)."""
+    query = text("""
+        SELECT a.attname, pg_get_serial_sequence(CAST(:qualified_name AS text), a.attname)
+        FROM pg_attribute a
+        WHERE a.attrelid = CAST(:qualified_name AS regclass)
+          AND a.attnum > 0 AND NOT a.attisdropped
+    """)
+    rows = connection.execute(query, {"qualified_name": qualified_name(schema, table_name)})
+    return {column: sequence for column, sequence in rows if sequence}
+
+
+def get_partitions(connection, schema: str, table_name: str) -> List[Dict]:
+    """
+    Lists the partitions of a range-partitioned table.
+
+    Returns:
+        Dicts with `name`, `is_default` and, for range partitions, the
+        `lower` (inclusive) and `upper` (exclusive) bounds as text.
+    """
+    query = text("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:qualified_name AS regclass)
+        ORDER BY c.relname
+    """)
+    partitions = []
+    for name, bound in connection.execute(query, {"qualified_name": qualified_name(schema, table_name)}):
+        match = _RANGE_BOUND_PATTERN.match(bound)
+        partitions.append({
+            "name": name,
+            "is_default": bound == "DEFAULT",
+            "lower": match.group(1) if match else None,
+            "upper": match.group(2) if match else None,
+        })
+    return partitions
+
+
+def retarget_index_definition(definition: str, index_name: str, schema: str, table_name: str) -> str:
+    """Rewrites a pg_get_indexdef statement to create the index under a new name on another table."""
+    match = _INDEX_DEF_PATTERN.match(definition)
+    if not match:
+        raise ValueError(f"Unrecognised index definition: {definition}")
+    return f'{match.group(1)}"{index_name}"{match.group(3)}{qualified_name(schema, table_name)}{match.group(5)}'
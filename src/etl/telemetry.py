@@ -0,0 +1,215 @@
+import atexit
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+try:
+    from src.config import settings
+except ImportError:
+    settings = None
+
+# Pipeline stages recorded per table.
+STAGES = ("auth", "page_fetch", "cache_read", "dataframe_build", "transform", "validate", "truncate",
+          "batch_commit", "parallel_load", "index_rebuild")
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far (0 where unsupported)."""
+    if resource is None:
+        return 0
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class StageStats:
+    """Running totals for one (table, stage) pair."""
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    errors: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class StageTimer:
+    """Mutable handle yielded by `Telemetry.stage`; fill in rows/bytes before the block ends."""
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+
+class Telemetry:
+    """
+    Structured, per-table and per-stage performance metrics for a pipeline run.
+
+    Every recorded event is appended to a JSON-lines file, which is opened
+    once per run and written through a buffer (flushed by `close()`, which
+    `finish()` and interpreter exit call). Totals are kept in memory. At the end of the run, `finish()` prints a
+    summary table and writes a Prometheus text-format file for
+    node_exporter's textfile collector.
+    """
+    def __init__(self, jsonl_path: Optional[Path] = None, prometheus_path: Optional[Path] = None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.started = time.time()
+        self.stats: Dict[Tuple[str, str], StageStats] = {}
+        # Durations of individual timed events, for latency percentiles.
+        self.samples: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._jsonl_file = None
+        if self.jsonl_path is not None:
+            atexit.register(self.close)
+
+    def record(self, table: str, stage: str, seconds: float = 0.0, rows: int = 0, bytes: int = 0,
+               retries: int = 0, errors: int = 0, calls: int = 1):
+        """Adds one event to the (table, stage) totals and the JSON-lines log."""
+        event = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "run_id": self.run_id,
+            "table": table,
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "bytes": bytes,
+            "rows_per_s": round(rows / seconds, 1) if seconds else 0.0,
+            "retries": retries,
+            "errors": errors,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+        with self._lock:
+            stats = self.stats.setdefault((table, stage), StageStats())
+            stats.calls += calls
+            stats.seconds += seconds
+            stats.rows += rows
+            stats.bytes += bytes
+            stats.retries += retries
+            stats.errors += errors
+            if calls and seconds:
+                self.samples.setdefault((table, stage), []).append(seconds)
+            if self.jsonl_path is not None:
+                if self._jsonl_file is None:
+                    self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._jsonl_file = open(self.jsonl_path, "a", encoding="utf-8")
+                self._jsonl_file.write(json.dumps(event) + "\n")
+
+    def close(self):
+        """Flushes and closes the JSON-lines file; a later event opens it again."""
+        with self._lock:
+            if self._jsonl_file is not None:
+                self._jsonl_file.close()
+                self._jsonl_file = None
+
+    @contextmanager
+    def stage(self, table: str, stage: str) -> Iterator[StageTimer]:
+        """
+        Times a block as one event of `stage` for `table`. A block that raises
+        is recorded as an error and the exception propagates.
+        """
+        timer = StageTimer()
+        try:
+            yield timer
+        except BaseException:
+            self.record(table, stage, time.perf_counter() - timer.started, timer.rows, timer.bytes,
+                        timer.retries, errors=1)
+            raise
+        self.record(table, stage, time.perf_counter() - timer.started, timer.rows, timer.bytes, timer.retries)
+
+    def percentiles(self, table: str, stage: str, quantiles=(0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """Latency percentiles (in seconds) of the timed events of one table and stage."""
+        with self._lock:
+            samples = sorted(self.samples.get((table, stage), []))
+        if not samples:
+            return {f"p{int(q * 100)}": 0.0 for q in quantiles}
+        return {f"p{int(q * 100)}": samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles}
+
+    def summary(self) -> str:
+        """Renders the per-table, per-stage totals as a fixed-width table."""
+        header = f"{'table':<36} {'stage':<16} {'calls':>7} {'seconds':>9} {'rows':>10} {'MB':>8} {'rows/s':>10} {'retries':>7} {'errors':>6}"
+        lines = [header, "-" * len(header)]
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda item: (item[0][0], STAGES.index(item[0][1]) if item[0][1] in STAGES else len(STAGES)))
+            for (table, stage), stats in items:
+                lines.append(
+                    f"{table[:36]:<36} {stage:<16} {stats.calls:>7} {stats.seconds:>9.2f} {stats.rows:>10} "
+                    f"{stats.bytes / 1e6:>8.1f} {stats.rows_per_second:>10.0f} {stats.retries:>7} {stats.errors:>6}"
+                )
+        lines.append(f"Run {self.run_id}: {time.time() - self.started:.1f}s wall, peak RSS {peak_rss_bytes() / 1e6:.0f} MB")
+        return "\n".join(lines)
+
+    def _prometheus_text(self, success: bool) -> str:
+        metrics = [
+            ("etl_stage_calls", "Events recorded per table and stage in the last run.", "calls"),
+            ("etl_stage_seconds", "Wall time per table and stage in the last run.", "seconds"),
+            ("etl_stage_rows", "Rows processed per table and stage in the last run.", "rows"),
+            ("etl_stage_bytes", "Bytes processed per table and stage in the last run.", "bytes"),
+            ("etl_stage_retries", "Retries per table and stage in the last run.", "retries"),
+            ("etl_stage_errors", "Failed events per table and stage in the last run.", "errors"),
+        ]
+        lines = []
+        with self._lock:
+            for name, help_text, attribute in metrics:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for (table, stage), stats in sorted(self.stats.items()):
+                    lines.append(f'{name}{{table="{table}",stage="{stage}"}} {getattr(stats, attribute)}')
+        finished = time.time()
+        lines += [
+            "# HELP etl_run_duration_seconds Wall time of the last run.",
+            "# TYPE etl_run_duration_seconds gauge",
+            f"etl_run_duration_seconds {finished - self.started:.3f}",
+            "# HELP etl_run_peak_rss_bytes Peak resident memory of the last run.",
+            "# TYPE etl_run_peak_rss_bytes gauge",
+            f"etl_run_peak_rss_bytes {peak_rss_bytes()}",
+            "# HELP etl_run_success Whether the last run finished without errors.",
+            "# TYPE etl_run_success gauge",
+            f"etl_run_success {int(success)}",
+            "# HELP etl_run_finished_timestamp_seconds Unix time the last run finished.",
+            "# TYPE etl_run_finished_timestamp_seconds gauge",
+            f"etl_run_finished_timestamp_seconds {finished:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def finish(self, success: bool = True):
+        """
+        Flushes the event log, prints the summary table and writes the
+        Prometheus textfile (atomically, as node_exporter requires).
+        """
+        self.close()
+        print("\n--- Stage telemetry:")
+        print(self.summary())
+        if self.prometheus_path is None:
+            return
+        self.prometheus_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.prometheus_path.with_suffix(".tmp")
+        temp_path.write_text(self._prometheus_text(success))
+        temp_path.replace(self.prometheus_path)
+        print(f"--- Metrics written to {self.prometheus_path}")
+
+
+# A single telemetry collector shared by the extractors, loader and main.
+if settings:
+    telemetry = Telemetry(
+        jsonl_path=settings.METRICS_DIR / f"metrics_{datetime.now():%Y-%m-%d_%H-%M-%S}.jsonl",
+        prometheus_path=settings.METRICS_TEXTFILE,
+    )
+else:
+    telemetry = Telemetry()
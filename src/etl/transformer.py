@@ -1,45 +1,222 @@
+import threading
+from typing import Callable, Dict, List, Tuple
+
 import pandas as pd
+import sqlalchemy as sa
+
+from src.etl import catalog
+
+try:
+    from src.config import settings
+except ImportError:
+    settings = None
+
+# What to do with DataFrame columns the target table does not have:
+# "drop" them with a warning (default) or raise an "error".
+UNKNOWN_COLUMN_MODES = ("drop", "error")
+
+TRUE_STRINGS = {"t", "true", "y", "yes", "on"}
+FALSE_STRINGS = {"f", "false", "n", "no", "off"}
+UUID_PATTERN = r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}"
+
+
+def _with_invalid(converted: pd.Series, original: pd.Series, invalid: pd.Series) -> pd.Series:
+    """
+    Keeps the typed column when every value converted. Otherwise the column
+    stays object-typed, holding the converted values plus the original text
+    of the invalid ones, so the database rejects exactly those rows (and the
+    loader quarantines them) instead of silently storing NULLs.
+    """
+    if not invalid.any():
+        return converted
+    return converted.astype(object).where(~invalid, original)
+
+
+def _to_integer(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype("Int64"), pd.Series(False, index=series.index)
+    numbers = pd.to_numeric(series, errors="coerce")
+    fractional = numbers.notna() & (numbers % 1 != 0)
+    invalid = (series.notna() & numbers.isna()) | fractional
+    return numbers.where(~fractional).astype("Int64"), invalid
+
+
+def _to_float(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    numbers = pd.to_numeric(series, errors="coerce").astype("float64")
+    return numbers, series.notna() & numbers.isna()
+
+
+def _to_boolean(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype("boolean"), pd.Series(False, index=series.index)
+    if pd.api.types.is_numeric_dtype(series):
+        # Source flags use any non-zero value for true (activeflag holds 1 and 2).
+        return (series != 0).astype("boolean").where(series.notna()), pd.Series(False, index=series.index)
+    text = series.astype("string").str.strip().str.lower()
+    numbers = pd.to_numeric(text, errors="coerce")
+    converted = pd.Series(pd.NA, index=series.index, dtype="boolean")
+    converted = converted.mask(text.isin(TRUE_STRINGS).fillna(False), True)
+    converted = converted.mask(text.isin(FALSE_STRINGS).fillna(False), False)
+    converted = converted.mask(numbers.notna(), numbers != 0)
+    return converted, series.notna() & converted.isna()
+
+
+def _to_datetime(timezone: bool) -> Callable[[pd.Series], Tuple[pd.Series, pd.Series]]:
+    def convert(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series, pd.Series(False, index=series.index)
+        parsed = pd.to_datetime(series, errors="coerce", format="mixed", utc=timezone)
+        return parsed, series.notna() & parsed.isna()
+    return convert
+
+
+def _to_uuid(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    text = series.astype("string").str.strip().str.lower()
+    invalid = series.notna() & ~text.str.fullmatch(UUID_PATTERN).fillna(False)
+    return text, invalid
+
+
+def _to_string(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    return series.astype("string"), pd.Series(False, index=series.index)
+
+
+# Converters whose result PostgreSQL reproduces when it parses the source's
+# text itself; see `Transformer.copies_verbatim`.
+_VERBATIM_CONVERTERS = (_to_float, _to_uuid, _to_string)
+
+
+def _converter(column_type: sa.types.TypeEngine):
+    """Picks the vectorized converter for a migration column type (None leaves the column as is)."""
+    if isinstance(column_type, sa.Boolean):
+        return _to_boolean
+    if isinstance(column_type, sa.Integer):
+        return _to_integer
+    if isinstance(column_type, (sa.Numeric, sa.Float)):
+        return _to_float
+    if isinstance(column_type, sa.DateTime):
+        return _to_datetime(bool(column_type.timezone))
+    if isinstance(column_type, sa.Date):
+        return _to_datetime(False)
+    if isinstance(column_type, sa.Uuid):
+        return _to_uuid
+    if isinstance(column_type, (sa.String, sa.Text)):
+        return _to_string
+    return None
+
 
 class Transformer:
     """
     A class dedicated to performing data transformations.
     This class can be expanded with more methods for cleaning,
     standardizing, or enriching data as needed.
+
+    `coerce_types` converts every column to the type of its target column,
+    as defined by the alembic migrations (see `src/etl/catalog.py`), in
+    vectorized column-wise passes before the data reaches the loader.
+
+    Tables whose coercion PostgreSQL would reproduce on its own can skip the
+    DataFrame path altogether (see `copies_verbatim` and the CSV pass-through
+    in `main.py`).
     """
+    def __init__(self, unknown_columns: str = "drop"):
+        if unknown_columns not in UNKNOWN_COLUMN_MODES:
+            raise ValueError(f"Unknown column mode '{unknown_columns}'. Expected one of {UNKNOWN_COLUMN_MODES}.")
+        self.unknown_columns = unknown_columns
+        self._converters_cache: Dict[str, Dict[str, Callable]] = {}
+        self._warned: set = set()
+        self._lock = threading.Lock()
 
-    def clean_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
+    def clean_column_names(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """
         Standardizes all column names in a DataFrame to lowercase.
+
+        Args:
+            df (pd.DataFrame): The input DataFrame.
+            copy (bool): When False, the columns are renamed in place instead of
+                on a copy. The streaming pipeline uses this to avoid duplicating
+                every chunk it has just built.
         """
-        df_copy = df.copy()
+        df_copy = df.copy() if copy else df
         df_copy.columns = [col.lower() for col in df_copy.columns]
         return df_copy
 
-    def transform_completion_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _converters(self, table_name: str) -> Dict[str, Callable]:
+        """Maps each target column to its converter; cached per table."""
+        with self._lock:
+            if table_name not in self._converters_cache:
+                table = catalog.get_metadata().tables.get(table_name)
+                self._converters_cache[table_name] = (
+                    {column.name: _converter(column.type) for column in table.columns}
+                    if table is not None else {}
+                )
+            return self._converters_cache[table_name]
+
+    def copies_verbatim(self, table_name: str) -> bool:
+        """
+        Whether loading a table's source text as-is stores the same values as
+        `coerce_types` would. That holds when PostgreSQL parses every column
+        the way its converter does: numeric, UUID and text columns. Boolean
+        columns (numeric flags such as 2), integer columns (values like "1.0")
+        and date/time columns (mixed formats, time zones) are converted
+        differently, and so are tables unknown to the catalog.
         """
-        Applies specific transformations for the completiontb dataset.
+        converters = self._converters(table_name)
+        return bool(converters) and all(
+            convert is None or convert in _VERBATIM_CONVERTERS for convert in converters.values()
+        )
 
-        - Converts the 'activeflag' column from integer (1/0) to boolean (True/False).
-        
-        This is a great example of a targeted transformation to fix a
-        data type mismatch between source and destination.
+    def _warn_once(self, key: Tuple, message: str):
+        with self._lock:
+            if key in self._warned:
+                return
+            self._warned.add(key)
+        print(message)
 
-        Args:
-            df (pd.DataFrame): The input DataFrame from completiontb.csv.
+    def coerce_types(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Coerces a DataFrame (or chunk) to the column types of its target table.
 
-        Returns:
-            pd.DataFrame: The transformed DataFrame, ready for loading.
+        - Columns the target lacks are dropped with a warning, or rejected
+          with a ValueError when `unknown_columns` is "error".
+        - Integer, numeric, boolean, date/time, UUID and text columns are
+          converted column-wise. Values that cannot be converted are reported
+          and kept as-is, so only their rows fail at load time.
+        - Tables unknown to the catalog are returned unchanged.
+
+        The DataFrame is modified in place where possible; callers pass a copy
+        if they need the original.
         """
-        df_transformed = df.copy()
+        converters = self._converters(table_name)
+        if not converters:
+            return df
+
+        unknown: List[str] = [col for col in df.columns if col not in converters]
+        if unknown:
+            if self.unknown_columns == "error":
+                raise ValueError(f"Columns {unknown} do not exist in target table {table_name}.")
+            self._warn_once(
+                (table_name, "unknown", tuple(unknown)),
+                f"    > WARNING: Dropping columns not in {table_name}: {unknown}",
+            )
+            df = df.drop(columns=unknown)
 
-        # Check if the 'activeflag' column exists before trying to transform it
-        if 'activeflag' in df_transformed.columns:
-            print("--> Transforming 'activeflag' column to boolean.")
-            # Convert the column to integer type first to handle any potential
-            # floating point issues (e.g., 1.0), then cast to boolean.
-            df_transformed['activeflag'] = df_transformed['activeflag'].astype(int).astype(bool)
-        
-        return df_transformed
+        for name in df.columns:
+            convert = converters[name]
+            if convert is None:
+                continue
+            original = df[name]
+            try:
+                converted, invalid = convert(original)
+            except (ValueError, TypeError) as e:
+                self._warn_once((table_name, name, "error"), f"    > WARNING: Could not coerce {table_name}.{name}: {e}")
+                continue
+            bad = int(invalid.sum())
+            if bad:
+                sample = original[invalid].astype(str).head(3).tolist()
+                print(f"    > WARNING: {bad} value(s) in {table_name}.{name} do not match the column type "
+                      f"(e.g. {sample}); their rows will be rejected at load time.")
+            df[name] = _with_invalid(converted, original, invalid)
+        return df
 
 # Create a single, reusable transformer instance for our application.
-transformer = Transformer()
+transformer = Transformer(unknown_columns=settings.UNKNOWN_COLUMNS if settings else "drop")
@@ -0,0 +1,260 @@
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from src.config import settings
+from src.database import engine
+from src.etl import catalog
+from src.etl.dead_letter import DUPLICATE_KEY, REJECTED, DeadLetterStore
+from src.etl.loader import postgres_loader
+from src.etl.table_ddl import qualified_name
+from src.etl.telemetry import telemetry
+
+# A key set: the parent table and the referenced columns, in FK order.
+KeyRef = Tuple[str, Tuple[str, ...]]
+
+
+class KeyViolation(ValueError):
+    """The error recorded with rows routed out by `KeyValidator` (it never reaches the database)."""
+
+
+@dataclass
+class TableQuality:
+    """Per-table counters of the data-quality report."""
+    rows: int = 0
+    duplicate_keys: int = 0
+    # Orphans per foreign key, labelled "child_cols -> parent(parent_cols)".
+    orphans: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rejected(self) -> int:
+        return self.duplicate_keys + sum(self.orphans.values())
+
+
+def _key_index(df: pd.DataFrame, columns: List[str]) -> pd.Index:
+    """
+    Normalizes key columns to text, so keys built from coerced DataFrames and
+    from database rows (ints, UUID objects, strings) compare equal.
+    """
+    normalized = df[columns].astype("string")
+    if len(columns) == 1:
+        return pd.Index(normalized[columns[0]])
+    return pd.MultiIndex.from_frame(normalized)
+
+
+class KeyValidator:
+    """
+    Pre-load validation of primary and foreign keys, between the transformer
+    and the loader.
+
+    - Rows repeating a primary key within a DataFrame (or stream chunk) are
+      routed out. The row the load would have kept stays: the first one for
+      `ON CONFLICT DO NOTHING`, the last one for upserts.
+    - Rows whose (non-NULL) foreign key is missing from the parent's key set
+      are routed out, instead of failing a whole batch that is then
+      retried and bisected on the server.
+
+    Routed-out rows go to the dead-letter store with the reason, and are
+    counted in a per-table data-quality report. Duplicates are tagged
+    `DUPLICATE_KEY`, so a replay never lets them overwrite the kept row;
+    orphans replay normally once their parent exists.
+
+    Parent key sets come from the parent's own rows as they pass through
+    validation during a full reload in the same run. For a parent that
+    was not fully reloaded (unchanged CSV, incremental or resumed load, CSV
+    pass-through), they are read once from the database and cached. Keys
+    come from the migrations (see `src/etl/catalog.py`), and self-references
+    are not checked. The database stays the final authority: a parent row it
+    rejects still fails its children at load time.
+    """
+    def __init__(self, engine: Engine, schema: str, dead_letters: Optional[DeadLetterStore] = None,
+                 enabled: bool = True):
+        self.engine = engine
+        self.schema = schema
+        self.dead_letters = dead_letters
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Complete key sets, from a full reload in this run or a database query.
+        self._keys: Dict[KeyRef, pd.Index] = {}
+        # Key chunks of tables being reloaded, promoted to `_keys` by `table_loaded`.
+        self._pending: Dict[KeyRef, List[pd.Index]] = {}
+        self.quality: Dict[str, TableQuality] = {}
+
+    @staticmethod
+    def _foreign_keys(table_name: str) -> List[Tuple[List[str], KeyRef]]:
+        """The table's FKs onto other tables, as (local columns, parent key set)."""
+        table = catalog.get_metadata().tables.get(table_name)
+        if table is None:
+            return []
+        return [
+            (list(fk.column_keys), (fk.referred_table.name, tuple(element.column.name for element in fk.elements)))
+            for fk in table.foreign_key_constraints
+            if fk.referred_table.name != table_name
+        ]
+
+    @staticmethod
+    def _referenced_keys(table_name: str) -> List[KeyRef]:
+        """The key sets of this table that other tables' FKs point at."""
+        refs = set()
+        for table in catalog.get_metadata().tables.values():
+            for fk in table.foreign_key_constraints:
+                if fk.referred_table.name == table_name and table.name != table_name:
+                    refs.add((table_name, tuple(element.column.name for element in fk.elements)))
+        return sorted(refs)
+
+    @staticmethod
+    def _primary_key(table_name: str) -> List[str]:
+        table = catalog.get_metadata().tables.get(table_name)
+        return [column.name for column in table.primary_key.columns] if table is not None else []
+
+    def start_table(self, table_name: str):
+        """Called before a table is loaded: starts collecting its keys afresh."""
+        with self._lock:
+            for ref in self._referenced_keys(table_name):
+                self._pending[ref] = []
+
+    def table_loaded(self, table_name: str, complete: bool):
+        """
+        Called after a table was loaded. When `complete` (a full reload whose
+        every row passed through `validate`), the collected keys become its
+        key sets. Otherwise they are dropped, so the next lookup re-reads
+        them from the database.
+        """
+        with self._lock:
+            for ref in self._referenced_keys(table_name):
+                chunks = self._pending.pop(ref, None)
+                self._keys.pop(ref, None)
+                if complete and chunks is not None:
+                    self._keys[ref] = chunks[0].append(chunks[1:]).unique() if chunks else pd.Index([])
+
+    def _parent_keys(self, ref: KeyRef) -> Optional[pd.Index]:
+        with self._lock:
+            if ref in self._keys:
+                return self._keys[ref]
+        parent, columns = ref
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        not_null = " AND ".join(f'"{col}" IS NOT NULL' for col in columns)
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(text(
+                    f"SELECT DISTINCT {column_list} FROM {qualified_name(self.schema, parent)} WHERE {not_null}"
+                )).fetchall()
+        except Exception as e:
+            print(f"    > WARNING: Could not read the keys of {parent} ({e}); skipping the checks against it.")
+            return None
+        keys = _key_index(pd.DataFrame(rows, columns=list(columns)), list(columns))
+        with self._lock:
+            self._keys[ref] = keys
+        return keys
+
+    def validate(self, df: pd.DataFrame, table_name: str, keep: str = "first") -> pd.DataFrame:
+        """
+        Routes rows with duplicate primary keys or orphan foreign keys out of
+        `df`, and records the valid rows' keys if other tables reference this one.
+
+        Args:
+            keep (str): Which duplicate survives: "first" (`ON CONFLICT DO NOTHING`)
+                or "last" (upserts and differential loads).
+
+        Returns:
+            The valid rows.
+        """
+        if not self.enabled or df.empty:
+            return df
+        with telemetry.stage(table_name, "validate") as timer:
+            quality = TableQuality(rows=len(df))
+            rejected: List[Tuple[pd.DataFrame, KeyViolation, str]] = []
+
+            primary_key = self._primary_key(table_name)
+            if primary_key and set(primary_key) <= set(df.columns):
+                duplicated = df.duplicated(subset=primary_key, keep=keep)
+                if duplicated.any():
+                    quality.duplicate_keys = int(duplicated.sum())
+                    rejected.append((df[duplicated], KeyViolation(
+                        f"Duplicate primary key ({', '.join(primary_key)}) within the loaded data; "
+                        f"the {keep} occurrence was loaded."
+                    ), DUPLICATE_KEY))
+                    df = df[~duplicated]
+
+            for columns, ref in self._foreign_keys(table_name):
+                if df.empty or not set(columns) <= set(df.columns):
+                    continue
+                checked = df[columns].notna().all(axis=1)
+                if not checked.any():
+                    continue
+                parent_keys = self._parent_keys(ref)
+                if parent_keys is None:
+                    continue
+                present = pd.Series(True, index=df.index)
+                present[checked] = _key_index(df[checked], columns).isin(parent_keys)
+                if present.all():
+                    continue
+                parent, parent_columns = ref
+                label = f"{', '.join(columns)} -> {parent}({', '.join(parent_columns)})"
+                quality.orphans[label] = int((~present).sum())
+                rejected.append((df[~present], KeyViolation(f"Foreign key {label} has no matching parent row."),
+                                 REJECTED))
+                df = df[present]
+
+            for rows, error, kind in rejected:
+                if self.dead_letters is not None:
+                    self.dead_letters.write(table_name, rows, error, kind=kind)
+            if quality.rejected:
+                print(f"    > WARNING: Routed {quality.rejected} row(s) of {table_name} out before loading "
+                      f"({quality.duplicate_keys} duplicate key(s), orphans: {quality.orphans or 'none'}).")
+            self._add_quality(table_name, quality)
+            self._collect_keys(table_name, df)
+            timer.rows = len(df)
+        if quality.rejected:
+            telemetry.record(table_name, "validate", calls=0, errors=quality.rejected)
+        return df
+
+    def _collect_keys(self, table_name: str, df: pd.DataFrame):
+        with self._lock:
+            for ref in self._referenced_keys(table_name):
+                if ref in self._pending and set(ref[1]) <= set(df.columns):
+                    valid = df[list(ref[1])].notna().all(axis=1)
+                    self._pending[ref].append(_key_index(df[valid], list(ref[1])).unique())
+
+    def _add_quality(self, table_name: str, quality: TableQuality):
+        with self._lock:
+            total = self.quality.setdefault(table_name, TableQuality())
+            total.rows += quality.rows
+            total.duplicate_keys += quality.duplicate_keys
+            for label, count in quality.orphans.items():
+                total.orphans[label] = total.orphans.get(label, 0) + count
+
+    def report(self) -> str:
+        """Renders the per-table data-quality report."""
+        header = f"{'table':<36} {'rows':>10} {'dup keys':>9} {'orphans':>8}  detail"
+        lines = [header, "-" * len(header)]
+        with self._lock:
+            for table_name, quality in sorted(self.quality.items()):
+                detail = "; ".join(f"{label}: {count}" for label, count in quality.orphans.items())
+                lines.append(f"{table_name[:36]:<36} {quality.rows:>10} {quality.duplicate_keys:>9} "
+                             f"{sum(quality.orphans.values()):>8}  {detail}")
+        return "\n".join(lines)
+
+    def write_report(self, path: Path):
+        """Saves the data-quality report as JSON."""
+        with self._lock:
+            report = {table_name: {**asdict(quality), "rejected": quality.rejected}
+                      for table_name, quality in sorted(self.quality.items())}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"--- Data-quality report written to {path}")
+
+
+# A single validator shared by every pipeline; it writes to the loader's dead-letter store.
+key_validator = KeyValidator(
+    engine=engine,
+    schema=settings.DB_SCHEMA,
+    dead_letters=postgres_loader.dead_letters,
+    enabled=settings.VALIDATE_KEYS,
+)
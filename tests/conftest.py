@@ -0,0 +1,26 @@
+"""
+Shared test setup. The modules under test read their settings from the
+environment at import time, so placeholders are set before any of them is
+imported, and everything they write goes to a throwaway directory. None of
+the tests needs a running PostgreSQL.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+_OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="etl_tests_"))
+for name, value in {
+    "DB_USER": "test", "DB_PASSWORD": "test", "DB_HOST": "localhost", "DB_NAME": "test",
+    "API_KEY": "test", "API_EMAIL": "test@example.com", "API_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ["METRICS_DIR"] = str(_OUTPUT_DIR / "logs")
+os.environ["METRICS_TEXTFILE"] = str(_OUTPUT_DIR / "logs" / "etl_metrics.prom")
+os.environ["DEAD_LETTER_DIR"] = str(_OUTPUT_DIR / "dead_letter")
+os.environ["DEFERRED_DDL_DIR"] = str(_OUTPUT_DIR / ".deferred_ddl")
+os.environ["API_CACHE_DIR"] = str(_OUTPUT_DIR / ".api_cache")
+os.environ["RUN_STATE_PATH"] = str(_OUTPUT_DIR / ".run_state.json")
@@ -0,0 +1,127 @@
+import socket
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from src.bench.fake_postgrest import FakePostgrest
+from src.etl import api_extractor as api_extractor_module
+from src.etl.api_extractor import ApiExtractor, _retry_after_seconds
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3", 3.0),
+    ("0.5", 0.5),
+    ("-2", 0.0),
+    (formatdate(0, usegmt=True), 0.0),
+    ("soon", None),
+    ("", None),
+    (None, None),
+])
+def test_retry_after_seconds(value, expected):
+    assert _retry_after_seconds(value) == expected
+
+
+def test_retry_after_as_an_http_date():
+    assert 50 < _retry_after_seconds(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(api_extractor_module.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**options):
+        servers.append(FakePostgrest(rows=10, **options).start())
+        return servers[-1]
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def extractor_for(url, **options):
+    options = {"retries": 3, "retry_base_seconds": 0.5, "retry_max_seconds": 2.0, **options}
+    return ApiExtractor(api_key="test", email="test@example.com", password="test", base_url=url, **options)
+
+
+def get_users(extractor):
+    return extractor._send("get", f"{extractor.base_url}/rest/v1/wiserock_user", "stg_wiserock__user",
+                           authenticated=True)
+
+
+def test_server_errors_are_retried_with_backoff(serve, sleeps):
+    server = serve(error_rate=1.0)
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        get_users(extractor_for(server.url))
+    assert raised.value.response.status_code == 503
+    assert server.stats["errors"] == 3
+    assert len(sleeps) == 2 and all(0 <= delay <= 2.0 for delay in sleeps)
+
+
+def test_throttling_waits_for_retry_after(serve, sleeps):
+    server = serve(throttle_rate=1.0, retry_after=1)
+    with pytest.raises(requests.exceptions.HTTPError):
+        get_users(extractor_for(server.url))
+    assert sleeps == [1.0, 1.0]
+
+
+def test_retry_after_is_capped(serve, sleeps):
+    server = serve(throttle_rate=1.0, retry_after=30)
+    with pytest.raises(requests.exceptions.HTTPError):
+        get_users(extractor_for(server.url, retry_max_seconds=2.0))
+    assert sleeps == [2.0, 2.0]
+
+
+def test_a_retried_request_can_succeed(serve, sleeps):
+    server = serve(error_rate=0.5, seed=3)
+    extractor = extractor_for(server.url, retries=30)
+    for _ in range(5):
+        assert get_users(extractor).json()
+    assert server.stats["errors"] > 0
+
+
+def test_connection_errors_are_retried(sleeps):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    extractor = extractor_for(f"http://127.0.0.1:{port}")
+    with pytest.raises(requests.exceptions.ConnectionError):
+        extractor._send("get", f"{extractor.base_url}/rest/v1/wiserock_user", "stg_wiserock__user")
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(serve, sleeps):
+    server = serve()
+    extractor = extractor_for(server.url)
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        extractor._send("get", f"{server.url}/rest/v1/no_such_endpoint", "t", authenticated=True)
+    assert raised.value.response.status_code == 404
+    assert sleeps == []
+
+
+def test_a_rejected_token_is_refreshed_once(serve, sleeps):
+    server = serve()
+    extractor = extractor_for(server.url)
+    get_users(extractor)
+    with server._lock:
+        server._tokens.clear()
+    assert get_users(extractor).json()
+    assert server.stats["auth"] == 2 and server.stats["expired"] == 1
+    assert sleeps == []
+
+
+def test_a_token_rejected_again_after_the_refresh_fails(serve, sleeps):
+    # Every token the server issues has already expired.
+    server = serve(token_ttl=-1)
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        get_users(extractor_for(server.url))
+    assert raised.value.response.status_code == 401
+    assert server.stats["expired"] == 2
+    assert sleeps == []
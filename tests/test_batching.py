@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from src.etl.batching import BatchSizer, estimate_row_bytes
+
+
+def frame(rows, width=10, start=0):
+    return pd.DataFrame({"id": range(start, start + rows), "text": ["x" * width] * rows})
+
+
+def test_row_width_estimate_counts_characters_and_delimiters():
+    df = pd.DataFrame({"a": ["abc", "de"], "b": [1, 22]})
+    # Average widths: a = 2.5, b = 1.5, plus one delimiter per column.
+    assert estimate_row_bytes(df) == pytest.approx(6.0)
+    assert estimate_row_bytes(pd.DataFrame()) == 1.0
+
+
+def test_rows_per_batch_follows_the_byte_budget_within_limits():
+    sizer = BatchSizer(target_bytes=10_000, min_rows=10, max_rows=1000)
+    sizer.observe_rows(pd.DataFrame({"text": ["x" * 99] * 5}))
+    assert sizer.rows_per_batch() == 100
+    sizer.observe_rows(pd.DataFrame({"text": ["x" * 99_999] * 5}))
+    assert sizer.rows_per_batch() == 10
+    sizer.row_bytes = 0.5
+    assert sizer.rows_per_batch() == 1000
+
+
+def test_scale_reacts_to_commit_latency_and_failures():
+    sizer = BatchSizer(target_seconds=2.0)
+    sizer.record_success(0.5)
+    assert sizer.scale == pytest.approx(1.25)
+    sizer.record_success(2.0)
+    assert sizer.scale == pytest.approx(1.25)
+    sizer.record_success(4.0)
+    assert sizer.scale == pytest.approx(0.9375)
+    sizer.record_failure()
+    assert sizer.scale == pytest.approx(0.46875)
+
+
+def test_scale_is_bounded():
+    sizer = BatchSizer()
+    for _ in range(50):
+        sizer.record_success(0.0)
+    assert sizer.scale == 4.0
+    for _ in range(50):
+        sizer.record_failure()
+    assert sizer.scale == 0.01
+
+
+def test_batches_split_a_dataframe_without_losing_rows():
+    sizer = BatchSizer(target_bytes=1, min_rows=300, max_rows=300)
+    batches = list(sizer.batches(frame(1000)))
+    assert [len(batch) for batch in batches] == [300, 300, 300, 100]
+    assert pd.concat(batches)["id"].tolist() == list(range(1000))
+
+
+def test_batches_regroup_small_chunks_in_order():
+    sizer = BatchSizer(target_bytes=1, min_rows=250, max_rows=250)
+    chunks = [frame(100, start=i * 100) for i in range(13)] + [frame(0)]
+    batches = list(sizer.batches(iter(chunks)))
+    assert [len(batch) for batch in batches] == [250, 250, 250, 250, 250, 50]
+    assert pd.concat(batches)["id"].tolist() == list(range(1300))
+
+
+def test_batches_slice_a_large_chunk():
+    sizer = BatchSizer(target_bytes=1, min_rows=100, max_rows=100)
+    batches = list(sizer.batches([frame(30), frame(250, start=30)]))
+    assert [len(batch) for batch in batches] == [100, 100, 80]
+    assert pd.concat(batches)["id"].tolist() == list(range(280))
+
+
+def test_batch_size_changes_apply_to_the_next_batch():
+    sizer = BatchSizer(target_bytes=1000, min_rows=1, max_rows=10_000)
+    sizes = []
+    for batch in sizer.batches(frame(400, width=8)):
+        sizes.append(len(batch))
+        sizer.record_failure()
+    assert sizes[0] > sizes[1] > sizes[2]
+    assert sum(sizes) == 400
+
+
+def test_fork_copies_learned_state_but_adapts_separately():
+    sizer = BatchSizer(target_bytes=5000, min_rows=1, max_rows=10_000)
+    sizer.observe_rows(frame(10))
+    sizer.record_success(0.0)
+    fork = sizer.fork()
+    assert (fork.scale, fork.row_bytes, fork.target_bytes) == (sizer.scale, sizer.row_bytes, 5000)
+    fork.record_failure()
+    assert sizer.scale == pytest.approx(1.25)
+    assert fork.scale == pytest.approx(0.625)
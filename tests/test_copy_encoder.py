@@ -0,0 +1,137 @@
+import struct
+import uuid
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.copy_encoder import (
+    BINARY_HEADER,
+    BINARY_NULL,
+    BINARY_TRAILER,
+    _encode_numeric,
+    encode_binary,
+    encode_text,
+)
+
+
+def text_lines(df, column_types):
+    return encode_text(df, column_types).getvalue().split("\n")[:-1]
+
+
+def test_text_escapes_copy_delimiters():
+    df = pd.DataFrame({"note": ["tab\there", "back\\slash", "two\nlines", "carriage\rreturn"]})
+    assert text_lines(df, {"note": "text"}) == [
+        "tab\\there",
+        "back\\\\slash",
+        "two\\nlines",
+        "carriage\\rreturn",
+    ]
+
+
+def test_text_writes_nulls_as_marker():
+    df = pd.DataFrame({"note": ["a", None], "value": [1.5, np.nan]})
+    assert text_lines(df, {"note": "text", "value": "float8"}) == ["a\t1.5", "\\N\t\\N"]
+
+
+def test_text_literal_backslash_n_is_not_a_null():
+    df = pd.DataFrame({"note": ["\\N"]})
+    assert text_lines(df, {"note": "text"}) == ["\\\\N"]
+
+
+def test_text_renders_float_backed_integers_without_fraction():
+    df = pd.DataFrame({"id": [1.0, np.nan, 3.0]})
+    assert text_lines(df, {"id": "int4"}) == ["1", "\\N", "3"]
+
+
+def test_text_renders_booleans_and_dates():
+    df = pd.DataFrame({
+        "flag": [True, False],
+        "day": pd.to_datetime(["2024-01-02", None]),
+        "at": [pd.Timestamp("2024-01-02 03:04:05"), pd.Timestamp("2024-02-29 23:59:59.5")],
+    })
+    assert text_lines(df, {"flag": "bool", "day": "date", "at": "timestamp"}) == [
+        "t\t2024-01-02\t2024-01-02 03:04:05.000000",
+        "f\t\\N\t2024-02-29 23:59:59.500000",
+    ]
+
+
+def binary_fields(payload: bytes, columns: int):
+    """Splits a binary COPY stream into rows of raw field payloads (None for NULL)."""
+    assert payload.startswith(BINARY_HEADER) and payload.endswith(BINARY_TRAILER)
+    body = payload[len(BINARY_HEADER):-len(BINARY_TRAILER)]
+    rows, position = [], 0
+    while position < len(body):
+        (count,) = struct.unpack_from("!h", body, position)
+        assert count == columns
+        position += 2
+        row = []
+        for _ in range(count):
+            (length,) = struct.unpack_from("!i", body, position)
+            position += 4
+            if length == -1:
+                row.append(None)
+            else:
+                row.append(body[position:position + length])
+                position += length
+        rows.append(row)
+    return rows
+
+
+def test_binary_frames_rows_and_nulls():
+    df = pd.DataFrame({"id": pd.array([1, None], dtype="Int64"), "name": ["é\ttab", None]})
+    rows = binary_fields(encode_binary(df, {"id": "int4", "name": "text"}).getvalue(), columns=2)
+    assert rows == [
+        [struct.pack("!i", 1), "é\ttab".encode("utf-8")],
+        [None, None],
+    ]
+    assert BINARY_NULL == struct.pack("!i", -1)
+
+
+def test_binary_encodes_bool_uuid_and_floats():
+    key = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    df = pd.DataFrame({"flag": ["yes", "0"], "key": [str(key), key], "value": [0.5, -2.0]})
+    rows = binary_fields(encode_binary(df, {"flag": "bool", "key": "uuid", "value": "float8"}).getvalue(), 3)
+    assert rows == [
+        [b"\x01", key.bytes, struct.pack("!d", 0.5)],
+        [b"\x00", key.bytes, struct.pack("!d", -2.0)],
+    ]
+
+
+def test_binary_encodes_dates_and_timestamps_from_the_postgres_epoch():
+    df = pd.DataFrame({
+        "day": pd.to_datetime(["2000-01-02", "1999-12-31"]),
+        "at": [pd.Timestamp("2000-01-01 00:00:01"), pd.Timestamp("2000-01-01")],
+    })
+    rows = binary_fields(encode_binary(df, {"day": "date", "at": "timestamp"}).getvalue(), 2)
+    assert rows == [
+        [struct.pack("!i", 1), struct.pack("!q", 1_000_000)],
+        [struct.pack("!i", -1), struct.pack("!q", 0)],
+    ]
+
+
+@pytest.mark.parametrize("value, expected", [
+    # ndigits, weight, sign, dscale, then base-10000 digit groups.
+    (Decimal("12345.678"), (3, 1, 0x0000, 3, [1, 2345, 6780])),
+    (Decimal("-0.5"), (1, -1, 0x4000, 1, [5000])),
+    (Decimal("100000000"), (1, 2, 0x0000, 0, [1])),
+    (Decimal("0"), (0, 0, 0x0000, 0, [])),
+    (7, (1, 0, 0x0000, 0, [7])),
+])
+def test_numeric_binary_layout(value, expected):
+    payload = _encode_numeric(value)
+    ndigits, weight, sign, scale = struct.unpack_from("!hhHH", payload)
+    digits = list(struct.unpack_from(f"!{ndigits}H", payload, 8))
+    assert (ndigits, weight, sign, scale, digits) == expected
+
+
+def test_numeric_nan_and_infinity():
+    assert _encode_numeric(Decimal("NaN")) == struct.pack("!hhHH", 0, 0, 0xC000, 0)
+    with pytest.raises(ValueError):
+        _encode_numeric(Decimal("Infinity"))
+
+
+def test_binary_rejects_unsupported_types():
+    with pytest.raises(ValueError, match="Unsupported column type"):
+        encode_binary(pd.DataFrame({"doc": ["{}"]}), {"doc": "jsonb"})
@@ -0,0 +1,70 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src.bench.fake_postgrest import FakePostgrest
+from src.etl.api_extractor import ApiExtractor, _parse_content_range
+from src.etl.loader import _csv_batches, _parse_csv
+from src.etl.transformer import Transformer
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("0-999/5000", (1000, 5000)),
+    ("1000-1499/1500", (500, 1500)),
+    ("0-9/*", (10, None)),
+    ("*/0", (0, 0)),
+    ("*/*", (0, None)),
+    (None, (None, None)),
+    ("", (None, None)),
+    ("bytes", (None, None)),
+])
+def test_parse_content_range(header, expected):
+    assert _parse_content_range(header) == expected
+
+
+def test_csv_batches_respect_the_byte_budget():
+    pages = [(b"a" * 40, 4), (b"b" * 40, 4), (b"c" * 40, 4), (b"d" * 200, 20), (b"e" * 10, 1)]
+    batches = list(_csv_batches(pages, max_bytes=100))
+    assert [(len(body), rows) for body, rows in batches] == [(80, 8), (40, 4), (200, 20), (10, 1)]
+    assert b"".join(body for body, _ in batches) == b"".join(body for body, _ in pages)
+
+
+def test_parse_csv_keeps_text_and_maps_empty_fields_to_null():
+    payload = b'1,"a, quoted ""text""",NA\n2,,\n'
+    df = _parse_csv(payload, ["id", "note", "code"])
+    assert df["id"].tolist() == ["1", "2"]
+    assert df["note"].tolist()[0] == 'a, quoted "text"'
+    assert df["code"].tolist()[0] == "NA"
+    assert df[["note", "code"]].iloc[1].isna().all()
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakePostgrest(rows={"wiserock_user": 2500}, default_rows=10).start()
+    yield server
+    server.stop()
+
+
+def test_csv_pages_are_headerless_and_complete(server):
+    extractor = ApiExtractor(api_key="test", email="test@example.com", password="test", base_url=server.url,
+                             page_size=1000)
+    pages = extractor.csv_pages("stg_wiserock__user")
+    received = list(pages.pages)
+    assert [rows for _, rows in received] == [1000, 1000, 500]
+    df = _parse_csv(b"".join(body for body, _ in received), pages.columns)
+    expected = server.table_data("wiserock_user")
+    assert pages.columns == ["user_id", "handle"]
+    assert df["user_id"].astype(int).tolist() == expected["user_id"].tolist()
+    assert df["handle"].fillna("").tolist() == expected["handle"].fillna("").tolist()
+
+
+def test_only_tables_postgres_parses_like_the_coercion_qualify():
+    transformer = Transformer()
+    # stg_wellview__job holds only text and UUID columns.
+    assert transformer.copies_verbatim("stg_wellview__job")
+    # Integer keys, booleans and dates need the coercion.
+    assert not transformer.copies_verbatim("stg_wiserock__user")
+    assert not transformer.copies_verbatim("stg_pro_count__completiontb")
+    assert not transformer.copies_verbatim("stg_aries__daily_capacities")
+    assert not transformer.copies_verbatim("no_such_table")
@@ -0,0 +1,36 @@
+import pytest
+
+from src import database
+from src.config import settings
+
+
+def test_importing_the_pipeline_does_not_create_the_engine():
+    import src.etl.loader  # noqa: F401  (holds a reference to the shared engine)
+    import src.etl.validator  # noqa: F401
+    assert database._engine is None
+    assert repr(database.engine) == "<LazyEngine None>"
+
+
+def test_pool_covers_every_concurrent_connection(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "TABLE_WORKERS", 1)
+    monkeypatch.setattr(settings, "LOAD_WORKERS", 1)
+    monkeypatch.setattr(settings, "BULK_LOADS", False)
+    assert database.pool_size() == 5
+    monkeypatch.setattr(settings, "TABLE_WORKERS", 3)
+    monkeypatch.setattr(settings, "LOAD_WORKERS", 4)
+    assert database.pool_size() == 13
+    monkeypatch.setattr(settings, "BULK_LOADS", True)
+    monkeypatch.setattr(settings, "BULK_INDEX_WORKERS", 6)
+    assert database.pool_size() == 19
+
+
+def test_pool_metrics_summarize_checkouts():
+    metrics = database.PoolMetrics()
+    assert metrics.summary()["avg_wait_s"] == 0.0
+    metrics.record_checkout(0.5)
+    metrics.record_checkout(1.5)
+    metrics.record_connect()
+    assert metrics.summary() == pytest.approx({
+        "checkouts": 2, "connects": 1, "total_wait_s": 2.0, "avg_wait_s": 1.0, "max_wait_s": 1.5,
+    })
@@ -0,0 +1,203 @@
+import struct
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+from src.etl import loader as loader_module
+from src.etl.dead_letter import DUPLICATE_KEY, REJECTED, DeadLetterStore
+from src.etl.loader import LoadResult, PostgresLoader
+from src.etl.retry import DATA, FATAL, TRANSIENT, backoff_delay, classify_error
+
+
+@pytest.mark.parametrize("error, kind", [
+    (psycopg2.DataError("invalid input syntax"), DATA),
+    (psycopg2.IntegrityError("violates foreign key"), DATA),
+    (psycopg2.OperationalError("server closed the connection"), TRANSIENT),
+    (psycopg2.InterfaceError("connection already closed"), TRANSIENT),
+    (psycopg2.ProgrammingError("column does not exist"), FATAL),
+    (ValueError("Unsupported column type for binary COPY: jsonb"), FATAL),
+    (TypeError("unsupported operand"), FATAL),
+    (struct.error("argument out of range"), FATAL),
+    (OverflowError("int too large"), FATAL),
+    (OSError("SSL SYSCALL error"), TRANSIENT),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_classify_error_unwraps_sqlalchemy_errors():
+    wrapped = DBAPIError("COPY ...", {}, psycopg2.DataError("bad value"))
+    assert classify_error(wrapped) == DATA
+    dropped = DBAPIError("COPY ...", {}, psycopg2.ProgrammingError("x"), connection_invalidated=True)
+    assert classify_error(dropped) == TRANSIENT
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt, base=1.0, cap=5.0) <= min(5.0, 2 ** attempt) for attempt in range(10))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DeadLetterStore(tmp_path / "dead_letter")
+
+
+def test_write_and_read_group_rows_by_kind(store):
+    store.write("t", pd.DataFrame({"id": [1, 2]}), psycopg2.DataError("bad"))
+    store.write("t", pd.DataFrame({"id": [3]}), ValueError("dup"), kind=DUPLICATE_KEY)
+    store.write("t", pd.DataFrame(), ValueError("nothing"))
+    groups, mark = store.read("t")
+    assert {kind: df["id"].tolist() for kind, df in groups.items()} == {REJECTED: [1, 2], DUPLICATE_KEY: [3]}
+    assert mark == store._path("t").stat().st_size
+    assert store.tables() == ["t"]
+    # Reading does not remove anything.
+    assert store.read("t")[0].keys() == groups.keys()
+
+
+def test_rows_without_a_kind_count_as_rejected(store):
+    store.directory.mkdir(parents=True)
+    store._path("t").write_text('{"table": "t", "error": "old", "row": {"id": 9}}\n')
+    groups, _ = store.read("t")
+    assert groups[REJECTED]["id"].tolist() == [9]
+
+
+def test_settle_after_a_complete_replay_keeps_only_new_rejections(store):
+    store.write("t", pd.DataFrame({"id": [1, 2]}), ValueError("first"))
+    _, mark = store.read("t")
+    store.write("t", pd.DataFrame({"id": [2]}), ValueError("still bad"))
+    store.settle("t", mark, applied=True)
+    groups, _ = store.read("t")
+    assert groups[REJECTED]["id"].tolist() == [2]
+    assert store._path("t").with_suffix(".jsonl.replayed").read_text().count("\n") == 2
+
+
+def test_settle_never_overwrites_earlier_replays(store):
+    for row in (1, 2):
+        store.write("t", pd.DataFrame({"id": [row]}), ValueError("bad"))
+        _, mark = store.read("t")
+        store.settle("t", mark, applied=True)
+    assert not store._path("t").exists()
+    assert store._path("t").with_suffix(".jsonl.replayed").read_text().count("\n") == 2
+
+
+def test_settle_after_a_failed_replay_restores_the_original_rows(store):
+    store.write("t", pd.DataFrame({"id": [1, 2, 3]}), ValueError("bad"))
+    _, mark = store.read("t")
+    store.write("t", pd.DataFrame({"id": [1, 2, 3]}), ValueError("batch failed again"))
+    store.settle("t", mark, applied=False)
+    groups, _ = store.read("t")
+    assert groups[REJECTED]["id"].tolist() == [1, 2, 3]
+
+
+def replaying_loader(store, monkeypatch, outcome):
+    loader = PostgresLoader(engine=None, schema="public", dead_letters=store)
+
+    def load_dataframe(df, table_name, method=None, on_conflict="nothing"):
+        return outcome(df, table_name)
+
+    monkeypatch.setattr(loader, "load_dataframe", load_dataframe)
+    return loader
+
+
+def test_rows_survive_a_replay_that_raises(store, monkeypatch):
+    store.write("t", pd.DataFrame({"id": [1, 2]}), ValueError("bad"))
+
+    def connection_lost(df, table_name):
+        raise psycopg2.OperationalError("could not connect to server")
+
+    with pytest.raises(psycopg2.OperationalError):
+        replaying_loader(store, monkeypatch, connection_lost).replay_dead_letters("t")
+    # A second attempt still finds every row, and a successful one clears them.
+    loaded = []
+
+    def succeeds(df, table_name):
+        loaded.extend(df["id"].tolist())
+        return LoadResult(table_name, rows=len(df), batches=1)
+
+    replaying_loader(store, monkeypatch, succeeds).replay_dead_letters("t")
+    assert loaded == [1, 2]
+    assert store.read("t")[0] == {}
+
+
+def test_rows_survive_a_replay_with_failed_batches(store, monkeypatch):
+    store.write("t", pd.DataFrame({"id": [1, 2]}), ValueError("bad"))
+
+    def batch_fails(df, table_name):
+        # The loader quarantines a failed batch again, which duplicates the rows being replayed.
+        store.write(table_name, df, psycopg2.OperationalError("timeout"))
+        return LoadResult(table_name, rows=len(df), batches=1, failed_batches=1)
+
+    result = replaying_loader(store, monkeypatch, batch_fails).replay_dead_letters("t")
+    assert not result.succeeded
+    assert store.read("t")[0][REJECTED]["id"].tolist() == [1, 2]
+
+
+class FakeConnection:
+    """Commits the rows `write` accepts; stands in for a SQLAlchemy connection around one raw cursor."""
+    def __init__(self):
+        self.connection = self
+
+    @contextmanager
+    def begin(self):
+        yield
+
+    @contextmanager
+    def cursor(self):
+        yield None
+
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(settings, "LOAD_RETRY_BASE_SECONDS", 0.0)
+    # Keep the expected failures out of logs/failed_batches.log.
+    monkeypatch.setattr(loader_module.logger, "disabled", True)
+
+
+def test_bisection_isolates_rejected_rows(no_retry_delay):
+    loader = PostgresLoader(engine=None, schema="public")
+    committed = []
+    statements = []
+
+    def write(cursor, rows):
+        statements.append(len(rows))
+        if rows["value"].lt(0).any():
+            raise psycopg2.DataError("value out of range")
+        committed.extend(rows["id"].tolist())
+
+    rows = pd.DataFrame({"id": range(16), "value": [1] * 16})
+    rows.loc[[3, 11], "value"] = -1
+    connection = FakeConnection()
+    error = loader._write_with_retry(connection, write, rows, "t", 1, retries=3)
+    assert isinstance(error, psycopg2.DataError)
+    rejected = loader._bisect_batch(connection, write, rows, error, "t", 1, retries=3)
+    assert sorted(row for part, _ in rejected for row in part["id"]) == [3, 11]
+    assert all(len(part) == 1 and isinstance(part_error, psycopg2.DataError) for part, part_error in rejected)
+    assert sorted(committed) == [i for i in range(16) if i not in (3, 11)]
+    # Two bad rows in 16 cost far fewer statements than retrying row by row.
+    assert len(statements) < 16
+
+
+def test_transient_errors_are_retried_and_fatal_errors_raise(no_retry_delay):
+    loader = PostgresLoader(engine=None, schema="public")
+    attempts = []
+
+    def flaky(cursor, rows):
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise psycopg2.OperationalError("connection reset")
+
+    rows = pd.DataFrame({"id": [1]})
+    assert loader._write_with_retry(FakeConnection(), flaky, rows, "t", 1, retries=3) is None
+    assert len(attempts) == 3
+
+    def unsupported(cursor, rows):
+        attempts.append(1)
+        raise ValueError("Unsupported column type for binary COPY: jsonb")
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        loader._write_with_retry(FakeConnection(), unsupported, rows, "t", 1, retries=3)
+    assert len(attempts) == 1
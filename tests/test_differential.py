@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from src.etl.loader import PostgresLoader, row_hashes
+
+conflict_clause = PostgresLoader._conflict_clause
+
+
+def frame(**columns):
+    return pd.DataFrame(columns)
+
+
+def test_row_hashes_ignore_column_order():
+    df = frame(a=[1, 2], b=["x", None])
+    assert row_hashes(df, ["a", "b"]).tolist() == row_hashes(df[["b", "a"]], ["b", "a"]).tolist()
+
+
+def test_row_hashes_treat_every_missing_value_alike():
+    hashes = [
+        row_hashes(frame(a=[1.5, None]), ["a"]),
+        row_hashes(frame(a=[1.5, np.nan]), ["a"]),
+        row_hashes(frame(a=pd.array([1.5, pd.NA], dtype="Float64")), ["a"]),
+    ]
+    assert all(h.tolist() == hashes[0].tolist() for h in hashes)
+
+
+def test_row_hashes_ignore_how_values_are_typed():
+    expected = row_hashes(frame(id=[1, 2], name=["x", None]), ["id", "name"]).tolist()
+    assert row_hashes(frame(id=pd.array([1, 2], dtype="Int64"), name=pd.array(["x", pd.NA], dtype="string")),
+                      ["id", "name"]).tolist() == expected
+    assert row_hashes(frame(id=["1", "2"], name=["x", np.nan]), ["id", "name"]).tolist() == expected
+
+
+def test_row_hashes_detect_changes_and_ignore_the_index():
+    df = frame(id=[1, 2, 3], value=["a", "b", "c"])
+    hashes = row_hashes(df, ["id", "value"])
+    assert hashes.dtype == "int64" and hashes.is_unique
+    changed = df.copy()
+    changed.loc[1, "value"] = "B"
+    assert (row_hashes(changed, ["id", "value"]) != hashes).tolist() == [False, True, False]
+    assert row_hashes(df.set_index(pd.Index([7, 8, 9])), ["id", "value"]).tolist() == hashes.tolist()
+
+
+def test_row_hashes_only_cover_the_given_columns():
+    df = frame(id=[1], value=["a"])
+    assert row_hashes(df, ["id"]).tolist() == row_hashes(frame(id=[1], value=["b"]), ["id"]).tolist()
+
+
+def test_do_nothing_without_a_key():
+    assert conflict_clause(['"id"', '"v"'], [], "update", "t") == "ON CONFLICT DO NOTHING"
+    assert conflict_clause(['"id"', '"v"'], ["id"], "nothing", "t") == "ON CONFLICT DO NOTHING"
+
+
+def test_upsert_updates_only_rows_that_differ():
+    clause = conflict_clause(['"id"', '"day"', '"oil"', '"gas"'], ["id", "day"], "update", "stg_t")
+    assert clause == (
+        'ON CONFLICT ("id", "day") DO UPDATE SET "oil" = EXCLUDED."oil", "gas" = EXCLUDED."gas" '
+        'WHERE ROW("stg_t"."oil", "stg_t"."gas") IS DISTINCT FROM ROW(EXCLUDED."oil", EXCLUDED."gas")'
+    )
+
+
+def test_upsert_of_key_only_tables_does_nothing_on_conflict():
+    assert conflict_clause(['"id"'], ["id"], "update", "t") == 'ON CONFLICT ("id") DO NOTHING'
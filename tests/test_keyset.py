@@ -0,0 +1,55 @@
+import pytest
+
+from src.bench.fake_postgrest import FakePostgrest
+from src.etl.api_extractor import ApiExtractor, keyset_filter
+
+
+def test_single_column_key():
+    assert keyset_filter(["id"], (42,)) == {"id": "gt.42"}
+
+
+def test_two_column_key_expands_the_row_comparison():
+    assert keyset_filter(["well_id", "date"], ("W1", "2024-01-31")) == {
+        "or": '(well_id.gt."W1",and(well_id.eq."W1",date.gt."2024-01-31"))'
+    }
+
+
+def test_three_column_key():
+    assert keyset_filter(["a", "b", "c"], (1, 2, 3)) == {
+        "or": '(a.gt."1",and(a.eq."1",b.gt."2"),and(a.eq."1",b.eq."2",c.gt."3"))'
+    }
+
+
+def test_values_with_reserved_characters_are_quoted():
+    assert keyset_filter(["name", "id"], ('a,b.(c)"d\\', 7)) == {
+        "or": '(name.gt."a,b.(c)\\"d\\\\",and(name.eq."a,b.(c)\\"d\\\\",id.gt."7"))'
+    }
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakePostgrest(rows={"wiserock_user": 2345, "aries_daily_capacities": 2345}, default_rows=10).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("endpoint, table, key", [
+    ("wiserock_user", "stg_wiserock__user", ["user_id"]),
+    ("aries_daily_capacities", "stg_aries__daily_capacities", ["well_id", "date"]),
+])
+def test_keyset_pages_cover_the_table_once_in_key_order(server, endpoint, table, key):
+    extractor = ApiExtractor(api_key="test", email="test@example.com", password="test", base_url=server.url,
+                             page_size=500, pagination="keyset")
+    pages = [len(page) for page in extractor.iter_pages(endpoint)]
+    df = extractor.extract_table(table)
+    expected = server.table_data(endpoint).sort_values(key)
+    assert pages == [500, 500, 500, 500, 345]
+    assert df[key[0]].astype(str).tolist() == expected[key[0]].astype(str).tolist()
+    assert not df.duplicated(subset=key).any()
+
+
+def test_keyset_pagination_cannot_start_at_an_offset(server):
+    extractor = ApiExtractor(api_key="test", email="test@example.com", password="test", base_url=server.url,
+                             pagination="keyset")
+    with pytest.raises(ValueError, match="start_offset"):
+        list(extractor.iter_pages("wiserock_user", start_offset=10))
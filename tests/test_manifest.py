@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from src.etl.extractor import CsvExtractor
+from src.etl.manifest import SourceManifest
+
+
+def write(path, text, mtime=None):
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def source(tmp_path):
+    return write(tmp_path / "batterytb.csv", "batterymerrickid,batteryname\n1,North\n", mtime=1_000_000)
+
+
+def recorded(tmp_path, table_name, file_path):
+    manifest = SourceManifest(tmp_path / "manifest.json")
+    manifest.record(table_name, SourceManifest.fingerprint(file_path))
+    # Reload from disk, as the next run would.
+    return SourceManifest(tmp_path / "manifest.json")
+
+
+def test_size_and_mtime_match_without_hashing(tmp_path, source, monkeypatch):
+    manifest = recorded(tmp_path, "t", source)
+    monkeypatch.setattr(SourceManifest, "file_hash", staticmethod(lambda path: pytest.fail("hashed")))
+    assert manifest.is_unchanged("t", source)
+
+
+def test_a_touched_file_falls_back_to_the_hash(tmp_path, source):
+    manifest = recorded(tmp_path, "t", source)
+    os.utime(source, (2_000_000, 2_000_000))
+    assert manifest.is_unchanged("t", source)
+    # Same size, new contents.
+    write(source, "batterymerrickid,batteryname\n2,South\n", mtime=3_000_000)
+    assert not manifest.is_unchanged("t", source)
+
+
+def test_size_name_or_missing_entry_means_changed(tmp_path, source):
+    manifest = recorded(tmp_path, "t", source)
+    assert not manifest.is_unchanged("other", source)
+    assert not manifest.is_unchanged("t", write(tmp_path / "renamed.csv", source.read_text(), mtime=1_000_000))
+    write(source, source.read_text() + "2,South\n", mtime=1_000_000)
+    assert not manifest.is_unchanged("t", source)
+
+
+def test_a_file_changed_during_the_load_is_loaded_again(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    source = write(data_dir / "batterytb.csv", "batterymerrickid,batteryname\n1,North\n", mtime=1_000_000)
+    extractor = CsvExtractor(data_dir, engine="c", manifest_path=tmp_path / "manifest.json")
+    df = extractor.extract_table("stg_pro_count__batterytb")
+    assert df["batterymerrickid"].tolist() == [1]
+    write(source, "batterymerrickid,batteryname\n1,North\n2,South\n", mtime=2_000_000)
+    extractor.mark_loaded("stg_pro_count__batterytb")
+    assert extractor.tables_to_load() == {"stg_pro_count__batterytb"}
+
+
+def test_mark_loaded_without_a_read_records_nothing(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write(data_dir / "batterytb.csv", "batterymerrickid,batteryname\n1,North\n")
+    extractor = CsvExtractor(data_dir, engine="c", manifest_path=tmp_path / "manifest.json")
+    extractor.mark_loaded("stg_pro_count__batterytb")
+    assert extractor.manifest.entries == {}
+
+
+@pytest.fixture
+def loaded_sources(tmp_path):
+    """A data directory whose files were all loaded: completiontb and three of its FK parents."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in ("batterytb", "routetb", "completiontb", "areatb"):
+        write(data_dir / f"{name}.csv", f"{name}_id\n1\n", mtime=1_000_000)
+    extractor = CsvExtractor(data_dir, engine="c", manifest_path=tmp_path / "manifest.json")
+    for path in data_dir.glob("*.csv"):
+        extractor.manifest.record(extractor._generate_table_name(path), SourceManifest.fingerprint(path))
+    return extractor
+
+
+def test_unchanged_sources_are_skipped(loaded_sources):
+    assert loaded_sources.tables_to_load() == set()
+
+
+def test_a_changed_parent_reloads_its_children(loaded_sources):
+    write(loaded_sources.data_dir / "batterytb.csv", "batterytb_id\n1\n2\n")
+    assert loaded_sources.tables_to_load() == {"stg_pro_count__batterytb", "stg_pro_count__completiontb"}
+
+
+def test_a_changed_child_does_not_reload_its_parents(loaded_sources):
+    write(loaded_sources.data_dir / "completiontb.csv", "completiontb_id\n1\n2\n")
+    assert loaded_sources.tables_to_load() == {"stg_pro_count__completiontb"}
+
+
+def test_force_reloads_everything(loaded_sources):
+    assert len(loaded_sources.tables_to_load(force=True)) == 4
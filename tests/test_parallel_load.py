@@ -0,0 +1,69 @@
+import threading
+
+import pandas as pd
+
+from src.etl.loader import LoadResult, PostgresLoader, _split_partitions
+
+
+def frame(ids):
+    return pd.DataFrame({"id": ids, "value": [f"v{i}" for i in ids]})
+
+
+def row_ids(partitions):
+    return [sorted(partition["id"]) for partition in partitions]
+
+
+def test_every_row_lands_in_exactly_one_partition():
+    df = frame(range(1000))
+    partitions = _split_partitions(df, ["id"], 4)
+    assert len(partitions) == 4
+    assert sorted(i for ids in row_ids(partitions) for i in ids) == list(range(1000))
+
+
+def test_a_key_lands_in_the_same_partition_across_runs():
+    first = _split_partitions(frame(range(1000)), ["id"], 4)
+    # Another run, with rows in a different order and some rows added.
+    again = _split_partitions(frame(list(range(1500))[::-1]), ["id"], 4)
+    home = {i: number for number, partition in enumerate(first) for i in partition["id"]}
+    for number, partition in enumerate(again):
+        assert {home[i] for i in partition["id"] if i in home} <= {number}
+
+
+def test_versions_of_a_key_share_a_partition_in_their_original_order():
+    df = pd.DataFrame({"id": [5, 7, 5, 9, 5], "value": ["a", "x", "b", "y", "c"]})
+    for partition in _split_partitions(df, ["id"], 3):
+        if 5 in set(partition["id"]):
+            assert partition.loc[partition["id"] == 5, "value"].tolist() == ["a", "b", "c"]
+
+
+def test_composite_keys_and_tables_without_a_key():
+    df = pd.DataFrame({"well": ["a", "a", "b"], "day": [1, 2, 1]})
+    assert sum(len(p) for p in _split_partitions(df, ["well", "day"], 2)) == 3
+    assert row_ids(_split_partitions(frame(range(6)), [], 3)) == [[0, 3], [1, 4], [2, 5]]
+
+
+def test_empty_partitions_are_skipped():
+    assert len(_split_partitions(frame([1]), ["id"], 8)) == 1
+
+
+def test_each_partition_loads_with_its_own_forked_sizer(monkeypatch):
+    loader = PostgresLoader(engine=None, schema="public")
+    table_sizer = loader.batch_sizer("t")
+    loads = []
+    lock = threading.Lock()
+
+    def load_batches(batches, table_name, method, retries, on_conflict, sizer=None, on_commit=None, label=""):
+        rows = [i for batch in batches for i in batch["id"]]
+        with lock:
+            loads.append((label, sizer, rows))
+        return LoadResult(table_name, rows=len(rows), batches=1)
+
+    monkeypatch.setattr(loader, "_load_batches", load_batches)
+    result = loader._load_partitions(frame(range(500)), "t", ["id"], 3, batch_size=None, retries=1,
+                                     method="copy", on_conflict="nothing", on_commit=None)
+    assert result.rows == 500 and result.batches == 3
+    sizers = [sizer for _, sizer, _ in loads]
+    assert len({id(sizer) for sizer in sizers}) == 3
+    assert all(sizer is not table_sizer and sizer.max_rows == table_sizer.max_rows for sizer in sizers)
+    assert sorted(i for _, _, rows in loads for i in rows) == list(range(500))
+    assert sorted(label for label, _, _ in loads) == ["p1:", "p2:", "p3:"]
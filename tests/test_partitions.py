@@ -0,0 +1,79 @@
+from datetime import date
+
+import pandas as pd
+
+from src.etl.loader import PostgresLoader, _partition_changes, month_bounds, partition_name
+
+JAN, FEB, MAR, APR = (pd.Timestamp(f"2024-{month:02d}-01") for month in (1, 2, 3, 4))
+
+
+def test_partition_name():
+    assert partition_name("stg_aries__daily_capacities", JAN) == "stg_aries__daily_capacities_p2024_01"
+    assert partition_name("t", pd.Timestamp("2023-12-01")) == "t_p2023_12"
+
+
+def test_month_bounds():
+    assert month_bounds(JAN) == ("2024-01-01", "2024-02-01")
+    assert month_bounds(FEB) == ("2024-02-01", "2024-03-01")
+    assert month_bounds(pd.Timestamp("2023-12-01")) == ("2023-12-01", "2024-01-01")
+
+
+def test_unchanged_months_are_left_alone():
+    months = {JAN: (10, "a"), FEB: (12, "b")}
+    live = {JAN: "t_p2024_01", FEB: "t_p2024_02"}
+    assert _partition_changes(months, dict(months), live) == ([], [], False)
+
+
+def test_changed_and_new_months_are_rebuilt_in_order():
+    live_months = {JAN: (10, "a"), FEB: (12, "b")}
+    new_months = {MAR: (5, "c"), FEB: (12, "b2"), JAN: (10, "a")}
+    live = {JAN: "t_p2024_01", FEB: "t_p2024_02"}
+    changed, stale, _ = _partition_changes(new_months, live_months, live)
+    assert changed == [FEB, MAR]
+    assert stale == []
+
+
+def test_a_row_count_change_alone_counts():
+    changed, _, _ = _partition_changes({JAN: (11, "a")}, {JAN: (10, "a")}, {JAN: "t_p2024_01"})
+    assert changed == [JAN]
+
+
+def test_months_gone_from_the_source_are_stale_only_when_they_hold_rows():
+    live = {JAN: "t_p2024_01", FEB: "t_p2024_02", APR: "t_p2024_04"}
+    # April is an empty pre-made partition; February's rows disappeared from the source.
+    changed, stale, _ = _partition_changes({JAN: (10, "a")}, {JAN: (10, "a"), FEB: (3, "b")}, live)
+    assert changed == []
+    assert stale == ["t_p2024_02"]
+
+
+def test_empty_premade_partitions_are_filled_from_the_staging_table():
+    changed, _, _ = _partition_changes({APR: (2, "d")}, {}, {APR: "t_p2024_04"})
+    assert changed == [APR]
+
+
+def test_rows_in_the_default_partition_are_reported():
+    # March has no partition, so its live rows sit in DEFAULT.
+    _, _, in_default = _partition_changes({JAN: (10, "a")}, {JAN: (10, "a"), MAR: (1, "c")}, {JAN: "t_p2024_01"})
+    assert in_default
+
+
+class RecordingConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return iter(self.rows)
+
+
+def test_month_fingerprints_are_keyed_by_month():
+    connection = RecordingConnection([(date(2024, 1, 1), 10, "a" * 32), (date(2024, 2, 1), 3, "b" * 32)])
+    loader = PostgresLoader(engine=None, schema="staging")
+    fingerprints = loader._month_fingerprints(connection, "stg_t", "date")
+    assert fingerprints == {JAN: (10, "a" * 32), FEB: (3, "b" * 32)}
+    sql = " ".join(connection.statements[0].split())
+    assert "date_trunc('month', \"date\")::date" in sql
+    # The hash must not depend on the order the rows are read in.
+    assert "ORDER BY md5(t::text)" in sql
+    assert '"staging"."stg_t"' in sql
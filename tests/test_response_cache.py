@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from src.etl.response_cache import CacheMissError, ResponseCache
+
+
+def page(n):
+    return [{"id": i, "name": f"row {i}"} for i in range(n)]
+
+
+def test_key_ignores_param_order_but_not_their_values():
+    key = ResponseCache.key("wiserock_user", 0, 1000, {"a": "gt.1", "order": "id.asc"})
+    assert key == ResponseCache.key("wiserock_user", 0, 1000, {"order": "id.asc", "a": "gt.1"})
+    assert key != ResponseCache.key("wiserock_user", 0, 1000, {"a": "gt.2", "order": "id.asc"})
+    assert key != ResponseCache.key("wiserock_user", 1000, 1000, {"a": "gt.1", "order": "id.asc"})
+    assert ResponseCache.key("e", 0, 10) == ResponseCache.key("e", 0, 10, {})
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResponseCache(tmp_path, mode="sometimes")
+
+
+def test_off_mode_is_disabled(tmp_path):
+    assert not ResponseCache(tmp_path).enabled
+
+
+def test_record_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path, mode="record")
+    assert cache.get("k") is None
+    cache.put("k", page(3), 3)
+    assert cache.get("k") == (page(3), 3)
+    assert cache.summary() == {"mode": "record", "hits": 1, "misses": 1}
+
+
+def test_record_mode_treats_expired_pages_as_misses(tmp_path):
+    cache = ResponseCache(tmp_path, mode="record", ttl_seconds=60)
+    cache.put("k", page(1), 1)
+    old = os.stat(cache._path("k")).st_mtime - 120
+    os.utime(cache._path("k"), (old, old))
+    assert cache.get("k") is None
+
+
+def test_replay_mode_serves_expired_pages_and_raises_on_misses(tmp_path):
+    ResponseCache(tmp_path, mode="record").put("k", page(1), None)
+    os.utime(ResponseCache(tmp_path)._path("k"), (0, 0))
+    replay = ResponseCache(tmp_path, mode="replay", ttl_seconds=60)
+    assert replay.get("k") == (page(1), None)
+    with pytest.raises(CacheMissError):
+        replay.get("missing")
+
+
+def cached_keys(cache):
+    return {path.name[:-len(".json.gz")] for path in cache.directory.glob("*.json.gz")}
+
+
+def test_eviction_keeps_the_cache_under_budget(tmp_path):
+    probe = ResponseCache(tmp_path / "probe", mode="record")
+    probe.put("p", page(200), 200)
+    page_bytes = probe._path("p").stat().st_size
+    cache = ResponseCache(tmp_path / "cache", mode="record", max_bytes=int(page_bytes * 2.5))
+    for key in ("a", "b"):
+        cache.put(key, page(200), 200)
+    # Reading "a" makes "b" the least recently used page.
+    assert cache.get("a") is not None
+    cache.put("c", page(200), 200)
+    assert cached_keys(cache) == {"a", "c"}
+    assert cache._size == sum(path.stat().st_size for path in cache.directory.glob("*.json.gz"))
+
+
+def test_overwriting_a_page_does_not_count_it_twice(tmp_path):
+    cache = ResponseCache(tmp_path, mode="record")
+    cache.put("k", page(50), 50)
+    cache.put("k", page(50), 50)
+    assert cache._size == cache._path("k").stat().st_size
+
+
+def test_pages_from_earlier_runs_are_evicted_oldest_first(tmp_path):
+    earlier = ResponseCache(tmp_path, mode="record")
+    for age, key in ((300, "old"), (200, "older_name_newer_page")):
+        earlier.put(key, page(200), 200)
+        mtime = earlier._path(key).stat().st_mtime - age
+        os.utime(earlier._path(key), (mtime, mtime))
+    page_bytes = earlier._path("old").stat().st_size
+    cache = ResponseCache(tmp_path, mode="record", max_bytes=int(page_bytes * 2.5))
+    cache.put("new", page(200), 200)
+    assert cached_keys(cache) == {"older_name_newer_page", "new"}
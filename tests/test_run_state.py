@@ -0,0 +1,149 @@
+import json
+
+import pytest
+
+from src.config import settings
+from src.etl import api_extractor as api_extractor_module
+from src.etl.run_state import RunState
+
+OPTIONS = {"stream": False, "force": False}
+
+
+@pytest.fixture
+def state(tmp_path):
+    return RunState(tmp_path / "run_state.json", page_interval=3, page_seconds=3600)
+
+
+def saved(state):
+    return json.loads(state.path.read_text())
+
+
+def test_batches_accumulate_committed_rows(state):
+    state.begin(OPTIONS)
+    state.start_table("t", rows=100)
+    state.record_batch("t", 1, 50)
+    state.record_batch("t", 2, 25)
+    assert state.committed_rows("t") == 175
+    assert saved(state)["tables"]["t"]["batches"] == 2
+    state.complete_table("t", 175)
+    assert state.committed_rows("t") == 0
+    assert state.completed_tables() == {"t"}
+
+
+def test_page_progress_is_written_every_few_pages(state):
+    state.begin(OPTIONS)
+    for offset in (0, 1000):
+        state.record_page("endpoint", offset, 1000)
+    assert saved(state)["endpoints"] == {}
+    state.record_page("endpoint", 2000, 1000)
+    assert saved(state)["endpoints"]["endpoint"]["offset"] == 2000
+
+
+def test_page_progress_is_written_after_page_seconds(tmp_path):
+    state = RunState(tmp_path / "run_state.json", page_interval=1000, page_seconds=0)
+    state.begin(OPTIONS)
+    state.record_page("endpoint", 0, 1000)
+    assert saved(state)["endpoints"]["endpoint"]["offset"] == 0
+
+
+def test_an_interrupted_run_is_resumed_under_the_same_options(state):
+    state.begin(OPTIONS)
+    state.record_batch("t", 1, 10)
+    run_id = state.state["run_id"]
+    resumed = RunState(state.path)
+    assert resumed.begin(OPTIONS, resume=True)
+    assert resumed.state["run_id"] == run_id
+    assert resumed.committed_rows("t") == 10
+
+
+def test_a_run_with_different_options_is_not_resumed(state):
+    state.begin(OPTIONS)
+    state.record_batch("t", 1, 10)
+    resumed = RunState(state.path)
+    assert not resumed.begin({**OPTIONS, "force": True}, resume=True)
+    assert resumed.committed_rows("t") == 0
+    assert saved(resumed)["options"]["force"] is True
+
+
+def test_a_completed_run_is_not_resumed(state):
+    state.begin(OPTIONS)
+    state.complete_table("t", 10)
+    state.finish(True)
+    resumed = RunState(state.path)
+    assert not resumed.begin(OPTIONS, resume=True)
+    assert resumed.completed_tables() == set()
+
+
+def test_without_resume_a_fresh_state_replaces_the_old_one(state):
+    state.begin(OPTIONS)
+    state.record_batch("t", 1, 10)
+    assert not RunState(state.path).begin(OPTIONS)
+    assert saved(state)["tables"] == {}
+
+
+@pytest.fixture
+def plan(tmp_path, monkeypatch):
+    """`main.plan_resume` over a fresh run state, with plain single-connection offset loads."""
+    import main
+    state = RunState(tmp_path / "run_state.json")
+    state.begin(OPTIONS)
+    monkeypatch.setattr(main, "run_state", state)
+    monkeypatch.setattr(main.api_extractor, "page_size", 1000)
+    monkeypatch.setattr(main.api_extractor, "pagination", "offset")
+    monkeypatch.setattr(main.postgres_loader, "partition_column", lambda table_name: None)
+    monkeypatch.setattr(settings, "PARALLEL_LOAD_TABLES", [])
+    monkeypatch.setattr(settings, "SWAP_LOADS", False)
+    monkeypatch.setattr(settings, "DIFFERENTIAL_LOADS", False)
+
+    def plan_resume(completed=(), committed=None, sync_plan=None):
+        for table_name in completed:
+            state.complete_table(table_name, 1)
+        for table_name, rows in (committed or {}).items():
+            state.start_table(table_name, rows)
+        return main.plan_resume((), sync_plan or {})
+    plan_resume.state = state
+    return plan_resume
+
+
+def every_api_table_but(*tables):
+    return [table_name for table_name in api_extractor_module.API_LOAD_ORDER if table_name not in tables]
+
+
+def test_an_interrupted_table_continues_from_its_last_full_page(plan):
+    skipped, offsets = plan(completed=every_api_table_but("stg_wiserock__note"),
+                            committed={"stg_wiserock__note": 2500})
+    assert offsets == {"stg_wiserock__note": 2000}
+    assert skipped == set(every_api_table_but("stg_wiserock__note"))
+
+
+def test_children_of_a_restarted_table_restart_too(plan):
+    skipped, offsets = plan(completed=every_api_table_but("stg_wellview__wellheader", "stg_wellview__surveypoint"),
+                            committed={"stg_wellview__surveypoint": 2500})
+    assert offsets == {}
+    for child in ("stg_wellview__job", "stg_wellview__jobreport"):
+        assert child not in skipped
+        assert child not in plan.state.completed_tables()
+    assert plan.state.committed_rows("stg_wellview__surveypoint") == 0
+
+
+def test_incremental_tables_do_not_restart_their_children(plan):
+    skipped, _ = plan(completed=every_api_table_but("stg_wellview__wellheader"),
+                      sync_plan={"stg_wellview__wellheader": "incremental"})
+    assert "stg_wellview__job" in skipped
+
+
+def test_unordered_offset_pages_restart_the_table(plan, monkeypatch):
+    original = api_extractor_module.keyset_columns
+    monkeypatch.setattr(api_extractor_module, "keyset_columns",
+                        lambda endpoint_name: [] if endpoint_name == "wiserock_note" else original(endpoint_name))
+    _, offsets = plan(completed=every_api_table_but("stg_wiserock__note"),
+                      committed={"stg_wiserock__note": 2500})
+    assert offsets == {}
+
+
+def test_keyset_pagination_restarts_the_table(plan, monkeypatch):
+    import main
+    monkeypatch.setattr(main.api_extractor, "pagination", "keyset")
+    _, offsets = plan(completed=every_api_table_but("stg_wiserock__note"),
+                      committed={"stg_wiserock__note": 2500})
+    assert offsets == {}
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from src.etl.scheduler import TableRun, TableScheduler
+
+# parent -> children: wellheader -> job -> jobreport, wellheader -> surveypoint, user -> note.
+DEPENDENCIES = {
+    "wellheader": set(),
+    "user": set(),
+    "job": {"wellheader"},
+    "jobreport": {"job", "wellheader"},
+    "surveypoint": {"wellheader"},
+    "note": {"user"},
+}
+TABLES = list(DEPENDENCIES)
+
+
+class Recorder:
+    """A task that records when each table started and finished."""
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, table):
+        with self._lock:
+            self.events.append(("start", table))
+        if table in self.fail:
+            raise RuntimeError(f"{table} broke")
+        with self._lock:
+            self.events.append(("end", table))
+
+    def position(self, kind, table):
+        return self.events.index((kind, table))
+
+
+def test_parents_finish_before_children_start():
+    recorder = Recorder()
+    runs = TableScheduler(max_workers=4).run(TABLES, recorder, DEPENDENCIES)
+    assert all(run.status == "success" for run in runs.values())
+    for table, parents in DEPENDENCIES.items():
+        for parent in parents:
+            assert recorder.position("end", parent) < recorder.position("start", table)
+
+
+def test_single_worker_starts_ready_tables_in_list_order():
+    recorder = Recorder()
+    TableScheduler(max_workers=1).run(["user", "wellheader", "note"], recorder,
+                                      {"user": set(), "wellheader": set(), "note": {"user"}})
+    started = [table for kind, table in recorder.events if kind == "start"]
+    assert started == ["user", "wellheader", "note"]
+
+
+def test_independent_tables_run_concurrently():
+    # Both roots must be inside their task at the same time, or the barrier times out.
+    barrier = threading.Barrier(2, timeout=5)
+    runs = TableScheduler(max_workers=2).run(["wellheader", "user"], lambda table: barrier.wait(),
+                                             {"wellheader": set(), "user": set()})
+    assert [run.status for run in runs.values()] == ["success", "success"]
+
+
+def test_failure_skips_descendants_and_keeps_unrelated_tables():
+    recorder = Recorder(fail={"job"})
+    with pytest.raises(RuntimeError, match="Tables failed to load: job") as raised:
+        TableScheduler(max_workers=2).run(TABLES, recorder, DEPENDENCIES)
+    assert str(raised.value.__cause__) == "job broke"
+    started = {table for kind, table in recorder.events if kind == "start"}
+    assert "jobreport" not in started
+    assert {"wellheader", "user", "surveypoint", "note"} <= started
+
+
+def test_skipped_status_is_reported():
+    statuses = {}
+
+    def task(table):
+        if table == "wellheader":
+            raise RuntimeError("down")
+
+    scheduler = TableScheduler(max_workers=2)
+    original_report = scheduler.report
+    scheduler.report = lambda runs, dependencies: (
+        statuses.update({table: run.status for table, run in runs.items()}),
+        original_report(runs, dependencies),
+    )
+    with pytest.raises(RuntimeError):
+        scheduler.run(TABLES, task, DEPENDENCIES)
+    assert statuses == {
+        "wellheader": "failed", "user": "success", "job": "skipped",
+        "jobreport": "skipped", "surveypoint": "skipped", "note": "success",
+    }
+
+
+def test_cyclic_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="Cyclic FK dependencies"):
+        TableScheduler().run(["a", "b", "c"], lambda table: None, {"a": {"c"}, "b": {"a"}, "c": {"b"}})
+
+
+def timed(durations):
+    return {table: TableRun(table, status="success", started=0.0, finished=seconds)
+            for table, seconds in durations.items()}
+
+
+def test_critical_path_is_the_slowest_dependency_chain():
+    runs = timed({"wellheader": 2.0, "user": 1.0, "job": 3.0, "jobreport": 1.0, "surveypoint": 5.0, "note": 4.0})
+    # wellheader -> surveypoint (7s) beats wellheader -> job -> jobreport (6s) and user -> note (5s).
+    assert TableScheduler.critical_path(runs, DEPENDENCIES) == ["wellheader", "surveypoint"]
+    runs["note"] = TableRun("note", started=0.0, finished=9.0)
+    assert TableScheduler.critical_path(runs, DEPENDENCIES) == ["user", "note"]
+
+
+def test_critical_path_follows_the_slower_parent():
+    runs = timed({"wellheader": 1.0, "user": 0.5, "job": 4.0, "jobreport": 1.0, "surveypoint": 1.0, "note": 1.0})
+    assert TableScheduler.critical_path(runs, DEPENDENCIES) == ["wellheader", "job", "jobreport"]
+
+
+def test_critical_path_of_nothing_is_empty():
+    assert TableScheduler.critical_path({}, {}) == []
@@ -0,0 +1,89 @@
+import builtins
+import json
+
+import pytest
+
+from src.etl import telemetry as telemetry_module
+from src.etl.telemetry import Telemetry
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    collector = Telemetry(jsonl_path=tmp_path / "metrics.jsonl", prometheus_path=tmp_path / "prom" / "etl.prom")
+    yield collector
+    collector.close()
+
+
+def test_events_add_up_per_table_and_stage(telemetry):
+    telemetry.record("t", "page_fetch", seconds=2.0, rows=100, bytes=5000)
+    telemetry.record("t", "page_fetch", seconds=1.0, rows=50, retries=1)
+    telemetry.record("t", "page_fetch", retries=1, calls=0)
+    stats = telemetry.stats[("t", "page_fetch")]
+    assert (stats.calls, stats.rows, stats.bytes, stats.retries) == (2, 150, 5000, 2)
+    assert stats.rows_per_second == 50.0
+    assert telemetry.percentiles("t", "page_fetch") == {"p50": 2.0, "p95": 2.0, "p99": 2.0}
+
+
+def test_a_failing_stage_is_recorded_as_an_error(telemetry):
+    with pytest.raises(RuntimeError):
+        with telemetry.stage("t", "batch_commit") as timer:
+            timer.rows = 10
+            raise RuntimeError("boom")
+    stats = telemetry.stats[("t", "batch_commit")]
+    assert (stats.calls, stats.rows, stats.errors) == (1, 10, 1)
+
+
+def test_the_event_log_is_opened_once_per_run(telemetry, monkeypatch):
+    opened = []
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return builtins.open(*args, **kwargs)
+
+    monkeypatch.setattr(telemetry_module, "open", counting_open, raising=False)
+    for page in range(50):
+        telemetry.record("t", "page_fetch", seconds=0.1, rows=page)
+    telemetry.close()
+    assert opened == [telemetry.jsonl_path]
+    events = [json.loads(line) for line in telemetry.jsonl_path.read_text().splitlines()]
+    assert [event["rows"] for event in events] == list(range(50))
+    assert {event["run_id"] for event in events} == {telemetry.run_id}
+    # Events after a close are appended to the same file.
+    telemetry.record("t", "transform")
+    telemetry.close()
+    assert len(telemetry.jsonl_path.read_text().splitlines()) == 51
+
+
+def test_summary_lists_stages_in_pipeline_order(telemetry):
+    telemetry.record("b_table", "batch_commit", seconds=1.0, rows=10, bytes=2_000_000)
+    telemetry.record("b_table", "page_fetch", seconds=1.0, rows=10)
+    telemetry.record("a_table", "transform", seconds=0.5, rows=5, errors=1)
+    lines = telemetry.summary().splitlines()
+    rows = [line.split()[:2] for line in lines[2:-1]]
+    assert rows == [["a_table", "transform"], ["b_table", "page_fetch"], ["b_table", "batch_commit"]]
+    assert lines[3].split()[2:] == ["1", "1.00", "10", "0.0", "10", "0", "0"]
+    assert lines[4].split()[5] == "2.0"
+    assert lines[-1].startswith(f"Run {telemetry.run_id}:")
+
+
+def test_finish_writes_the_prometheus_textfile(telemetry, capsys):
+    telemetry.record("t", "page_fetch", seconds=1.5, rows=100, bytes=4096, retries=2)
+    telemetry.finish(success=False)
+    text = telemetry.prometheus_path.read_text()
+    assert 'etl_stage_rows{table="t",stage="page_fetch"} 100' in text
+    assert 'etl_stage_retries{table="t",stage="page_fetch"} 2' in text
+    assert 'etl_stage_seconds{table="t",stage="page_fetch"} 1.5' in text
+    assert "# TYPE etl_stage_bytes gauge" in text
+    assert "etl_run_success 0" in text
+    assert text.endswith("\n")
+    assert list(telemetry.prometheus_path.parent.iterdir()) == [telemetry.prometheus_path]
+    # finish() flushed the event log.
+    assert len(telemetry.jsonl_path.read_text().splitlines()) == 1
+    assert "Stage telemetry" in capsys.readouterr().out
+
+
+def test_without_paths_nothing_is_written():
+    collector = Telemetry()
+    collector.record("t", "auth", seconds=0.1)
+    collector.finish()
+    assert collector.stats[("t", "auth")].calls == 1
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.transformer import (
+    Transformer, _to_boolean, _to_datetime, _to_float, _to_integer, _to_string, _to_uuid, _with_invalid,
+)
+
+UUID = "0b8f5a52-7f0e-4c4e-9d6f-6a3a1c2b9e11"
+
+
+def test_integers():
+    converted, invalid = _to_integer(pd.Series(["1", "2.0", " 3 ", None, "x", "4.5"]))
+    assert converted.dtype == "Int64"
+    assert converted.tolist()[:3] == [1, 2, 3]
+    assert invalid.tolist() == [False, False, False, False, True, True]
+
+
+def test_integer_columns_stay_exact():
+    converted, invalid = _to_integer(pd.Series([2 ** 62, 1], dtype="int64"))
+    assert converted.tolist() == [2 ** 62, 1]
+    assert not invalid.any()
+
+
+def test_floats():
+    converted, invalid = _to_float(pd.Series(["1.5", "1e3", None, "n/a"]))
+    assert converted.tolist()[:2] == [1.5, 1000.0]
+    assert invalid.tolist() == [False, False, False, True]
+
+
+def test_booleans_from_text_and_flags():
+    converted, invalid = _to_boolean(pd.Series(["Yes", "f", " TRUE ", "0", "2", None, "maybe"]))
+    assert converted.tolist()[:5] == [True, False, True, False, True]
+    assert invalid.tolist() == [False] * 6 + [True]
+    flags, invalid = _to_boolean(pd.Series([0, 1, 2, None], dtype="Int64"))
+    assert flags.tolist()[:3] == [False, True, True] and pd.isna(flags[3])
+    assert not invalid.any()
+
+
+def test_datetimes():
+    naive, invalid = _to_datetime(False)(pd.Series(["2024-01-02", "2024-01-02 03:04:05", None, "soon"]))
+    assert naive[1] == pd.Timestamp("2024-01-02 03:04:05")
+    assert invalid.tolist() == [False, False, False, True]
+    aware, _ = _to_datetime(True)(pd.Series(["2024-01-02T03:04:05+02:00"]))
+    assert aware[0] == pd.Timestamp("2024-01-02 01:04:05", tz="UTC")
+
+
+def test_uuids_are_normalized_and_checked():
+    converted, invalid = _to_uuid(pd.Series([f" {UUID.upper()} ", UUID.replace("-", ""), None, "not-a-uuid"]))
+    assert converted[0] == UUID
+    assert invalid.tolist() == [False, False, False, True]
+
+
+def test_strings_never_fail():
+    converted, invalid = _to_string(pd.Series([1, "a", None]))
+    assert converted.dtype == "string" and not invalid.any()
+
+
+def test_with_invalid_keeps_the_typed_column_when_everything_converted():
+    converted = pd.Series([1, 2], dtype="Int64")
+    assert _with_invalid(converted, pd.Series(["1", "2"]), pd.Series([False, False])) is converted
+
+
+def test_with_invalid_keeps_the_original_text_of_bad_values():
+    original = pd.Series(["1", "x", None])
+    converted, invalid = _to_integer(original)
+    result = _with_invalid(converted, original, invalid)
+    assert result.dtype == object
+    assert result[0] == 1 and result[1] == "x" and pd.isna(result[2])
+
+
+def note_frame(**overrides):
+    data = {"id": ["1", "2"], "event_id": ["10", "20"], "is_edited": ["t", "0"],
+            "event_uuid": [UUID, UUID.upper()], "note_text": ["a", None]}
+    return pd.DataFrame({**data, **overrides})
+
+
+def test_coerce_types_converts_every_column():
+    df = Transformer().coerce_types(note_frame(), "stg_wiserock__note")
+    assert df["id"].dtype == "Int64" and df["event_id"].dtype == "Int64"
+    assert df["is_edited"].tolist() == [True, False]
+    assert df["event_uuid"].tolist() == [UUID, UUID]
+    assert df["note_text"].dtype == "string"
+
+
+def test_coerce_types_reports_and_keeps_invalid_values(capsys):
+    df = Transformer().coerce_types(note_frame(id=["1", "one"]), "stg_wiserock__note")
+    assert df["id"].tolist() == [1, "one"]
+    assert "1 value(s) in stg_wiserock__note.id" in capsys.readouterr().out
+
+
+def test_unknown_columns_are_dropped_with_one_warning(capsys):
+    transformer = Transformer()
+    for _ in range(2):
+        df = transformer.coerce_types(note_frame(extra=[1, 2]), "stg_wiserock__note")
+        assert "extra" not in df.columns
+    assert capsys.readouterr().out.count("Dropping columns not in stg_wiserock__note: ['extra']") == 1
+
+
+def test_unknown_columns_can_be_an_error():
+    with pytest.raises(ValueError, match="extra"):
+        Transformer(unknown_columns="error").coerce_types(note_frame(extra=[1, 2]), "stg_wiserock__note")
+    with pytest.raises(ValueError):
+        Transformer(unknown_columns="keep")
+
+
+def test_tables_unknown_to_the_catalog_are_left_alone():
+    df = pd.DataFrame({"a": ["1"]})
+    assert Transformer().coerce_types(df, "no_such_table") is df
+
+
+def test_dates_and_numerics():
+    df = pd.DataFrame({"id": [1], "period": ["2024-05-01"], "value": ["81.35"]})
+    df = Transformer().coerce_types(df, "stg_eia__oil_price")
+    assert df["period"][0] == pd.Timestamp("2024-05-01")
+    assert df["value"].dtype == np.float64
+
+
+@pytest.mark.parametrize("table_name, verbatim", [
+    ("stg_wellview__job", True),              # text and UUID only
+    ("stg_wellview__jobreport", True),
+    ("stg_wiserock__user", False),            # integer key
+    ("stg_wiserock__note", False),            # boolean flag
+    ("stg_eia__oil_price", False),            # date
+    ("no_such_table", False),
+])
+def test_copies_verbatim(table_name, verbatim):
+    assert Transformer().copies_verbatim(table_name) is verbatim
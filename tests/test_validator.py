@@ -0,0 +1,138 @@
+import json
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from src.etl.dead_letter import DUPLICATE_KEY, REJECTED, DeadLetterStore
+from src.etl.loader import LoadResult, PostgresLoader
+from src.etl.validator import KeyValidator
+
+WELLHEADER = "stg_wellview__wellheader"
+JOB = "stg_wellview__job"
+JOBREPORT = "stg_wellview__jobreport"
+STATECOUNTY = "stg_pro_count__statecountynamestb"
+COMPLETION = "stg_pro_count__completiontb"
+
+
+@pytest.fixture
+def dead_letters(tmp_path):
+    return DeadLetterStore(tmp_path / "dead_letter")
+
+
+@pytest.fixture
+def validator(dead_letters):
+    # The in-memory SQLite engine has none of the staging tables, so any
+    # parent key set that is not collected in memory cannot be read.
+    return KeyValidator(create_engine("sqlite://"), "public", dead_letters=dead_letters)
+
+
+def load(validator, table_name, df, complete=True, keep="first"):
+    validator.start_table(table_name)
+    valid = validator.validate(df, table_name, keep=keep)
+    validator.table_loaded(table_name, complete=complete)
+    return valid
+
+
+def test_duplicate_keys_keep_the_first_occurrence(validator, dead_letters):
+    df = pd.DataFrame({"idwell": ["a", "b", "a", "a"], "wellname": ["1", "2", "3", "4"]})
+    valid = validator.validate(df, WELLHEADER)
+    assert valid["wellname"].tolist() == ["1", "2"]
+    routed = dead_letters.read(WELLHEADER)[0]
+    assert list(routed) == [DUPLICATE_KEY]
+    assert routed[DUPLICATE_KEY]["wellname"].tolist() == ["3", "4"]
+    assert validator.quality[WELLHEADER].duplicate_keys == 2
+
+
+def test_duplicate_keys_keep_the_last_occurrence_for_upserts(validator):
+    df = pd.DataFrame({"idwell": ["a", "b", "a"], "wellname": ["old", "x", "new"]})
+    valid = validator.validate(df, WELLHEADER, keep="last")
+    assert valid["wellname"].tolist() == ["x", "new"]
+
+
+def test_orphans_are_routed_out_once_the_parent_is_loaded(validator, dead_letters):
+    load(validator, WELLHEADER, pd.DataFrame({"idwell": ["w1", "w2"]}))
+    jobs = pd.DataFrame({"idrec": ["j1", "j2", "j3", "j4"], "idwell": ["w1", "w9", None, "w2"]})
+    valid = validator.validate(jobs, JOB)
+    # A NULL foreign key is not checked.
+    assert valid["idrec"].tolist() == ["j1", "j3", "j4"]
+    routed = dead_letters.read(JOB)[0]
+    assert list(routed) == [REJECTED]
+    assert routed[REJECTED]["idrec"].tolist() == ["j2"]
+    assert validator.quality[JOB].orphans == {"idwell -> stg_wellview__wellheader(idwell)": 1}
+
+
+def test_only_valid_rows_become_parent_keys(validator):
+    load(validator, WELLHEADER, pd.DataFrame({"idwell": ["w1"]}))
+    load(validator, JOB, pd.DataFrame({"idrec": ["j1", "j2"], "idwell": ["w1", "missing"]}))
+    reports = pd.DataFrame({"idrec": ["r1", "r2"], "idrecparent": ["j1", "j2"], "idwell": ["w1", "w1"]})
+    assert validator.validate(reports, JOBREPORT)["idrec"].tolist() == ["r1"]
+
+
+def test_keys_compare_equal_across_types(validator):
+    load(validator, STATECOUNTY, pd.DataFrame({"statecode": [42, 42], "countycode": [1, 2]}))
+    completions = pd.DataFrame({
+        "merrickid": [1, 2, 3],
+        "stateid": pd.array([42, 42, None], dtype="Int64"),
+        "countyid": ["1", "3", "7"],
+    })
+    valid = validator.validate(completions, COMPLETION)
+    assert valid["merrickid"].tolist() == [1, 3]
+    assert validator.quality[COMPLETION].orphans == {
+        "stateid, countyid -> stg_pro_count__statecountynamestb(statecode, countycode)": 1
+    }
+
+
+def test_keys_of_an_incomplete_load_are_not_trusted(validator, capsys):
+    load(validator, WELLHEADER, pd.DataFrame({"idwell": ["w1"]}), complete=False)
+    jobs = pd.DataFrame({"idrec": ["j1"], "idwell": ["not-in-memory"]})
+    # The key set would be read from the database, which is unavailable here, so the check is skipped.
+    assert validator.validate(jobs, JOB)["idrec"].tolist() == ["j1"]
+    assert "Could not read the keys of stg_wellview__wellheader" in capsys.readouterr().out
+
+
+def test_stream_chunks_accumulate_parent_keys(validator):
+    validator.start_table(WELLHEADER)
+    validator.validate(pd.DataFrame({"idwell": ["w1"]}), WELLHEADER)
+    validator.validate(pd.DataFrame({"idwell": ["w2"]}), WELLHEADER)
+    validator.table_loaded(WELLHEADER, complete=True)
+    jobs = pd.DataFrame({"idrec": ["j1", "j2"], "idwell": ["w1", "w2"]})
+    assert len(validator.validate(jobs, JOB)) == 2
+    assert validator.quality[WELLHEADER].rows == 2
+
+
+def test_disabled_validator_passes_data_through(dead_letters):
+    validator = KeyValidator(create_engine("sqlite://"), "public", dead_letters=dead_letters, enabled=False)
+    df = pd.DataFrame({"idwell": ["a", "a"]})
+    assert validator.validate(df, WELLHEADER) is df
+    assert dead_letters.tables() == []
+
+
+def test_report_lists_every_table(validator, tmp_path):
+    load(validator, WELLHEADER, pd.DataFrame({"idwell": ["w1", "w1"]}))
+    validator.validate(pd.DataFrame({"idrec": ["j1"], "idwell": ["w2"]}), JOB)
+    lines = validator.report().splitlines()
+    assert lines[0].split()[:2] == ["table", "rows"]
+    assert any(line.startswith(WELLHEADER) and line.split()[1:4] == ["2", "1", "0"] for line in lines)
+    path = tmp_path / "quality.json"
+    validator.write_report(path)
+    report = json.loads(path.read_text())
+    assert report[WELLHEADER]["rejected"] == 1
+    assert report[JOB]["orphans"] == {"idwell -> stg_wellview__wellheader(idwell)": 1}
+
+
+def test_replay_never_lets_duplicates_overwrite_the_kept_row(dead_letters, monkeypatch):
+    dead_letters.write(WELLHEADER, pd.DataFrame({"idwell": ["a"]}), ValueError("duplicate"), kind=DUPLICATE_KEY)
+    dead_letters.write(WELLHEADER, pd.DataFrame({"idwell": ["b"]}), ValueError("bad value"))
+    loader = PostgresLoader(engine=None, schema="public", dead_letters=dead_letters)
+    calls = []
+
+    def load_dataframe(df, table_name, method=None, on_conflict="nothing"):
+        calls.append((df["idwell"].tolist(), on_conflict))
+        return LoadResult(table_name, rows=len(df), batches=1)
+
+    monkeypatch.setattr(loader, "load_dataframe", load_dataframe)
+    result = loader.replay_dead_letters(WELLHEADER)
+    assert sorted(calls) == [(["a"], "nothing"), (["b"], "update")]
+    assert result.rows == 2
+    assert dead_letters.read(WELLHEADER)[0] == {}